@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class MyappConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "myapp"
-   
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects Task change receivers)
+        from myproject import checks  # noqa: F401  (registers system checks)
+        from .search import restore_sqlite_fts
+
+        post_migrate.connect(restore_sqlite_fts, sender=self)
@@ -0,0 +1,48 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Lower
+
+
+# Expression index created by migration 0028; lookups must compare
+# LOWER(email) for the database to use it
+EMAIL_LOWER_INDEX = 'auth_user_email_lower_idx'
+
+
+def users_with_email(email):
+    """Users whose email matches case-insensitively, via the LOWER(email) index."""
+    # Lower both sides in SQL so the comparison uses the database's case folding
+    return User.objects.annotate(email_lower=Lower('email')).filter(email_lower=Lower(Value(email)))
+
+
+def find_user(identifier):
+    """The single user an identifier names: the username, else the oldest user with that email."""
+    users = User.objects.filter(username=identifier)
+    if '@' in identifier:
+        # Both lookups in one indexed query; an exact username wins
+        users = (users | users_with_email(identifier)).annotate(
+            by_username=Case(When(username=identifier, then=Value(0)), default=Value(1), output_field=IntegerField()),
+        ).order_by('by_username', 'pk')
+    return users.first()
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """Sign in with a username or an email address, hashing the password exactly once.
+
+    The identifier resolves to at most one user with one query. Unknown
+    identifiers still pay for one hash, so response time does not reveal
+    which accounts exist.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = find_user(username.strip())
+        if user is None:
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
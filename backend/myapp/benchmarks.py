@@ -0,0 +1,603 @@
+"""Benchmarks for the task API hot paths, run with ``manage.py benchmark`` on a throwaway test database."""
+import io
+import itertools
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.db import OperationalError, connection, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import Client
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myproject import authentication, compression
+
+from . import counters, export, imports, journal, seeding
+from .backends import users_with_email
+from .models import Task
+from .serializers import TaskSerializer, render_json, serialize_task_values, task_values
+from .stats import task_stats
+from .views import TaskStream, get_tokens_for_user
+
+
+SCENARIOS = {}
+
+# Data sets for the api scenario: (users, tasks per user). Requests are made
+# as the first user, so one-user lists page through 100k rows and many-users
+# lists pick 50 rows out of 500k.
+DATA_PROFILES = {
+    'small': (10, 500),
+    'one-user': (1, 100_000),
+    'many-users': (10_000, 50),
+}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+@contextmanager
+def isolated_database(verbosity=0):
+    old_name = connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # SQLite's close() ignores in-memory databases, which would carry
+            # this run's rows into the next scenario's "fresh" database
+            BaseDatabaseWrapper.close(connection)
+        connection.creation.destroy_test_db(old_name, verbosity)
+
+
+def seed(users=1, tasks_per_user=1000, seed=0):
+    """Seed bench0, bench1, ... with tasks (see myapp.seeding); returns the users.
+
+    Not journaled, which is fine on a database nothing has read yet; the
+    owners' counters are recounted.
+    """
+    return seeding.seed(
+        users=users, tasks_per_user=tasks_per_user, username_prefix='bench', password='benchmark',
+        record=False, seed=seed,
+    )
+
+
+def measure(func, repeat):
+    """Run func repeat times; returns (best seconds, queries per run)."""
+    best = float('inf')
+    queries = 0
+    for _ in range(repeat):
+        # The log is a bounded deque; a full one would make the capture look empty
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        queries = len(ctx.captured_queries)
+    return best, queries
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return float('nan')
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1] if len(samples) > 1 else samples[0]
+
+
+def sample(func, samples, warmup=1):
+    """Run func warmup + samples times; returns (seconds per timed run, queries in the last run)."""
+    for _ in range(warmup):
+        func()
+    latencies = []
+    queries = 0
+    for _ in range(samples):
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - start)
+        queries = len(ctx.captured_queries)
+    return latencies, queries
+
+
+def summarize(latencies, queries):
+    """One case's entry in the JSON report."""
+    return {
+        'samples': len(latencies),
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(_percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'queries': queries,
+    }
+
+
+def compare(baseline, report, tolerance, min_delta_ms=1.0):
+    """Regressions of report against baseline, as readable lines.
+
+    A case regresses when its median is more than ``tolerance`` (a fraction)
+    and ``min_delta_ms`` slower, or when it runs more queries. Cases missing
+    from either side are skipped; p95/p99 are too noisy on a shared machine
+    to fail a run.
+    """
+    regressions = []
+    for name, cases in report['scenarios'].items():
+        base_cases = baseline.get('scenarios', {}).get(name, {})
+        for case, current in cases.items():
+            base = base_cases.get(case)
+            if base is None:
+                continue
+            if current['queries'] > base['queries']:
+                regressions.append(f"{name} / {case}: {base['queries']} -> {current['queries']} queries")
+            slower = current['p50_ms'] - base['p50_ms']
+            if slower > min_delta_ms and current['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+                regressions.append(f"{name} / {case}: p50 {base['p50_ms']:.2f} -> {current['p50_ms']:.2f} ms")
+    return regressions
+
+
+# ---------- scenarios ----------
+
+@scenario('serializer')
+def bench_serializer(options, write):
+    """TaskSerializer + JSONRenderer vs the values() fast path for one task list."""
+    rows = options['tasks']
+    seed(users=1, tasks_per_user=rows)
+    qs = Task.objects.order_by('-updated_at')
+
+    def drf():
+        return JSONRenderer().render(TaskSerializer(qs.all(), many=True).data)
+
+    def fast():
+        return render_json(serialize_task_values(task_values(qs.all())))
+
+    assert drf() == fast(), 'fast path output differs from TaskSerializer'
+    results = {}
+    for name, func in (('TaskSerializer', drf), ('fast path', fast)):
+        seconds, queries = measure(func, options['repeat'])
+        results[name] = seconds
+        write(f'{name:>15}: {seconds * 1000:9.1f} ms  {rows / seconds:12,.0f} rows/s  {queries:6d} queries')
+    write(f'{"speedup":>15}: {results["TaskSerializer"] / results["fast path"]:9.1f}x')
+
+
+@scenario('stats')
+def bench_stats(options, write):
+    """TaskCounter reads vs the aggregate vs serializing the full list the old dashboard counted.
+
+    Run with --tasks 1000000 for the 1M-row figure; tasks are spread over ten
+    owners so the per-owner numbers cover 10% of the table.
+    """
+    rows = options['tasks']
+    owners = seed(users=10, tasks_per_user=rows // 10)
+    today = date.today()
+
+    def full_list(qs):
+        # What Dashboard.jsx downloaded before counting in the browser
+        return render_json(serialize_task_values(task_values(qs.order_by('-updated_at'))))
+
+    readers = {'all tasks': counters.read_all, 'one owner': lambda: counters.read(owners[0].pk)}
+
+    for label, qs in (('all tasks', Task.objects.all()), ('one owner', Task.objects.filter(owner=owners[0]))):
+        scoped = qs.count()
+        assert readers[label]() == task_stats(qs.all(), today), 'counters differ from the aggregate'
+        for name, func in (
+            ('counters', lambda: render_json(readers[label]())),
+            ('aggregate', lambda: render_json(task_stats(qs.all(), today))),
+            ('full list', lambda: full_list(qs.all())),
+        ):
+            seconds, queries = measure(func, options['repeat'])
+            size = len(func())
+            write(f'{label:>10} {name:>10}: {seconds * 1000:9.1f} ms  {scoped / seconds:12,.0f} rows/s  {queries:3d} queries  {size:12,d} bytes')
+
+
+@scenario('auth')
+def bench_auth(options, write):
+    """Requests per second for GET user/me/ with the access cookie.
+
+    By JWT verifications per request, and with the user read from auth_user
+    or rebuilt from the token's claims.
+    """
+    owner = seed(users=1, tasks_per_user=0)[0]
+    client = Client()
+    client.cookies['access'] = get_tokens_for_user(owner)['access']
+    requests = 500
+    cache = authentication.token_cache
+    verify = AccessToken.verify
+    verified = 0
+
+    def counting_verify(token):
+        nonlocal verified
+        verified += 1
+        return verify(token)
+
+    @contextmanager
+    def mode(cache_size, reuse_request_token=True, user_claims=False):
+        cache.maxsize = cache_size
+        cache.clear()
+        with mock.patch.object(AccessToken, 'verify', counting_verify), override_settings(JWT_USER_CLAIMS=user_claims):
+            if reuse_request_token:
+                yield
+            else:
+                # The middleware's token is ignored, as before: DRF verifies again
+                with mock.patch.object(authentication, 'recall_token', return_value=None):
+                    yield
+
+    def run():
+        for _ in range(requests):
+            assert client.get('/user/me/').status_code == 200
+
+    size = cache.maxsize
+    try:
+        modes = (
+            ('verify twice', (0, False)),
+            ('verify once', (0,)),
+            ('cached', (size,)),
+            ('cached+claims', (size, True, True)),
+        )
+        for name, args in modes:
+            with mode(*args):
+                verified = 0
+                seconds, queries = measure(run, options['repeat'])
+                per_request = verified / (requests * options['repeat'])
+            write(f'{name:>14}: {requests / seconds:9,.0f} req/s  {per_request:4.2f} verifications/request  {queries // requests} queries/request')
+    finally:
+        cache.maxsize = size
+        cache.clear()
+
+
+@scenario('login')
+def bench_login(options, write):
+    """Sign-in cost by identifier, old username-then-email path vs EmailOrUsernameBackend.
+
+    Seeds --tasks users; each login is dominated by password hashing, so the
+    number of hashes per attempt is reported alongside the time.
+    """
+    users = seed(users=options['tasks'], tasks_per_user=0)
+    target = users[len(users) // 2]
+    attempts = 5
+    encode = PBKDF2PasswordHasher.encode
+    hashes = 0
+
+    def counting_encode(hasher, *args, **kwargs):
+        nonlocal hashes
+        hashes += 1
+        return encode(hasher, *args, **kwargs)
+
+    def legacy(ident, password):
+        # auth_login before the backend: username first, then an email__iexact scan
+        backend = ModelBackend()
+        user = backend.authenticate(None, username=ident, password=password)
+        if not user:
+            candidate = User.objects.filter(email__iexact=ident).first()
+            if candidate:
+                user = backend.authenticate(None, username=candidate.username, password=password)
+        return user
+
+    def current(ident, password):
+        return authenticate(None, username=ident, password=password)
+
+    cases = (
+        ('username', target.username, 'benchmark', True),
+        ('email', target.email.upper(), 'benchmark', True),
+        ('unknown email', 'nobody@example.com', 'benchmark', False),
+        ('wrong password', target.email, 'wrong', False),
+    )
+    with mock.patch.object(PBKDF2PasswordHasher, 'encode', counting_encode):
+        for label, ident, password, ok in cases:
+            for name, login in (('legacy', legacy), ('backend', current)):
+                hashes = 0
+
+                def run():
+                    for _ in range(attempts):
+                        assert bool(login(ident, password)) is ok, (name, label)
+
+                seconds, queries = measure(run, options['repeat'])
+                per_attempt = hashes / (attempts * options['repeat'])
+                write(
+                    f'{label:>14} {name:>8}: {seconds / attempts * 1000:8.1f} ms/login  {attempts / seconds:7.1f} logins/s  '
+                    f'{per_attempt:4.1f} hashes  {queries // attempts} queries'
+                )
+
+    # The lookup alone, without hashing: a scan vs the LOWER(email) index
+    lookups = 200
+    for name, lookup in (
+        ('email__iexact', lambda: User.objects.filter(email__iexact=target.email.upper()).first()),
+        ('LOWER(email) index', lambda: users_with_email(target.email.upper()).first()),
+    ):
+        seconds, _ = measure(lambda: [lookup() for _ in range(lookups)], options['repeat'])
+        write(f'{name:>23}: {seconds / lookups * 1000:8.3f} ms/lookup over {len(users):,} users')
+
+
+BENCH_ALIAS = 'benchmark_file'
+
+
+def _file_connection(path, options):
+    """A connection to the SQLite file at path, registered for this thread only."""
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+
+    connections[BENCH_ALIAS] = DatabaseWrapper({**connection.settings_dict, 'NAME': path, 'OPTIONS': options}, BENCH_ALIAS)
+    return connections[BENCH_ALIAS]
+
+
+@scenario('sqlite')
+def bench_sqlite(options, write):
+    """Concurrent task list reads and Task.save() writes on a SQLite file, default vs tuned profile.
+
+    Readers run the tasks/ list query; writers update random tasks through
+    save(), so each write also records the journal, version and counters.
+    """
+    if connection.vendor != 'sqlite':
+        write('skipped: the database is not SQLite')
+        return
+    owners = [user.pk for user in seed(users=10, tasks_per_user=options['tasks'] // 10)]
+    task_ids = list(Task.objects.values_list('pk', flat=True))
+    statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+    readers, writers, duration = 4, 2, 3.0
+
+    workdir = tempfile.mkdtemp(prefix='taskapp-bench-')
+    seeded = os.path.join(workdir, 'seeded.sqlite3')
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM INTO %s', [seeded])
+
+    profiles = (
+        ('default', {}),
+        ('tuned', settings.DATABASES['default'].get('OPTIONS', {})),
+    )
+    try:
+        for name, db_options in profiles:
+            path = os.path.join(workdir, f'{name}.sqlite3')
+            shutil.copyfile(seeded, path)
+            results = {'read': [], 'write': [], 'locked': 0}
+            lock = threading.Lock()
+            stop = time.monotonic() + duration
+
+            def worker(kind, seed_value):
+                rng = random.Random(seed_value)
+                _file_connection(path, db_options)
+                latencies, locked = [], 0
+                try:
+                    while time.monotonic() < stop:
+                        started = time.perf_counter()
+                        try:
+                            if kind == 'read':
+                                qs = Task.objects.using(BENCH_ALIAS).filter(owner_id=rng.choice(owners))
+                                list(task_values(qs.order_by('-updated_at', '-id'))[:50])
+                            else:
+                                task = Task.objects.using(BENCH_ALIAS).get(pk=rng.choice(task_ids))
+                                task.status = rng.choice(statuses)
+                                task.save(using=BENCH_ALIAS)
+                        except OperationalError:
+                            locked += 1
+                            continue
+                        latencies.append(time.perf_counter() - started)
+                finally:
+                    # Including this thread's default connection, which would keep
+                    # the in-memory test database alive into the next scenario
+                    connections.close_all()
+                with lock:
+                    results[kind] += latencies
+                    results['locked'] += locked
+
+            threads = [threading.Thread(target=worker, args=('read', i)) for i in range(readers)]
+            threads += [threading.Thread(target=worker, args=('write', readers + i)) for i in range(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            for kind in ('read', 'write'):
+                samples = results[kind]
+                write(
+                    f'{name:>8} {kind:>5}s: {len(samples) / duration:9,.0f} ops/s  '
+                    f'p50 {_percentile(samples, 50) * 1000:7.2f} ms  p99 {_percentile(samples, 99) * 1000:8.2f} ms'
+                )
+            write(f'{name:>8} locked: {results["locked"]} "database is locked" errors')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+@scenario('api')
+def bench_api(options, write):
+    """Latency percentiles and queries per request for the task API endpoints.
+
+    Seeds the --profile data set and sends --samples requests per case through
+    the full middleware stack. Returns the results for the JSON report.
+    """
+    users, per_user = DATA_PROFILES[options['profile']]
+    owner = seed(users=users, tasks_per_user=per_user)[0]
+    samples = options['samples']
+    # One per DELETE sample, plus the warm-up
+    doomed = iter(Task.objects.bulk_create(
+        Task(title=f'doomed {i}', owner=owner) for i in range(samples + 1)
+    ))
+    counters.rebuild()  # bulk_create bypasses the signals that maintain them
+    staff = User.objects.create_user('bench-staff', 'bench-staff@example.com', 'benchmark', is_staff=True)
+    # Password hashing and full snapshots take far longer than the rest
+    slow_samples = max(5, samples // 5)
+    today = date.today()
+
+    def client_for(user):
+        client = Client()
+        tokens = get_tokens_for_user(user)
+        client.cookies['access'] = tokens['access']
+        client.cookies['refresh'] = tokens['refresh']
+        return client
+
+    client, staff_client = client_for(owner), client_for(staff)
+    tasks_url = reverse('tasks')
+    task = Task.objects.filter(owner=owner).exclude(title__startswith='doomed').order_by('-id').first()
+    task_url = reverse('task_detail', args=[task.pk])
+    first_page = client.get(tasks_url, {'limit': 50})
+    etag = first_page['ETag']
+    next_cursor = first_page.json()['next']
+    statuses = iter(itertools.cycle([Task.STATUS_PENDING, Task.STATUS_IN_PROGRESS]))
+
+    def snapshot():
+        response = client.get(reverse('tasks_stream'))
+        try:
+            chunks = iter(response.streaming_content)
+            next(chunks)  # retry: hint
+            assert b'"snapshot"' in next(chunks)
+        finally:
+            response.close()
+        return response
+
+    cases = [
+        ('list', lambda: client.get(tasks_url, {'limit': 50}), 200),
+        ('list status', lambda: client.get(tasks_url, {'limit': 50, 'status': Task.STATUS_PENDING}), 200),
+        ('list priority', lambda: client.get(tasks_url, {'limit': 50, 'priority': Task.PRIORITY_HIGH}), 200),
+        ('list status+priority', lambda: client.get(
+            tasks_url, {'limit': 50, 'status': Task.STATUS_PENDING, 'priority': Task.PRIORITY_HIGH}), 200),
+        ('list due range', lambda: client.get(tasks_url, {
+            'limit': 50, 'due_after': today.isoformat(), 'due_before': (today + timedelta(days=7)).isoformat()}), 200),
+        ('list next page', lambda: client.get(tasks_url, {'limit': 50, 'cursor': next_cursor}), 200),
+        ('list kanban fields', lambda: client.get(
+            tasks_url, {'limit': 50, 'fields': 'id,title,status,priority,due_date'}), 200),
+        ('list not modified', lambda: client.get(tasks_url, {'limit': 50}, HTTP_IF_NONE_MATCH=etag), 304),
+        ('list staff', lambda: staff_client.get(tasks_url, {'limit': 50}), 200),
+        ('search', lambda: client.get(tasks_url, {'limit': 50, 'search': 'task 42'}), 200),
+        ('search broad', lambda: client.get(tasks_url, {'limit': 50, 'search': 'lorem'}), 200),
+        ('detail GET', lambda: client.get(task_url), 200),
+        ('detail PUT', lambda: client.put(
+            task_url, {'title': task.title, 'status': next(statuses)}, content_type='application/json'), 200),
+        ('detail DELETE', lambda: client.delete(reverse('task_detail', args=[next(doomed).pk])), 200),
+        ('create', lambda: client.post(tasks_url, {'title': 'created'}, content_type='application/json'), 201),
+        ('stats', lambda: client.get(reverse('tasks_stats')), 200),
+        ('refresh', lambda: client.post(reverse('auth_refresh')), 200),
+        ('login', lambda: Client().post(
+            reverse('auth_login'), {'username': owner.username, 'password': 'benchmark'},
+            content_type='application/json'), 200),
+        ('SSE snapshot', snapshot, 200),
+    ]
+    slow = {'login', 'SSE snapshot'}
+
+    write(f'profile {options["profile"]}: {users:,} users x {per_user:,} tasks, measured as {owner.username}')
+    results = {}
+    for name, request, expected in cases:
+        def run():
+            response = request()
+            assert response.status_code == expected, (name, response.status_code)
+
+        latencies, queries = sample(run, slow_samples if name in slow else samples)
+        results[name] = summarize(latencies, queries)
+        row = results[name]
+        write(
+            f'{name:>20}: p50 {row["p50_ms"]:8.2f} ms  p95 {row["p95_ms"]:8.2f} ms  '
+            f'p99 {row["p99_ms"]:8.2f} ms  {queries:3d} queries'
+        )
+    return results
+
+
+@scenario('export')
+def bench_export(options, write):
+    """Peak memory of tasks/export/ vs building the whole list like tasks/ would.
+
+    Run at two --tasks sizes to see that the export's peak stays flat.
+    """
+    rows = options['tasks']
+    seed(users=1, tasks_per_user=rows)
+    qs = task_values(Task.objects.order_by('-updated_at', '-id'))
+
+    def full_list():
+        return len(render_json(serialize_task_values(qs.all())))
+
+    def streamed(output):
+        return sum(len(block) for block in export.export_stream(qs.all(), output))
+
+    for name, func in (
+        ('full list', full_list),
+        ('export ndjson', lambda: streamed('ndjson')),
+        ('export csv', lambda: streamed('csv')),
+    ):
+        seconds, queries = measure(func, 1)
+        # Traced separately: tracemalloc slows the run down several times
+        tracemalloc.start()
+        size = func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        write(
+            f'{name:>14}: {seconds * 1000:9.1f} ms  {rows / seconds:10,.0f} rows/s  {queries} queries  '
+            f'peak {peak / 2**20:7.1f} MiB  {size:12,d} bytes'
+        )
+
+
+@scenario('import')
+def bench_import(options, write):
+    """Throughput of tasks/import/ on a tasks/export/ file, validating only and inserting."""
+    rows = options['tasks']
+    owner, importer = seed(users=2, tasks_per_user=rows)
+    qs = task_values(Task.objects.filter(owner=owner).order_by('-updated_at', '-id'))
+    for output in export.FORMATS:
+        body = b''.join(export.export_stream(qs.all(), output))
+        for dry_run in (True, False):
+            def run():
+                report = imports.import_tasks(io.BytesIO(body), output, importer, dry_run=dry_run)
+                assert report == {'imported': rows, 'rejected': 0, 'checksum': 'ok'}, report
+            # Every insert run adds rows, so those are timed once
+            seconds, queries = measure(run, options['repeat'] if dry_run else 1)
+            name = f"{output} {'dry run' if dry_run else 'insert'}"
+            write(f'{name:>14}: {seconds * 1000:9.1f} ms  {rows / seconds:10,.0f} rows/s  {queries} queries')
+
+
+@scenario('compression')
+def bench_compression(options, write):
+    """Bytes on the wire per encoding for list, detail and SSE payloads.
+
+    The update stream is encoded the way CompressionMiddleware sends it (one
+    compressor, flushed per event) and, for comparison, with every event
+    compressed on its own, as Django's GZipMiddleware does for async streams.
+    """
+    tasks = min(options['tasks'], 2000)
+    owner, = seed(users=1, tasks_per_user=tasks)
+    client = Client()
+    client.cookies['access'] = get_tokens_for_user(owner)['access']
+    task = Task.objects.filter(owner=owner).order_by('-id').first()
+
+    stream = TaskStream(owner)
+    snapshot = stream.snapshot().encode()
+    seq = stream.seq
+    for updated in Task.objects.filter(owner=owner).order_by('-id')[:200]:
+        updated.status = Task.STATUS_COMPLETED
+        updated.save()
+    events = [stream.apply([change]).encode() for change in journal.changes_since(seq)]
+
+    payloads = [
+        ('list (200)', [client.get(reverse('tasks'), {'limit': 200}).content]),
+        ('detail', [client.get(reverse('task_detail', args=[task.pk])).content]),
+        (f'SSE snapshot ({tasks})', [snapshot]),
+        (f'SSE {len(events)} updates', events),
+    ]
+    encoders = list(compression.ENCODERS.values())
+    if compression.brotli is None:
+        write('brotli is not installed; only gzip is measured')
+    for name, chunks in payloads:
+        size = sum(map(len, chunks))
+        write(f'{name:>22}: {size:10,d} bytes')
+        for encoder in encoders:
+            start = time.perf_counter()
+            encoded = sum(map(len, compression.compress_stream(encoder, chunks, flush=len(chunks) > 1)))
+            elapsed = time.perf_counter() - start
+            write(
+                f'{encoder.name:>22}: {encoded:10,d} bytes  {1 - encoded / size:6.1%} saved  '
+                f'{elapsed * 1000:7.2f} ms'
+            )
+            if len(chunks) > 1:
+                separate = sum(len(compression.compress(encoder, chunk)) for chunk in chunks)
+                write(f'{encoder.name + " per event":>22}: {separate:10,d} bytes  {1 - separate / size:6.1%} saved')
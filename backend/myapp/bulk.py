@@ -0,0 +1,50 @@
+"""Multi-row INSERT ... RETURNING and journal/counter bookkeeping for bulk task writes."""
+from django.db import connections
+
+from . import counters, journal
+from .events import TaskChange
+
+
+def insert_rows(model, fields, rows, using='default'):
+    """Insert tuples of database-ready values for ``fields``; returns the new primary keys in order.
+
+    Only for backends with can_return_rows_from_bulk_insert. Batches follow
+    the backend's bulk_batch_size(), as in bulk_create().
+    """
+    connection = connections[using]
+    opts = model._meta
+    qn = connection.ops.quote_name
+    model_fields = [opts.get_field(name) for name in fields]
+    head = 'INSERT INTO %s (%s) VALUES ' % (qn(opts.db_table), ', '.join(qn(field.column) for field in model_fields))
+    placeholder = '(%s)' % ', '.join(['%s'] * len(model_fields))
+    returning, returning_params = connection.ops.return_insert_columns([opts.pk])
+    batch_size = max(1, connection.ops.bulk_batch_size(model_fields, rows))
+
+    pks = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cursor.execute(
+                f"{head}{', '.join([placeholder] * len(batch))} {returning}",
+                [value for row in batch for value in row] + list(returning_params),
+            )
+            pks.extend(row[0] for row in connection.ops.fetch_returned_insert_rows(cursor))
+    return pks
+
+
+def record_bulk(created=(), updated=(), using='default'):
+    """Journal and count task writes that sent no signals, e.g. bulk_create() or update().
+
+    ``created`` holds ``(pk, state)`` and ``updated`` ``(pk, old, new)`` with
+    counters.TaskState values. Call inside the writing transaction.
+    """
+    created, updated = list(created), list(updated)
+    journal.record_changes(
+        [TaskChange('created', pk, state.owner_id) for pk, state in created]
+        + [TaskChange('updated', pk, new.owner_id) for pk, _, new in updated],
+        using=using,
+    )
+    counters.record(
+        [(None, state) for _, state in created] + [(old, new) for _, old, new in updated],
+        using=using,
+    )
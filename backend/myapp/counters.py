@@ -0,0 +1,200 @@
+"""Per-owner TaskCounter rows behind tasks/stats/, kept current by every Task write."""
+import contextvars
+from collections import Counter, defaultdict, namedtuple
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Task, TaskCounter
+from .stats import STAT_COLUMNS, format_stats, stat_aggregates, stat_columns
+
+
+# What a task contributes to its owner's counters
+TaskState = namedtuple('TaskState', ['owner_id', 'status', 'priority', 'due_date', 'updated_at'])
+
+# Recounts touch this many owners per query
+REFRESH_BATCH_SIZE = 500
+
+_batch = contextvars.ContextVar('task_counter_batch', default=None)
+
+
+def task_state(task):
+    # to_python: attributes may still hold what was assigned, e.g. a date string
+    return TaskState(*(
+        Task._meta.get_field(field).to_python(getattr(task, field)) for field in TaskState._fields
+    ))
+
+
+def loaded_state(task):
+    """The task's state as stored when it was loaded, or None if unknown.
+
+    Only exact for rows loaded with select_for_update() inside the writing
+    transaction (or re-read there with stored_values()).
+    """
+    values = getattr(task, '_loaded_values', None)
+    if values is None or any(field not in values for field in TaskState._fields):
+        return None
+    return TaskState(*(values[field] for field in TaskState._fields))
+
+
+def stored_values(pk, using='default'):
+    """The counted columns of task pk as stored now, locked for the transaction; None if gone."""
+    return Task.objects.using(using).select_for_update().filter(pk=pk).values(*TaskState._fields).first()
+
+
+def saved_state(task, old, update_fields=None):
+    """State written by save(); with update_fields only those columns changed."""
+    if update_fields is None or old is None:
+        return task_state(task)
+    attnames = {Task._meta.get_field(name).attname for name in update_fields}
+    return old._replace(**{field: value for field, value in task_state(task)._asdict().items() if field in attnames})
+
+
+def _columns(state, today):
+    updated_on = timezone.localdate(state.updated_at) if state.updated_at else None
+    return stat_columns(state.status, state.priority, state.due_date, updated_on, today)
+
+
+@contextmanager
+def batch(using='default'):
+    """Collect every record() call in the block into one UPDATE per owner.
+
+    Use inside the transaction, like journal.batch(); nothing is applied if
+    the block raises.
+    """
+    pairs, stale = [], set()
+    token = _batch.set((using, pairs, stale))
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    if pairs or stale:
+        record(pairs, stale=stale, using=using)
+
+
+def record(pairs, stale=(), using='default'):
+    """Apply task state changes to their owners' counters.
+
+    ``pairs`` are ``(old, new)`` TaskStates, with None for a task that did not
+    exist before or no longer exists. Owners in ``stale`` (whose old state is
+    unknown) are recounted instead. Call inside the writing transaction.
+    """
+    current = _batch.get()
+    if current is not None and current[0] == using:
+        current[1].extend(pairs)
+        current[2].update(stale)
+        return
+
+    today = timezone.localdate()
+    deltas = defaultdict(Counter)
+    # Bulk writes repeat the same few states (one updated_at for the batch);
+    # localdate() in _columns() dominates, so each distinct state is bucketed once
+    buckets = {}
+
+    def columns(state):
+        key = state[1:]
+        if key not in buckets:
+            buckets[key] = _columns(state, today)
+        return buckets[key]
+
+    for old, new in pairs:
+        if old is not None:
+            for column in columns(old):
+                deltas[old.owner_id][column] -= 1
+        if new is not None:
+            for column in columns(new):
+                deltas[new.owner_id][column] += 1
+
+    stale = set(stale)
+    counters = TaskCounter.objects.using(using)
+    for owner_id, counts in deltas.items():
+        changed = {column: F(column) + n for column, n in counts.items() if n}
+        if owner_id in stale or not changed:
+            continue
+        # Matches nothing if the row is missing or from an earlier day
+        if not counters.filter(owner_id=owner_id, as_of=today).update(**changed):
+            stale.add(owner_id)
+    if stale:
+        refresh(stale, today, using=using)
+
+
+def refresh(owner_ids, today=None, using='default'):
+    """Recount the given owners' rows from the tasks table; returns them by owner."""
+    today = today or timezone.localdate()
+    owner_ids = sorted(owner_ids)
+    refreshed = {}
+    with transaction.atomic(using=using):
+        for start in range(0, len(owner_ids), REFRESH_BATCH_SIZE):
+            chunk = owner_ids[start:start + REFRESH_BATCH_SIZE]
+            # Lock first (a no-op on SQLite) so the recount sees every write
+            # committed by concurrent transactions that updated these rows
+            list(TaskCounter.objects.using(using).select_for_update().filter(owner_id__in=chunk).values_list('pk'))
+            fresh = _count(Task.objects.using(using).filter(owner_id__in=chunk), today)
+            rows = [TaskCounter(owner_id=owner_id, as_of=today, **fresh.get(owner_id, {})) for owner_id in chunk]
+            TaskCounter.objects.using(using).bulk_create(
+                rows, update_conflicts=True, unique_fields=['owner_id'], update_fields=['as_of', *STAT_COLUMNS],
+            )
+            refreshed.update((row.owner_id, row) for row in rows)
+    return refreshed
+
+
+def _count(tasks, today):
+    """Fresh stat columns per owner from one GROUP BY query."""
+    rows = tasks.order_by().values('owner_id').annotate(**stat_aggregates(today))
+    return {row.pop('owner_id'): row for row in rows}
+
+
+def read(owner_id, using='default'):
+    """tasks/stats/ payload for one owner: a single-row lookup on most days."""
+    today = timezone.localdate()
+    row = TaskCounter.objects.using(using).filter(owner_id=owner_id, as_of=today).values(*STAT_COLUMNS).first()
+    if row is None:
+        counter = refresh([owner_id], today, using=using)[owner_id]
+        row = {column: getattr(counter, column) for column in STAT_COLUMNS}
+    return format_stats(row, today)
+
+
+def read_all(using='default'):
+    """tasks/stats/ payload over every owner: the sum of their counter rows."""
+    today = timezone.localdate()
+    stale = list(TaskCounter.objects.using(using).exclude(as_of=today).values_list('owner_id', flat=True))
+    if stale:
+        refresh(stale, today, using=using)
+    totals = TaskCounter.objects.using(using).aggregate(**{column: Sum(column) for column in STAT_COLUMNS})
+    return format_stats({column: value or 0 for column, value in totals.items()}, today)
+
+
+def rebuild(check=False, using='default'):
+    """Recount every owner from scratch; returns the owner ids whose rows had drifted.
+
+    With check=True nothing is written. Date buckets of rows from an earlier
+    day are expected to be out of date and are not reported.
+    """
+    today = timezone.localdate()
+    fresh = _count(Task.objects.using(using), today)
+    stored = {row.pop('owner_id'): row for row in TaskCounter.objects.using(using).values('owner_id', 'as_of', *STAT_COLUMNS)}
+    exact = ['total', *(column for column in STAT_COLUMNS if column.startswith(('status_', 'priority_')))]
+    empty = dict.fromkeys(STAT_COLUMNS, 0)
+
+    drifted = []
+    for owner_id in sorted(fresh.keys() | stored.keys()):
+        expected = fresh.get(owner_id, empty)
+        row = stored.get(owner_id)
+        if row is None:
+            if expected['total']:
+                drifted.append(owner_id)
+            continue
+        columns = STAT_COLUMNS if row['as_of'] == today else exact
+        if any(row[column] != expected[column] for column in columns):
+            drifted.append(owner_id)
+
+    if not check:
+        with transaction.atomic(using=using):
+            TaskCounter.objects.using(using).all().delete()
+            TaskCounter.objects.using(using).bulk_create(
+                [TaskCounter(owner_id=owner_id, as_of=today, **row) for owner_id, row in fresh.items()],
+                batch_size=REFRESH_BATCH_SIZE,
+            )
+    return drifted
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from collections import deque, namedtuple
+
+
+# op is one of 'created', 'updated', 'deleted', or 'resync' when a slow
+# stream fell too far behind and must reload everything; seq is the
+# change's journal sequence number
+TaskChange = namedtuple('TaskChange', ['op', 'task_id', 'owner_id', 'seq'], defaults=(None,))
+
+RESYNC = TaskChange('resync', None, None)
+
+
+class Subscription:
+    """One open stream's view of the hub.
+
+    ``owner_id=None`` receives every change (staff streams); otherwise only
+    changes to that owner's tasks are delivered, so other users' writes never
+    wake this stream.
+    """
+
+    max_pending = 1000
+
+    def __init__(self, hub, owner_id=None):
+        self.hub = hub
+        self.owner_id = owner_id
+        self._pending = deque()
+        self._cond = threading.Condition()
+
+    def wants(self, change):
+        return self.owner_id is None or change.owner_id == self.owner_id
+
+    def _append(self, change):
+        # Past max_pending, sending a fresh snapshot is cheaper than the backlog
+        if len(self._pending) >= self.max_pending:
+            self._pending.clear()
+            self._pending.append(RESYNC)
+        elif not self._pending or self._pending[0] is not RESYNC:
+            self._pending.append(change)
+
+    def push(self, change):
+        with self._cond:
+            self._append(change)
+            self._cond.notify()
+
+    def wait(self, timeout=None):
+        """Block until changes arrive or timeout; returns the drained list."""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+        return self._drain()
+
+    def _drain(self):
+        with self._cond:
+            changes = list(self._pending)
+            self._pending.clear()
+        return changes
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class AsyncSubscription(Subscription):
+    """Subscription awaited from an event loop (ASGI streams).
+
+    Publishers run in ORM threads, so they wake the loop thread-safely; a
+    waiting stream costs one pending future rather than a thread.
+    """
+
+    def __init__(self, hub, owner_id=None):
+        super().__init__(hub, owner_id)
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def push(self, change):
+        with self._cond:
+            self._append(change)
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # Loop already closed; the stream is gone
+            self.close()
+
+    async def wait(self, timeout=None):
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._event.clear()
+        return self._drain()
+
+
+class TaskChangeHub:
+    """In-process fan-out of committed Task changes to open SSE streams.
+
+    Only changes made by this process are seen unless myapp.notify relays
+    them from the database (NOTIFY on PostgreSQL, journal polling on SQLite).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self, owner_id=None):
+        return self._add(Subscription(self, owner_id))
+
+    def subscribe_async(self, owner_id=None):
+        """Must be called from the event loop that will await the subscription."""
+        return self._add(AsyncSubscription(self, owner_id))
+
+    def _add(self, sub):
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, change):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.wants(change):
+                sub.push(change)
+
+    def resync(self):
+        """Tell every stream to reload, e.g. after notifications may have been lost."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.push(RESYNC)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+hub = TaskChangeHub()
+
+
+def coalesce(changes):
+    """Collapse a batch of changes to one final (op, seq) per task.
+
+    A task created and then updated in the same batch is still 'created';
+    anything followed by a delete is 'deleted'; seq is the task's latest.
+    Returns None if the batch asks for a resync.
+    """
+    ops = {}
+    for change in changes:
+        if change is RESYNC:
+            return None
+        previous = ops.get(change.task_id)
+        op = change.op
+        if previous and previous[0] == 'created' and op == 'updated':
+            op = 'created'
+        ops[change.task_id] = (op, change.seq)
+    return ops
@@ -0,0 +1,152 @@
+"""Streaming task exports for tasks/export/, as NDJSON or CSV with a count and checksum trailer."""
+import asyncio
+import csv
+import hashlib
+import io
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections
+
+from .serializers import TASK_VALUE_FIELDS, UserSerializer, render_json, serialize_task_values
+
+
+# output parameter -> (content type, file extension)
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+CSV_COLUMNS = [*TASK_VALUE_FIELDS, *(f'owner_{field}' for field in UserSerializer.Meta.fields)]
+
+# Chunks the ASGI path lets its producer thread run ahead of the client
+ASYNC_BUFFER_CHUNKS = 4
+
+# Each producer holds a database connection, so ASGI exports beyond this many
+# wait for a free worker
+_producers = ThreadPoolExecutor(max_workers=settings.TASK_EXPORT_MAX_WORKERS, thread_name_prefix='task-export')
+
+# A cell a spreadsheet would evaluate as a formula, possibly behind escape quotes
+_FORMULA = re.compile(r"'*[=+\-@]")
+
+
+def escape_cell(value):
+    """Quote a CSV cell that would otherwise start a spreadsheet formula."""
+    if isinstance(value, str) and _FORMULA.match(value):
+        return "'" + value
+    return value
+
+
+def unescape_cell(value):
+    """Undo escape_cell() on a cell read back from a CSV export."""
+    if value.startswith("'") and _FORMULA.match(value):
+        return value[1:]
+    return value
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _ndjson(tasks):
+    return b''.join(render_json(task) + b'\n' for task in tasks)
+
+
+def _csv_rows(tasks):
+    for task in tasks:
+        owner = task['owner']
+        yield [
+            *(escape_cell(task[field]) for field in TASK_VALUE_FIELDS),
+            *(escape_cell(owner[field]) for field in UserSerializer.Meta.fields),
+        ]
+
+
+def _csv(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def trailer(output, count, checksum):
+    """The closing line: a JSON object in NDJSON, a "#" comment line in CSV."""
+    if output == 'csv':
+        return f'# count={count} sha256={checksum}\n'.encode()
+    return render_json({'count': count, 'sha256': checksum}) + b'\n'
+
+
+def export_stream(rows, output, chunk_size=None):
+    """Encoded blocks for task_values() rows, ending with the trailer line."""
+    chunk_size = chunk_size or settings.TASK_EXPORT_CHUNK_SIZE
+    digest = hashlib.sha256()
+    count = 0
+    if output == 'csv':
+        block = _csv([CSV_COLUMNS])
+        digest.update(block)
+        yield block
+    for chunk in _chunks(rows.iterator(chunk_size=chunk_size), chunk_size):
+        tasks = serialize_task_values(chunk)
+        block = _csv(_csv_rows(tasks)) if output == 'csv' else _ndjson(tasks)
+        digest.update(block)
+        count += len(tasks)
+        yield block
+    yield trailer(output, count, digest.hexdigest())
+
+
+async def aexport_stream(rows, output, chunk_size=None):
+    """export_stream() for ASGI responses.
+
+    Django would buffer a synchronous iterator completely under ASGI, and the
+    shared thread that runs sync code there closes connections between
+    requests, which would kill an open cursor. So the export runs on a worker
+    of its own, with its own connection, at most ASYNC_BUFFER_CHUNKS ahead.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    slots = threading.Semaphore(ASYNC_BUFFER_CHUNKS)
+    stop = threading.Event()
+    end = object()
+
+    def send(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+            return True
+        except RuntimeError:
+            return False  # the event loop is gone
+
+    def produce():
+        if stop.is_set():
+            return  # the client left while this export waited for a worker
+        result = end
+        try:
+            with closing(export_stream(rows, output, chunk_size)) as blocks:
+                for block in blocks:
+                    while not slots.acquire(timeout=1):
+                        if stop.is_set():
+                            return
+                    if stop.is_set() or not send(block):
+                        return
+        except Exception as exc:
+            result = exc
+        finally:
+            connections.close_all()
+        send(result)
+
+    loop.run_in_executor(_producers, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is end:
+                return
+            if isinstance(item, Exception):
+                raise item
+            slots.release()
+            yield item
+    finally:
+        # Client gone or done: let a waiting producer notice and finish
+        stop.set()
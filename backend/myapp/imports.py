@@ -0,0 +1,201 @@
+"""Streaming task imports from NDJSON or CSV, for tasks/import/ and import_tasks."""
+import csv
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import bulk, counters, journal
+from .export import FORMATS, unescape_cell
+from .models import Task
+from .serializers import TaskSerializer
+
+
+# Columns read from CSV; anything else (id, timestamps, owner_*) is ignored
+IMPORT_FIELDS = ['title', 'description', 'status', 'priority', 'due_date']
+# Empty CSV cells mean "use the default" for these rather than an empty value
+_OPTIONAL_FIELDS = {'status', 'priority', 'due_date'}
+# Model defaults for columns a row leaves out
+_DEFAULTS = {name: Task._meta.get_field(name).get_default() for name in IMPORT_FIELDS}
+
+
+class ImportFormatError(ValueError):
+    """The input as a whole cannot be read (bad format, missing CSV header)."""
+
+
+class _Lines:
+    """Decoded lines of a byte stream, hashing each one only once the next is read.
+
+    So when the last line turns out to be an export trailer, ``digest`` covers
+    exactly the bytes before it.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.digest = hashlib.sha256()
+        self.number = 0
+        self._unhashed = b''
+
+    def __iter__(self):
+        for raw in self._stream:
+            self.digest.update(self._unhashed)
+            self._unhashed = raw
+            self.number += 1
+            try:
+                line = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                # Replaced so the row fails validation on this line instead
+                line = raw.decode('utf-8', 'replace')
+            yield line.lstrip('﻿') if self.number == 1 else line
+
+
+def _json_trailer(values):
+    """(count, sha256) if an NDJSON line is the export's closing object, else None."""
+    if isinstance(values, dict) and set(values) == {'count', 'sha256'}:
+        return values['count'], values['sha256']
+    return None
+
+
+def _csv_trailer(values):
+    """(count, sha256) if a CSV row is the export's "# count=..." line, else None."""
+    if len(values) != 1 or not values[0].startswith('# count='):
+        return None
+    fields = dict(part.split('=', 1) for part in values[0][2:].split() if '=' in part)
+    try:
+        return int(fields['count']), fields['sha256']
+    except (KeyError, ValueError):
+        return None
+
+
+def _ndjson_rows(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            values = json.loads(line)
+        except ValueError as exc:
+            yield lines.number, None, {'non_field_errors': [f'Invalid JSON: {exc}']}
+            continue
+        trailer = _json_trailer(values)
+        if trailer:
+            yield lines.number, trailer, None
+        elif not isinstance(values, dict):
+            yield lines.number, None, {'non_field_errors': ['Each line must be a JSON object.']}
+        else:
+            yield lines.number, values, None
+
+
+def _csv_rows(lines):
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() for name in header]
+    if 'title' not in header:
+        raise ImportFormatError('The CSV header has no title column.')
+    columns = [(index, name) for index, name in enumerate(header) if name in IMPORT_FIELDS]
+    start = lines.number + 1
+    for values in reader:
+        if not values:
+            start = lines.number + 1
+            continue
+        trailer = _csv_trailer(values)
+        if trailer:
+            yield lines.number, trailer, None
+        else:
+            row = {}
+            for index, name in columns:
+                value = unescape_cell(values[index]) if index < len(values) else ''
+                if value or name not in _OPTIONAL_FIELDS:
+                    row[name] = value
+            yield start, row, None
+        start = lines.number + 1
+
+
+def read_rows(stream, input_format):
+    """(line, data, error) per row of a binary stream; data is (count, sha256) for a trailer.
+
+    Returns the generator and the _Lines wrapper whose digest checks the trailer.
+    """
+    if input_format not in FORMATS:
+        raise ImportFormatError(f"Input format must be one of: {', '.join(FORMATS)}")
+    lines = _Lines(stream)
+    rows = _csv_rows(lines) if input_format == 'csv' else _ndjson_rows(lines)
+    return rows, lines
+
+
+def _insert(rows, owner, using):
+    """Insert a batch of validated rows, journaling and counting it like tasks/bulk/ does."""
+    connection = connections[using]
+    with transaction.atomic(using=using), journal.batch(using), counters.batch(using):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # Without RETURNING the new ids are unknown; save() signals record them
+            for data in rows:
+                Task(owner=owner, **data).save(using=using)
+            return
+        now = timezone.now()
+        stamp = connection.ops.adapt_datetimefield_value(now)
+        values, states = [], []
+        for data in rows:
+            row = {**_DEFAULTS, **data}
+            due_date = row['due_date']
+            values.append((
+                row['title'], row['description'], row['status'], row['priority'],
+                connection.ops.adapt_datefield_value(due_date), stamp, stamp, owner.pk,
+            ))
+            states.append(counters.TaskState(owner.pk, row['status'], row['priority'], due_date, now))
+        pks = bulk.insert_rows(Task, [*IMPORT_FIELDS, 'created_at', 'updated_at', 'owner'], values, using=using)
+        bulk.record_bulk(created=zip(pks, states), using=using)
+
+
+def import_tasks(stream, input_format, owner, dry_run=False, batch_size=None, on_error=None, using='default'):
+    """Import tasks for ``owner`` from a binary NDJSON or CSV stream.
+
+    Returns ``{"imported", "rejected", "checksum"}``: rows inserted (or that
+    would be, with dry_run), rows skipped as invalid, and the export trailer
+    check, ``"ok"``, ``"mismatch"`` or None without a trailer.
+    ``on_error(line, detail)`` is called for each rejected row. Batches commit as they fill, so rows before an error or
+    a checksum mismatch stay imported; run with dry_run first to check a file.
+    """
+    batch_size = batch_size or settings.TASK_IMPORT_BATCH_SIZE
+    rows, lines = read_rows(stream, input_format)
+    validator = TaskSerializer()
+    report = {'imported': 0, 'rejected': 0, 'checksum': None}
+
+    def reject(line, detail):
+        report['rejected'] += 1
+        if on_error:
+            on_error(line, detail)
+
+    batch = []
+    for line, data, error in rows:
+        if report['checksum'] is not None:
+            # The count/checksum line must come last; later rows are not covered
+            report['checksum'] = 'mismatch'
+        if error is not None:
+            reject(line, error)
+            continue
+        if isinstance(data, tuple):
+            expected_count, expected_digest = data
+            seen = report['imported'] + report['rejected'] + len(batch)
+            matches = expected_count == seen and expected_digest == lines.digest.hexdigest()
+            report['checksum'] = 'ok' if matches and report['checksum'] is None else 'mismatch'
+            continue
+        try:
+            batch.append(validator.run_validation(data))
+        except serializers.ValidationError as exc:
+            reject(line, exc.detail)
+            continue
+        if len(batch) >= batch_size:
+            if not dry_run:
+                _insert(batch, owner, using)
+            report['imported'] += len(batch)
+            batch = []
+    if batch:
+        if not dry_run:
+            _insert(batch, owner, using)
+        report['imported'] += len(batch)
+    return report
@@ -0,0 +1,128 @@
+import contextvars
+import itertools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import bulk, notify
+from .events import TaskChange, hub
+from .models import TaskJournalEntry, TaskOwnerVersion
+
+
+_recorded = itertools.count(1)
+_batch = contextvars.ContextVar('task_journal_batch', default=None)
+
+
+@contextmanager
+def batch(using='default'):
+    """Collect every record_changes() call in the block into one journal write.
+
+    For bulk operations whose per-object save/delete signals would otherwise
+    insert one journal entry each. Use inside the transaction; nothing is
+    recorded if the block raises.
+    """
+    pending = []
+    token = _batch.set((using, pending))
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    if pending:
+        record_changes(pending, using=using)
+
+
+def record_changes(changes, using='default'):
+    """Append changes to the journal and publish them to streams on commit.
+
+    Call inside the transaction that made the changes, so the journal and
+    the tasks table can never disagree.
+    """
+    current = _batch.get()
+    if current is not None and current[0] == using:
+        current[1].extend(changes)
+        return []
+    if not changes:
+        return []
+    connection = connections[using]
+    if len(changes) == 1 or not connection.features.can_return_rows_from_bulk_insert:
+        entries = [TaskJournalEntry(op=c.op, task_id=c.task_id, owner_id=c.owner_id) for c in changes]
+        for entry in entries:
+            entry.save(using=using)
+        seqs = [entry.seq for entry in entries]
+    else:
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        seqs = bulk.insert_rows(
+            TaskJournalEntry, ['op', 'task_id', 'owner_id', 'created_at'],
+            [(c.op, c.task_id, c.owner_id, now) for c in changes], using=using,
+        )
+    published = [change._replace(seq=seq) for change, seq in zip(changes, seqs)]
+
+    versions = {}
+    for change in published:
+        versions[change.owner_id] = max(change.seq, versions.get(change.owner_id, 0))
+    TaskOwnerVersion.objects.using(using).bulk_create(
+        [TaskOwnerVersion(owner_id=owner_id, seq=seq) for owner_id, seq in versions.items()],
+        update_conflicts=True,
+        unique_fields=['owner_id'],
+        update_fields=['seq'],
+    )
+
+    # On PostgreSQL every process's listener, this one included, publishes
+    # them once the transaction commits; on SQLite every process's poller does
+    relayed = notify.relayed(using)
+    if notify.enabled(using):
+        notify.send(published, using=using)
+
+    def publish():
+        if not relayed:
+            for change in published:
+                hub.publish(change)
+        every = settings.TASK_JOURNAL_COMPACT_EVERY
+        if next(_recorded) % every == 0 or len(published) >= every:
+            compact(using=using)
+
+    # Streams must only see committed rows, so wait for the transaction
+    transaction.on_commit(publish, using=using, robust=True)
+    return published
+
+
+def compact(using='default', keep=None):
+    """Drop all but the newest ``keep`` entries; the latest entry always survives."""
+    keep = max(1, settings.TASK_JOURNAL_MAX_ENTRIES if keep is None else keep)
+    journal = TaskJournalEntry.objects.using(using)
+    latest = journal.aggregate(latest=Max('seq'))['latest']
+    if latest is None:
+        return 0
+    deleted, _ = journal.filter(seq__lte=latest - keep).delete()
+    return deleted
+
+
+def latest_seq(using='default'):
+    """Global task version: compaction always keeps the newest entry."""
+    return TaskJournalEntry.objects.using(using).aggregate(latest=Max('seq'))['latest'] or 0
+
+
+def owner_version(owner_id, using='default'):
+    """Version of one owner's tasks; 0 if they never changed."""
+    row = TaskOwnerVersion.objects.using(using).filter(owner_id=owner_id).values_list('seq', flat=True).first()
+    return row or 0
+
+
+def can_resume(last_seq, using='default'):
+    """True if every entry after last_seq is still in the journal."""
+    bounds = TaskJournalEntry.objects.using(using).aggregate(first=Min('seq'), latest=Max('seq'))
+    if bounds['first'] is None:
+        return False
+    return bounds['first'] - 1 <= last_seq <= bounds['latest']
+
+
+def changes_since(last_seq, owner_id=None, using='default'):
+    """Journal entries after last_seq, oldest first, as TaskChange tuples."""
+    entries = TaskJournalEntry.objects.using(using).filter(seq__gt=last_seq)
+    if owner_id is not None:
+        entries = entries.filter(owner_id=owner_id)
+    rows = entries.order_by('seq').values_list('op', 'task_id', 'owner_id', 'seq')
+    return [TaskChange(*row) for row in rows]
@@ -0,0 +1,91 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myapp.benchmarks import DATA_PROFILES, SCENARIOS, compare, isolated_database
+
+
+class Command(BaseCommand):
+    help = "Run task API benchmarks against a throwaway test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default: all). Available: {', '.join(SCENARIOS)}")
+        parser.add_argument('--tasks', type=int, default=5000, help='Rows to seed per scenario.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the best is reported.')
+        parser.add_argument(
+            '--profile', choices=list(DATA_PROFILES), default='small',
+            help='Data set for the api scenario: ' + ', '.join(
+                f'{name} ({users:,} users x {tasks:,} tasks)' for name, (users, tasks) in DATA_PROFILES.items()
+            ),
+        )
+        parser.add_argument('--samples', type=int, default=50, help='Requests per case in the api scenario.')
+        parser.add_argument('--json', metavar='PATH', help='Write the results as JSON, e.g. to keep as a baseline.')
+        parser.add_argument('--baseline', metavar='PATH', help='Compare with an earlier --json report; fails on regressions.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed median slowdown against the baseline, as a fraction (default: 0.25).',
+        )
+        parser.add_argument(
+            '--min-delta', type=float, default=1.0,
+            help='Median slowdowns below this many ms are never regressions (default: 1.0).',
+        )
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}")
+        baseline = self.load_baseline(options['baseline'])
+
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'profile': options['profile'],
+                'samples': options['samples'],
+                'tasks': options['tasks'],
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'scenarios': {},
+        }
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            with isolated_database():
+                results = SCENARIOS[name](options, self.stdout.write)
+            # Only scenarios that return per-case results end up in the report
+            if results:
+                report['scenarios'][name] = results
+
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['json']}")
+        if baseline is not None:
+            self.check_regressions(baseline, report, options)
+
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {path}: {exc}")
+
+    def check_regressions(self, baseline, report, options):
+        for key in ('profile', 'database'):
+            if baseline.get('meta', {}).get(key) != report['meta'][key]:
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline {key} is {baseline.get('meta', {}).get(key)!r}, this run's is {report['meta'][key]!r}"
+                ))
+        regressions = compare(baseline, report, options['tolerance'], options['min_delta'])
+        for line in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {line}"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
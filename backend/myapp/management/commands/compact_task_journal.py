@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from myapp import journal
+
+
+class Command(BaseCommand):
+    help = "Trim the task change journal to its newest entries (TASK_JOURNAL_MAX_ENTRIES by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=None, help='Number of newest entries to keep.')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        deleted = journal.compact(using=options['database'], keep=options['keep'])
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} journal entries."))
@@ -0,0 +1,70 @@
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import imports
+from myapp.export import FORMATS
+
+
+class Command(BaseCommand):
+    help = "Import tasks from an NDJSON or CSV file (e.g. a tasks/export/ download), validated like the API."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read, or - for standard input.')
+        parser.add_argument('--owner', required=True, metavar='USERNAME', help='User who will own the tasks.')
+        parser.add_argument(
+            '--format', choices=list(FORMATS),
+            help='Input format (default: from the file extension, else ndjson).',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row but insert nothing.')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default: TASK_IMPORT_BATCH_SIZE).')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        path = options['path']
+        input_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        try:
+            owner = User.objects.using(options['database']).get(username=options['owner'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user: {options['owner']}")
+
+        def on_error(line, detail):
+            self.stderr.write(f"line {line}: {detail}")
+
+        started = time.perf_counter()
+        try:
+            stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        try:
+            report = imports.import_tasks(
+                stream, input_format, owner,
+                dry_run=options['dry_run'],
+                batch_size=options['batch_size'],
+                on_error=on_error,
+                using=options['database'],
+            )
+        except imports.ImportFormatError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        elapsed = time.perf_counter() - started
+
+        rows = report['imported'] + report['rejected']
+        rate = f" ({rows / elapsed:,.0f} rows/s)" if rows and elapsed else ""
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(f"{verb} {report['imported']:,} task(s) in {elapsed:.1f}s{rate}.")
+        if report['checksum'] == 'ok':
+            self.stdout.write('Row count and checksum match the export.')
+        elif report['checksum'] == 'mismatch':
+            self.stderr.write(self.style.ERROR('Row count or checksum does not match: the file is incomplete or was edited.'))
+        if report['rejected']:
+            raise CommandError(f"{report['rejected']:,} row(s) rejected")
+        if report['checksum'] == 'mismatch':
+            raise CommandError('Checksum mismatch')
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import counters
+
+
+class Command(BaseCommand):
+    help = "Recount every owner's TaskCounter row from the tasks table and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report drifted owners; exit non-zero if any.')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        drifted = counters.rebuild(check=options['check'], using=options['database'])
+        if drifted:
+            owners = ', '.join(str(owner_id) for owner_id in drifted)
+            if options['check']:
+                raise CommandError(f"{len(drifted)} owner(s) with drifted counters: {owners}")
+            self.stdout.write(self.style.WARNING(f"Corrected drifted counters for owner(s): {owners}"))
+        self.stdout.write(self.style.SUCCESS("Task counters rebuilt." if not options['check'] else "Task counters match."))
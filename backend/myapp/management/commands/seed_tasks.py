@@ -0,0 +1,124 @@
+import argparse
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import seeding
+from myapp.models import Task
+
+
+def weights(choices):
+    """argparse type for "value=weight,..." over the given model choices."""
+    valid = [value for value, _ in choices]
+
+    def parse(text):
+        parsed = {}
+        for item in text.split(','):
+            value, sep, weight = item.partition('=')
+            value = value.strip()
+            if value not in valid:
+                raise argparse.ArgumentTypeError(f"unknown value {value!r}; choose from {', '.join(valid)}")
+            try:
+                parsed[value] = float(weight) if sep else 1.0
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"weight for {value!r} is not a number")
+            if parsed[value] < 0:
+                raise argparse.ArgumentTypeError(f"weight for {value!r} is negative")
+        if not any(parsed.values()):
+            raise argparse.ArgumentTypeError('at least one weight must be positive')
+        return parsed
+
+    return parse
+
+
+def int_range(text):
+    """argparse type for "low:high" (inclusive)."""
+    low, sep, high = text.partition(':')
+    try:
+        bounds = (int(low), int(high if sep else low))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected LOW:HIGH, got {text!r}")
+    if bounds[0] > bounds[1]:
+        raise argparse.ArgumentTypeError(f"{text!r}: LOW is greater than HIGH")
+    return bounds
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users and tasks with bulk inserts; the same --seed gives the same data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='New users to create (default: 10).')
+        parser.add_argument('--tasks-per-user', type=int, default=1000, help='Tasks per owner (default: 1000).')
+        parser.add_argument(
+            '--owner', action='append', default=[], metavar='USERNAME',
+            help='Also seed tasks for this existing user; repeatable.',
+        )
+        parser.add_argument(
+            '--status', type=weights(Task.STATUS_CHOICES), metavar='VALUE=WEIGHT,...',
+            help='Status distribution, e.g. pending=5,in-progress=3,completed=2 (default: uniform).',
+        )
+        parser.add_argument(
+            '--priority', type=weights(Task.PRIORITY_CHOICES), metavar='VALUE=WEIGHT,...',
+            help='Priority distribution, e.g. low=2,medium=5,high=3 (default: uniform).',
+        )
+        parser.add_argument(
+            '--due-days', type=int_range, default=(-30, 60), metavar='LOW:HIGH',
+            help='Due dates are uniform over this many days from today (default: -30:60).',
+        )
+        parser.add_argument('--no-due-ratio', type=float, default=0.2, help='Share of tasks without a due date (default: 0.2).')
+        parser.add_argument(
+            '--description-words', type=int_range, default=(0, 40), metavar='LOW:HIGH',
+            help='Description length in words (default: 0:40).',
+        )
+        parser.add_argument('--username-prefix', default='seed', help='New users are named PREFIX0, PREFIX1, ... (default: seed).')
+        parser.add_argument('--password', default='password', help='Password for every new user (default: password).')
+        parser.add_argument('--commit-every', type=int, default=100_000, help='Tasks per transaction (default: 100000).')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0).')
+        parser.add_argument(
+            '--no-journal', action='store_true',
+            help="Skip the change journal (faster). Only for databases no client has loaded yet: "
+                 "ETags and open streams will not see the new tasks.",
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['no_due_ratio'] <= 1:
+            raise CommandError('--no-due-ratio must be between 0 and 1')
+        if options['description_words'][0] < 0:
+            raise CommandError('--description-words cannot be negative')
+        if options['commit_every'] < 1:
+            raise CommandError('--commit-every must be at least 1')
+        owners = list(User.objects.using(options['database']).filter(username__in=options['owner']).order_by('id'))
+        missing = set(options['owner']) - {owner.username for owner in owners}
+        if missing:
+            raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+
+        total = (options['users'] + len(owners)) * options['tasks_per_user']
+        started = time.perf_counter()
+
+        def progress(created):
+            self.stdout.write(f"{created:,} / {total:,} tasks")
+
+        seeding.seed(
+            users=options['users'],
+            tasks_per_user=options['tasks_per_user'],
+            owners=owners,
+            status_weights=options['status'],
+            priority_weights=options['priority'],
+            due_days=options['due_days'],
+            no_due_ratio=options['no_due_ratio'],
+            description_words=options['description_words'],
+            username_prefix=options['username_prefix'],
+            password=options['password'],
+            commit_every=options['commit_every'],
+            record=not options['no_journal'],
+            seed=options['seed'],
+            using=options['database'],
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+        rate = f" ({total / elapsed * 60:,.0f} tasks/min)" if total else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['users']:,} user(s) and {total:,} task(s) in {elapsed:.1f}s{rate}."
+        ))
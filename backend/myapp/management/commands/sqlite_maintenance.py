@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Run SQLite upkeep: PRAGMA optimize (refreshes query planner statistics) and a WAL "
+        "checkpoint (folds the write-ahead log back into the database file). Run it periodically, e.g. hourly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--checkpoint', default='TRUNCATE', choices=['PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'],
+            help='wal_checkpoint mode; TRUNCATE also resets the WAL file to zero bytes (default).',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Database '{options['database']}' is not SQLite.")
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA optimize')
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            if journal_mode != 'wal':
+                self.stdout.write(f"Journal mode is {journal_mode}; no checkpoint needed.")
+            else:
+                cursor.execute(f"PRAGMA wal_checkpoint({options['checkpoint']})")
+                busy, log_frames, checkpointed = cursor.fetchone()
+                if busy:
+                    self.stdout.write(self.style.WARNING(
+                        f"Checkpoint could not finish while readers were active ({checkpointed}/{log_frames} frames)."
+                    ))
+                else:
+                    self.stdout.write(f"Checkpointed {checkpointed}/{log_frames} WAL frames.")
+        self.stdout.write(self.style.SUCCESS("SQLite maintenance complete."))
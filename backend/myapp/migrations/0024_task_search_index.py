@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:48
+
+import django.db.models.deletion
+import myapp.models
+from django.db import migrations, models
+
+# The FTS5 index as this migration creates it; frozen here rather than
+# imported, so later changes to myapp.search leave the migration alone
+FTS_SQL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS myapp_task_fts USING fts5(
+        title, description,
+        content='myapp_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS myapp_task_fts_ai AFTER INSERT ON myapp_task BEGIN
+        INSERT INTO myapp_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS myapp_task_fts_ad AFTER DELETE ON myapp_task BEGIN
+        INSERT INTO myapp_task_fts(myapp_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS myapp_task_fts_au AFTER UPDATE OF title, description ON myapp_task BEGIN
+        INSERT INTO myapp_task_fts(myapp_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO myapp_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO myapp_task_fts(myapp_task_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS myapp_task_fts_ai",
+    "DROP TRIGGER IF EXISTS myapp_task_fts_ad",
+    "DROP TRIGGER IF EXISTS myapp_task_fts_au",
+    "DROP TABLE IF EXISTS myapp_task_fts",
+]
+
+
+def has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp._fts5_probe")
+            return True
+        except Exception:
+            return False
+
+
+def create_fts_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or not has_fts5(connection):
+        return
+    for sql in FTS_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_FTS_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0023_task_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskSearchIndex',
+            fields=[
+                ('task', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='myapp.task')),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('document', myapp.models.SearchDocumentField(db_column='myapp_task_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'myapp_task_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
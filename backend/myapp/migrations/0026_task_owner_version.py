@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0025_task_journal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskOwnerVersion',
+            fields=[
+                ('owner_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('seq', models.BigIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:09
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def stat_aggregates(today):
+    # The TaskCounter columns as this migration defines them (see myapp.stats)
+    def day_start(day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    counts = {'total': Count('id')}
+    for status in ('pending', 'in-progress', 'completed'):
+        counts['status_' + status.replace('-', '_')] = Count('id', filter=Q(status=status))
+    for priority in ('low', 'medium', 'high'):
+        counts['priority_' + priority] = Count('id', filter=Q(priority=priority))
+    counts['due_today'] = Count('id', filter=Q(due_date=today))
+    counts['due_this_week'] = Count('id', filter=Q(due_date__gte=today, due_date__lte=today + timedelta(days=6)))
+    counts['overdue'] = Count('id', filter=Q(due_date__lt=today) & ~Q(status='completed'))
+    for index in range(7):
+        day = today - timedelta(days=6 - index)
+        counts[f'activity_{index}'] = Count('id', filter=Q(
+            updated_at__gte=day_start(day), updated_at__lt=day_start(day + timedelta(days=1)),
+        ))
+    return counts
+
+
+def populate_counters(apps, schema_editor):
+    Task = apps.get_model('myapp', 'Task')
+    TaskCounter = apps.get_model('myapp', 'TaskCounter')
+    alias = schema_editor.connection.alias
+    today = timezone.localdate()
+    rows = Task.objects.using(alias).order_by().values('owner_id').annotate(**stat_aggregates(today))
+    TaskCounter.objects.using(alias).bulk_create([TaskCounter(as_of=today, **row) for row in rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0026_task_owner_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('owner_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('as_of', models.DateField()),
+                ('total', models.IntegerField(default=0)),
+                ('status_pending', models.IntegerField(default=0)),
+                ('status_in_progress', models.IntegerField(default=0)),
+                ('status_completed', models.IntegerField(default=0)),
+                ('priority_low', models.IntegerField(default=0)),
+                ('priority_medium', models.IntegerField(default=0)),
+                ('priority_high', models.IntegerField(default=0)),
+                ('due_today', models.IntegerField(default=0)),
+                ('due_this_week', models.IntegerField(default=0)),
+                ('overdue', models.IntegerField(default=0)),
+                ('activity_0', models.IntegerField(default=0)),
+                ('activity_1', models.IntegerField(default=0)),
+                ('activity_2', models.IntegerField(default=0)),
+                ('activity_3', models.IntegerField(default=0)),
+                ('activity_4', models.IntegerField(default=0)),
+                ('activity_5', models.IntegerField(default=0)),
+                ('activity_6', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
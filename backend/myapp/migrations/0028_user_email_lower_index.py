@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # auth.User is not ours to add Meta.indexes to, so the expression index
+    # behind myapp.backends.users_with_email is plain SQL (SQLite and PostgreSQL)
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('myapp', '0027_task_counter'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_lower_idx ON auth_user (LOWER(email));',
+            'DROP INDEX auth_user_email_lower_idx;',
+        ),
+    ]
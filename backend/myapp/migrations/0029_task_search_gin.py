@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def search_index():
+    # Imported lazily: django.contrib.postgres needs psycopg installed
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(SearchVector('title', 'description', config='simple'), name='myapp_task_search_gin')
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('myapp', 'Task'), search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('myapp', 'Task'), search_index())
+
+
+class Migration(migrations.Migration):
+    # The tsvector GIN index behind search on PostgreSQL; a no-op on SQLite,
+    # which searches through the FTS5 table from 0024
+
+    dependencies = [
+        ('myapp', '0028_user_email_lower_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Lookup
 from django.contrib.auth.models import User
 
 
@@ -30,8 +31,156 @@ class Task(models.Model):
     due_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
+    # No standalone FK index: every owner index below leads with owner_id
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks', db_index=False)
+
+    class Meta:
+        # One index per filter shape of the tasks list, each ending in updated_at
+        # so ORDER BY updated_at DESC, id DESC (id is the implicit rowid suffix)
+        # walks the index instead of sorting in a temp B-tree.
+        indexes = [
+            models.Index(fields=['owner', 'updated_at'], name='task_owner_updated_idx'),
+            models.Index(fields=['owner', 'status', 'updated_at'], name='task_owner_status_idx'),
+            models.Index(fields=['owner', 'priority', 'updated_at'], name='task_owner_priority_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+            models.Index(fields=['status', 'updated_at'], name='task_status_updated_idx'),
+            models.Index(fields=['priority', 'updated_at'], name='task_priority_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.status}, {self.priority})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The stored values, for counters.loaded_state() on rows loaded under select_for_update()
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep the row and the post_save bookkeeping (journal, counters) in one transaction
+        using = kwargs.get('using') or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class TaskJournalEntry(models.Model):
+    """Append-only log of Task changes.
+
+    seq is strictly increasing and never reused, and doubles as the SSE event
+    id so a reconnecting stream can resume after the last entry it saw. Task
+    and owner are plain ids because entries outlive deleted rows.
+    """
+
+    OP_CREATED = 'created'
+    OP_UPDATED = 'updated'
+    OP_DELETED = 'deleted'
+
+    OP_CHOICES = [
+        (OP_CREATED, 'Created'),
+        (OP_UPDATED, 'Updated'),
+        (OP_DELETED, 'Deleted'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    task_id = models.BigIntegerField()
+    owner_id = models.IntegerField()
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner_id', 'seq'], name='task_journal_owner_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.op} task {self.task_id}"
+
+
+
+class TaskOwnerVersion(models.Model):
+    """Journal seq of the latest change to each owner's tasks.
+
+    Bumped in the same transaction as the journal entry, so it changes on
+    every write and delete and is a one-row lookup for conditional GETs.
+    The owner is a plain id: the row must survive (and be writable while)
+    the user is being deleted.
+    """
+
+    owner_id = models.IntegerField(primary_key=True)
+    seq = models.BigIntegerField()
+
+    def __str__(self):
+        return f"owner {self.owner_id} @ {self.seq}"
+
+
+class TaskCounter(models.Model):
+    """Denormalized tasks/stats/ numbers for one owner, kept current by Task writes.
+
+    Status, priority and total counts are exact at all times. The due and
+    activity buckets are relative to ``as_of``; the first write or read on a
+    later day recounts the owner's row. Column names match stats.STAT_COLUMNS.
+    """
+
+    owner_id = models.IntegerField(primary_key=True)
+    as_of = models.DateField()
+    total = models.IntegerField(default=0)
+    status_pending = models.IntegerField(default=0)
+    status_in_progress = models.IntegerField(default=0)
+    status_completed = models.IntegerField(default=0)
+    priority_low = models.IntegerField(default=0)
+    priority_medium = models.IntegerField(default=0)
+    priority_high = models.IntegerField(default=0)
+    due_today = models.IntegerField(default=0)
+    due_this_week = models.IntegerField(default=0)
+    overdue = models.IntegerField(default=0)
+    # Tasks last updated on each of the seven days up to as_of, oldest first
+    activity_0 = models.IntegerField(default=0)
+    activity_1 = models.IntegerField(default=0)
+    activity_2 = models.IntegerField(default=0)
+    activity_3 = models.IntegerField(default=0)
+    activity_4 = models.IntegerField(default=0)
+    activity_5 = models.IntegerField(default=0)
+    activity_6 = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"owner {self.owner_id}: {self.total} tasks as of {self.as_of}"
+
+
+class SearchDocumentField(models.TextField):
+    """The FTS5 hidden column named after its table; only supports __match."""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class TaskSearchIndex(models.Model):
+    """Read-only view of the SQLite FTS5 index over Task title/description.
+
+    The virtual table and its sync triggers are created by migration (see
+    myapp.search); Django never writes to it directly.
+    """
+
+    task = models.OneToOneField(
+        Task,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_index',
+    )
+    title = models.TextField()
+    description = models.TextField()
+    document = SearchDocumentField(db_column='myapp_task_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'myapp_task_fts'
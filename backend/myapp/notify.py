@@ -0,0 +1,198 @@
+"""Task change notifications across processes: LISTEN/NOTIFY on PostgreSQL, journal polling on SQLite."""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from .events import TaskChange, hub
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'myapp_task_changes'
+
+# NOTIFY payloads must stay under 8000 bytes; larger batches are split
+MAX_PAYLOAD = 7000
+
+# Seconds to wait for LISTEN before a stream takes its snapshot anyway
+LISTEN_TIMEOUT = 5
+RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+_OPS = {'created': 'c', 'updated': 'u', 'deleted': 'd'}
+_OP_NAMES = {code: op for op, code in _OPS.items()}
+
+
+def enabled(using='default'):
+    """True when changes on this database travel through NOTIFY."""
+    connection = connections[using]
+    if not settings.TASK_CHANGES_NOTIFY or connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    # The listener relies on psycopg 3's notifies() generator
+    return is_psycopg3
+
+
+def polling(using='default'):
+    """True when this process's hub is fed by a journal Poller (SQLite)."""
+    connection = connections[using]
+    if settings.TASK_CHANGES_POLL_SECONDS <= 0 or connection.vendor != 'sqlite':
+        return False
+    # An in-memory database (e.g. the test database) is never shared with another process
+    return not connection.is_in_memory_db()
+
+
+def relayed(using='default'):
+    """True when streams get changes from a listener or poller rather than from the writer."""
+    return enabled(using) or polling(using)
+
+
+def encode(changes):
+    """Payloads for pg_notify(), each a few changes as "c12:3:45" (op, task, owner, seq)."""
+    payloads, current, size = [], [], 0
+    for change in changes:
+        item = f'{_OPS[change.op]}{change.task_id}:{change.owner_id}:{change.seq}'
+        if current and size + len(item) + 1 > MAX_PAYLOAD:
+            payloads.append(' '.join(current))
+            current, size = [], 0
+        current.append(item)
+        size += len(item) + 1
+    if current:
+        payloads.append(' '.join(current))
+    return payloads
+
+
+def decode(payload):
+    changes = []
+    for item in payload.split():
+        task_id, owner_id, seq = item[1:].split(':')
+        changes.append(TaskChange(_OP_NAMES[item[0]], int(task_id), int(owner_id), int(seq)))
+    return changes
+
+
+def send(changes, using='default'):
+    """Queue changes for delivery on commit; call inside the writing transaction."""
+    with connections[using].cursor() as cursor:
+        for payload in encode(changes):
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+
+
+class Listener:
+    """Background thread relaying NOTIFYs on CHANNEL to the hub."""
+
+    thread_name = 'task-change-listener'
+
+    def __init__(self, using='default'):
+        self.using = using
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start listening (once per process) and wait until LISTEN is active."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+                self._thread.start()
+        if not self.ready.wait(LISTEN_TIMEOUT):
+            logger.warning('Task change listener is not connected yet; streams may miss changes')
+
+    def _run(self):
+        import psycopg
+
+        # Django's connection parameters (minus pool settings), but a dedicated
+        # connection: a pooled one would be handed back between requests
+        params = connections[self.using].get_connection_params()
+        delay = RECONNECT_DELAY
+        connected_before = False
+        while True:
+            try:
+                with psycopg.connect(**params, autocommit=True) as conn:
+                    conn.execute(f'LISTEN {CHANNEL}')
+                    if connected_before:
+                        # Anything sent while we were away is lost
+                        hub.resync()
+                    connected_before = True
+                    delay = RECONNECT_DELAY
+                    self.ready.set()
+                    for notification in conn.notifies():
+                        for change in decode(notification.payload):
+                            hub.publish(change)
+            except Exception:
+                logger.exception('Task change listener lost its connection; reconnecting in %ss', delay)
+            self.ready.clear()
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+class Poller(Listener):
+    """Background thread relaying new journal entries to the hub.
+
+    Only for SQLite, where writers are serialized, so journal seqs commit in
+    order and "everything after the last seq seen" misses nothing. Changes
+    made by this process arrive the same way, so each is published once.
+    """
+
+    thread_name = 'task-change-poller'
+
+    def _run(self):
+        from . import journal
+
+        last = None
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                if last is None:
+                    # Streams that subscribe from now on take their snapshot after this point
+                    last = journal.latest_seq(using=self.using)
+                    self.ready.set()
+                last = self.poll(last)
+                delay = RECONNECT_DELAY
+                time.sleep(settings.TASK_CHANGES_POLL_SECONDS)
+            except Exception:
+                logger.exception('Task change poller failed; retrying in %ss', delay)
+                connections[self.using].close()
+                if last is not None:
+                    hub.resync()
+                last = None
+                self.ready.clear()
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def poll(self, last):
+        """Publish the journal entries after seq ``last``; returns the newest seq seen."""
+        from . import journal
+
+        changes = journal.changes_since(last, using=self.using)
+        if not changes:
+            return last
+        if changes[0].seq > last + 1 and not journal.can_resume(last, using=self.using):
+            # Compacted before we read it
+            hub.resync()
+        else:
+            for change in changes:
+                hub.publish(change)
+        return changes[-1].seq
+
+
+listener = Listener()
+poller = Poller()
+
+
+def relay(using='default'):
+    """The thread that feeds this process's hub, or None when writers publish directly."""
+    if enabled(using):
+        return listener
+    if polling(using):
+        return poller
+    return None
+
+
+def ensure_listening():
+    """Called before a stream subscribes; a no-op unless changes are relayed."""
+    current = relay()
+    if current is not None and not current.ready.is_set():
+        current.start()
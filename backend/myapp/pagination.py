@@ -0,0 +1,130 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPaginator:
+    """Cursor (keyset) pagination over a fixed, unique ordering.
+
+    Each cursor is an opaque token holding the ordering values of the row at
+    the page boundary, so fetching any page is a range scan on the ordering
+    index instead of an OFFSET that walks every earlier row.
+    """
+
+    default_limit = 50
+    max_limit = 200
+
+    def __init__(self, ordering, default_limit=None, max_limit=None):
+        # ordering must end in a unique column (e.g. '-id') to be a total order
+        self.ordering = tuple(ordering)
+        self.fields = [(o.lstrip('-'), o.startswith('-')) for o in self.ordering]
+        if default_limit is not None:
+            self.default_limit = default_limit
+        if max_limit is not None:
+            self.max_limit = max_limit
+
+    # ---------- params ----------
+
+    def get_limit(self, params):
+        try:
+            limit = int(params.get('limit') or self.default_limit)
+        except (TypeError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def encode_cursor(self, row, direction):
+        values = [_encode_value(_row_value(row, name)) for name, _ in self.fields]
+        raw = json.dumps({'d': direction, 'p': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = data['d'], data['p']
+        except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+            raise InvalidCursor('Invalid cursor')
+        if direction not in ('n', 'p') or not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor('Invalid cursor')
+        return direction, values
+
+    # ---------- paging ----------
+
+    def _beyond(self, values, backwards):
+        """Q matching rows strictly after (or before) the given position."""
+        clauses = []
+        for i, (name, desc) in enumerate(self.fields):
+            lookup = 'gt' if desc == backwards else 'lt'
+            parts = {n: values[j] for j, (n, _) in enumerate(self.fields[:i])}
+            parts[f'{name}__{lookup}'] = values[i]
+            clauses.append(Q(**parts))
+        return reduce(or_, clauses)
+
+    def get_page_queryset(self, qs, params):
+        """Apply the cursor and ordering; returns (queryset, limit, values, backwards).
+
+        The queryset is sliced to limit + 1 rows so one extra row tells us
+        whether another page exists.
+        """
+        limit = self.get_limit(params)
+        token = params.get('cursor')
+        direction, values = self.decode_cursor(token) if token else ('n', None)
+        backwards = direction == 'p'
+
+        if values is not None:
+            try:
+                qs = qs.filter(self._beyond(values, backwards))
+            except (ValidationError, TypeError, ValueError):
+                raise InvalidCursor('Invalid cursor')
+        if backwards:
+            qs = qs.order_by(*[name if desc else f'-{name}' for name, desc in self.fields])
+        else:
+            qs = qs.order_by(*self.ordering)
+        return qs[:limit + 1], limit, values, backwards
+
+    def paginate(self, qs, params):
+        """Return (rows, next_cursor, previous_cursor) for one page of qs."""
+        qs, limit, values, backwards = self.get_page_queryset(qs, params)
+        rows = list(qs)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = prev_cursor = None
+        if rows and backwards:
+            next_cursor = self.encode_cursor(rows[-1], 'n')
+            prev_cursor = self.encode_cursor(rows[0], 'p') if has_more else None
+        elif rows:
+            next_cursor = self.encode_cursor(rows[-1], 'n') if has_more else None
+            prev_cursor = self.encode_cursor(rows[0], 'p') if values is not None else None
+        return rows, next_cursor, prev_cursor
+
+    def get_paginated_data(self, results, next_cursor, prev_cursor):
+        return {
+            'next': next_cursor,
+            'previous': prev_cursor,
+            'results': results,
+        }
+
+
+def _row_value(row, name):
+    if isinstance(row, dict):
+        return row[name]
+    return getattr(row, name)
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,136 @@
+import re
+from functools import lru_cache
+
+from django.db import connections, transaction
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+
+FTS_TABLE = 'myapp_task_fts'
+SEARCH_RANK = 'search_rank'
+
+# PostgreSQL: GIN index over the same tsvector expression the search filters
+# on. 'simple' neither stems nor drops stop words, like the FTS5 tokenizer.
+PG_SEARCH_CONFIG = 'simple'
+PG_SEARCH_INDEX = 'myapp_task_search_gin'
+
+# External-content FTS5 index over myapp_task, kept in sync by triggers so
+# bulk_create / queryset.update() / raw SQL writes are indexed too. Migration
+# 0024 installs a copy of this SQL. Any migration that remakes myapp_task on
+# SQLite (AlterField etc.) drops the triggers; restore_sqlite_fts() puts them
+# back after migrate, and check_search_triggers flags a database without them.
+_SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='myapp_task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON myapp_task BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON myapp_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON myapp_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    # Index whatever rows already exist
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+FTS_TRIGGERS = [f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+
+
+def missing_sqlite_fts_triggers(connection):
+    """The sync triggers missing from a database that has the FTS5 index."""
+    if connection.vendor != 'sqlite':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)", [FTS_TABLE, *FTS_TRIGGERS],
+        )
+        found = {name for name, in cursor.fetchall()}
+    if FTS_TABLE not in found:
+        return []
+    return [name for name in FTS_TRIGGERS if name not in found]
+
+
+def restore_sqlite_fts(using='default', **kwargs):
+    """post_migrate receiver: recreate dropped triggers and reindex the tasks."""
+    connection = connections[using]
+    if missing_sqlite_fts_triggers(connection):
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            for sql in _SQLITE_FTS_SQL:
+                cursor.execute(sql)
+    # Migrations may have created the index since it was last probed
+    _probe_fts.cache_clear()
+
+
+def pg_search_vector():
+    # Imported lazily: django.contrib.postgres needs psycopg installed
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector('title', 'description', config=PG_SEARCH_CONFIG)
+
+
+@lru_cache(maxsize=None)
+def _probe_fts(alias, name):
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def fts_available(alias='default'):
+    # Keyed on the database NAME as well, so the test database is probed separately
+    return _probe_fts(alias, str(connections[alias].settings_dict['NAME']))
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word is a quoted prefix term."""
+    terms = re.findall(r'\w+', text or '')
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def pg_tsquery(text):
+    """Turn free text into a raw tsquery: every word is a prefix term, all required."""
+    terms = re.findall(r'[^\W_]+', text or '')
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _pg_search(qs, text):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    query = SearchQuery(pg_tsquery(text), config=PG_SEARCH_CONFIG, search_type='raw')
+    vector = pg_search_vector()
+    # ts_rank is a real; as double precision it survives the cursor round
+    # trip exactly. Negated so that, as with FTS5, lower ranks first.
+    rank = -Cast(SearchRank(vector, query), FloatField())
+    return qs.alias(search_document=vector).filter(search_document=query).annotate(**{SEARCH_RANK: rank})
+
+
+def search_tasks(qs, text):
+    """Filter a Task queryset by free text.
+
+    Uses the FTS5 index on SQLite and the tsvector GIN index on PostgreSQL
+    (annotating ``search_rank``, lower is better), and falls back to
+    icontains on title/description.
+    """
+    if connections[qs.db].vendor == 'postgresql' and pg_tsquery(text):
+        return _pg_search(qs, text)
+    match = fts_query(text)
+    if match and fts_available(qs.db):
+        return (
+            qs.filter(search_index__document__match=match)
+            .annotate(**{SEARCH_RANK: F('search_index__rank')})
+        )
+    return qs.filter(Q(title__icontains=text) | Q(description__icontains=text))
+
+
+def is_ranked(qs):
+    return SEARCH_RANK in qs.query.annotations
@@ -0,0 +1,125 @@
+"""Deterministic synthetic users and tasks for ``manage.py seed_tasks`` and the benchmarks."""
+import random
+import re
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import bulk, counters
+from .models import Task
+
+
+# Descriptions are drawn from these, so full-text search has realistic terms
+WORDS = (
+    'report', 'review', 'draft', 'update', 'meeting', 'client', 'budget', 'plan', 'design', 'release',
+    'invoice', 'deploy', 'fix', 'bug', 'feature', 'test', 'docs', 'onboarding', 'sprint', 'backlog',
+    'call', 'email', 'follow', 'up', 'with', 'the', 'team', 'for', 'next', 'week', 'quarter', 'roadmap',
+    'server', 'database', 'migration', 'api', 'mobile', 'web', 'customer', 'feedback', 'survey', 'hire',
+    'interview', 'contract', 'legal', 'security', 'audit', 'backup', 'monitoring', 'alert', 'dashboard',
+    'metrics', 'launch', 'campaign', 'blog', 'post', 'slides', 'demo', 'training', 'order', 'supplies',
+)
+
+DEFAULT_STATUS_WEIGHTS = {value: 1 for value, _ in Task.STATUS_CHOICES}
+DEFAULT_PRIORITY_WEIGHTS = {value: 1 for value, _ in Task.PRIORITY_CHOICES}
+
+
+def seed(
+    users=1,
+    tasks_per_user=1000,
+    owners=(),
+    status_weights=None,
+    priority_weights=None,
+    due_days=(-30, 60),
+    no_due_ratio=0.2,
+    description_words=(0, 40),
+    username_prefix='seed',
+    password='password',
+    commit_every=100_000,
+    record=True,
+    seed=0,
+    using='default',
+    progress=None,
+):
+    """Create ``users`` new users plus tasks for them and any existing ``owners``.
+
+    Every owner gets ``tasks_per_user`` tasks whose status and priority follow
+    the given weights, due a uniform number of days from today within
+    ``due_days`` (or never, with probability ``no_due_ratio``), with
+    descriptions of ``description_words`` words. The same arguments on the
+    same database produce the same rows. Tasks are committed every
+    ``commit_every`` rows; with ``record=False`` they are not journaled, which
+    is only safe on a database no client has read yet. ``progress`` is called
+    with the running task count after each commit. Returns the owners.
+    """
+    rng = random.Random(seed)
+    status_weights = status_weights or DEFAULT_STATUS_WEIGHTS
+    priority_weights = priority_weights or DEFAULT_PRIORITY_WEIGHTS
+    today = timezone.localdate()
+    due_dates = [today + timedelta(days=days) for days in range(due_days[0], due_days[1] + 1)]
+
+    owners = list(owners) + _create_users(users, username_prefix, password, using)
+    # Journaling needs the new primary keys back from the INSERT
+    record = record and connections[using].features.can_return_rows_from_bulk_insert
+
+    def tasks_for(owner):
+        statuses = rng.choices(list(status_weights), weights=list(status_weights.values()), k=tasks_per_user)
+        priorities = rng.choices(list(priority_weights), weights=list(priority_weights.values()), k=tasks_per_user)
+        for i in range(tasks_per_user):
+            yield Task(
+                title=f'Task {i} for {owner.username}',
+                description=' '.join(rng.choices(WORDS, k=rng.randint(*description_words))),
+                status=statuses[i],
+                priority=priorities[i],
+                due_date=None if rng.random() < no_due_ratio else rng.choice(due_dates),
+                owner_id=owner.pk,
+            )
+
+    pending, created = [], 0
+    for owner in owners:
+        for task in tasks_for(owner):
+            pending.append(task)
+            if len(pending) >= commit_every:
+                created += _insert(pending, record, using)
+                pending = []
+                if progress:
+                    progress(created)
+    if pending:
+        created += _insert(pending, record, using)
+        if progress:
+            progress(created)
+
+    if created and not record:
+        counters.refresh([owner.pk for owner in owners], using=using)
+    return owners
+
+
+def _create_users(count, prefix, password, using):
+    if not count:
+        return []
+    users = User.objects.using(using)
+    # Number on from the highest existing <prefix><n>, whatever else shares the prefix
+    taken = users.filter(username__regex=rf'^{re.escape(prefix)}[0-9]+$').values_list('username', flat=True)
+    start = max((int(name[len(prefix):]) + 1 for name in taken), default=0)
+    names = [f'{prefix}{start + i}' for i in range(count)]
+    # One hash shared by every seeded user: hashing is deliberately slow
+    password = make_password(password)
+    users.bulk_create(
+        [User(username=name, email=f'{name}@example.com', password=password) for name in names],
+        batch_size=5000,
+    )
+    # Looked up by name: not every backend returns the new ids from bulk_create
+    created = users.in_bulk(names, field_name='username')
+    return [created[name] for name in names]
+
+
+def _insert(tasks, record, using):
+    """One transaction: the tasks and, with record, their journal entries."""
+    with transaction.atomic(using=using):
+        # bulk_create splits this into statements of the backend's maximum size
+        Task.objects.using(using).bulk_create(tasks)
+        if record:
+            bulk.record_bulk(created=[(task.pk, counters.task_state(task)) for task in tasks], using=using)
+    return len(tasks)
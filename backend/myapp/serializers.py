@@ -1,3 +1,5 @@
+import orjson
+from django.utils import timezone
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Task
@@ -32,7 +34,126 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'owner']
 
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldset (see parse_task_fields); for representations only,
+        # as dropped fields would also be dropped from validation
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def validate_title(self, value):
         if not value or not value.strip():
             raise serializers.ValidationError("Title is required.")
         return value
+
+
+def parse_task_fields(value):
+    """The fields named by a ``?fields=a,b`` parameter, in TaskSerializer order; None for all.
+
+    id is always included: clients key tasks by it, and so do stream deltas.
+    Raises ValueError naming any unknown field.
+    """
+    names = {name.strip() for name in (value or '').split(',')} - {''}
+    if not names:
+        return None
+    unknown = names - set(TaskSerializer.Meta.fields)
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(sorted(unknown))}. "
+            f"Choose from: {', '.join(TaskSerializer.Meta.fields)}"
+        )
+    return [name for name in TaskSerializer.Meta.fields if name in names or name == 'id']
+
+
+def task_only(qs, fields=None):
+    """Load just the columns TaskSerializer(fields=fields) reads, the owner by join."""
+    qs = qs.select_related('owner') if fields is None or 'owner' in fields else qs
+    if fields is None:
+        return qs
+    columns = [name for name in fields if name != 'owner']
+    if 'owner' in fields:
+        columns += ['owner', *(f'owner__{name}' for name in UserSerializer.Meta.fields)]
+    return qs.only(*columns)
+
+
+# -------------------- FAST PATH (task lists) --------------------
+# TaskSerializer builds a field object graph per instance and, without
+# select_related, queries the owner per row. For lists we read exactly the
+# serialized columns (owner via one join) with values() and build the same
+# dicts directly. Output must stay identical to TaskSerializer.
+
+TASK_VALUE_FIELDS = [f for f in TaskSerializer.Meta.fields if f != 'owner']
+OWNER_VALUE_FIELDS = [f'owner__{f}' for f in UserSerializer.Meta.fields]
+
+
+def task_values(qs, extra=(), fields=None):
+    """Narrow a Task queryset to the columns serialize_task_values needs.
+
+    With a sparse ``fields`` list only those columns are selected (the owner
+    join only for "owner"); ``extra`` columns, e.g. the pagination keys, are
+    read but not serialized.
+    """
+    columns = TASK_VALUE_FIELDS if fields is None else [name for name in TASK_VALUE_FIELDS if name in fields]
+    if fields is None or 'owner' in fields:
+        columns = [*columns, *OWNER_VALUE_FIELDS]
+    return qs.values(*columns, *(name for name in extra if name not in columns))
+
+
+def _datetime_repr(value, tz):
+    # Mirrors DRF DateTimeField.to_representation with the ISO-8601 format
+    if not value:
+        return None
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+# Per-field twins of serialize_task_values() below, for sparse fieldsets
+_VALUE_REPRESENTATIONS = {
+    'id': lambda row, tz: row['id'],
+    'title': lambda row, tz: row['title'],
+    'description': lambda row, tz: row['description'],
+    'status': lambda row, tz: row['status'],
+    'priority': lambda row, tz: row['priority'],
+    'due_date': lambda row, tz: row['due_date'].isoformat() if row['due_date'] else None,
+    'created_at': lambda row, tz: _datetime_repr(row['created_at'], tz),
+    'updated_at': lambda row, tz: _datetime_repr(row['updated_at'], tz),
+    'owner': lambda row, tz: {name: row[f'owner__{name}'] for name in UserSerializer.Meta.fields},
+}
+
+
+def serialize_task_values(rows, fields=None):
+    """TaskSerializer(many=True, fields=fields).data for rows produced by task_values()."""
+    tz = timezone.get_current_timezone()
+    if fields is not None:
+        represent = [(name, _VALUE_REPRESENTATIONS[name]) for name in fields]
+        return [{name: to_representation(row, tz) for name, to_representation in represent} for row in rows]
+    return [
+        {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'status': row['status'],
+            'priority': row['priority'],
+            'due_date': row['due_date'].isoformat() if row['due_date'] else None,
+            'created_at': _datetime_repr(row['created_at'], tz),
+            'updated_at': _datetime_repr(row['updated_at'], tz),
+            'owner': {
+                'id': row['owner__id'],
+                'username': row['owner__username'],
+                'first_name': row['owner__first_name'],
+                'last_name': row['owner__last_name'],
+                'email': row['owner__email'],
+            },
+        }
+        for row in rows
+    ]
+
+
+def render_json(data):
+    """Encode like DRF's JSONRenderer (compact UTF-8), with orjson."""
+    content = orjson.dumps(data)
+    # JSONRenderer escapes these so the output is also valid JavaScript
+    return content.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from myproject.authentication import USER_CLAIMS, invalidate_user_claims
+
+from . import counters
+from .events import TaskChange
+from .journal import record_changes
+from .models import Task
+
+
+@receiver(pre_save, sender=Task, dispatch_uid='task_saving_state')
+def task_saving(sender, instance, using, **kwargs):
+    # The instance may predate a write committed since it was loaded; the
+    # counter delta starts from the row as it is now, locked until commit
+    if not instance._state.adding:
+        instance._loaded_values = counters.stored_values(instance.pk, using)
+
+
+@receiver(post_save, sender=Task, dispatch_uid='task_saved_publish')
+def task_saved(sender, instance, created, using, update_fields=None, **kwargs):
+    old = None if created else counters.loaded_state(instance)
+    new = counters.saved_state(instance, old, update_fields)
+    if created:
+        changes = [TaskChange('created', instance.pk, new.owner_id)]
+    elif old.owner_id != new.owner_id:
+        # Reassigned: it leaves one owner's list and joins the other's
+        changes = [TaskChange('deleted', instance.pk, old.owner_id), TaskChange('created', instance.pk, new.owner_id)]
+    else:
+        changes = [TaskChange('updated', instance.pk, new.owner_id)]
+    record_changes(changes, using=using)
+    counters.record([(old, new)], using=using)
+
+
+@receiver(pre_delete, sender=Task, dispatch_uid='task_deleting_owner')
+def task_deleting(sender, instance, using, **kwargs):
+    # Re-read and lock the row: the instance may be stale, loaded with
+    # only()/defer(), or already deleted by a concurrent request
+    values = counters.stored_values(instance.pk, using)
+    instance._loaded_values = values
+    if values is not None:
+        instance.owner_id = values['owner_id']
+
+
+@receiver(post_delete, sender=Task, dispatch_uid='task_deleted_publish')
+def task_deleted(sender, instance, using, **kwargs):
+    old = counters.loaded_state(instance)
+    if old is None:
+        return  # the row was already gone, so this DELETE removed nothing
+    record_changes([TaskChange('deleted', instance.pk, old.owner_id)], using=using)
+    counters.record([(old, None)], using=using)
+
+
+# A deactivated user's claims must stop working too
+CLAIM_FIELDS = (*USER_CLAIMS, 'is_active')
+
+
+@receiver(pre_save, sender=User, dispatch_uid='user_claims_invalidate')
+def user_claims_changed(sender, instance, using, update_fields=None, **kwargs):
+    if instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(CLAIM_FIELDS):
+        return  # e.g. last_login on every sign-in
+    stored = User.objects.using(using).filter(pk=instance.pk).values(*CLAIM_FIELDS).first()
+    if stored is None or any(stored[field] != getattr(instance, field) for field in CLAIM_FIELDS):
+        invalidate_user_claims(instance.pk)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='user_claims_deleted')
+def user_deleted(sender, instance, **kwargs):
+    invalidate_user_claims(instance.pk)
@@ -0,0 +1,95 @@
+"""Dashboard statistics for a task queryset, computed in the database."""
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Task
+
+
+ACTIVITY_DAYS = 7
+DUE_SOON_DAYS = 7
+
+STATUS_COLUMNS = {value: 'status_' + value.replace('-', '_') for value, _ in Task.STATUS_CHOICES}
+PRIORITY_COLUMNS = {value: 'priority_' + value for value, _ in Task.PRIORITY_CHOICES}
+# Oldest day first; the last column is today
+ACTIVITY_COLUMNS = [f'activity_{index}' for index in range(ACTIVITY_DAYS)]
+STAT_COLUMNS = [
+    'total', *STATUS_COLUMNS.values(), *PRIORITY_COLUMNS.values(),
+    'due_today', 'due_this_week', 'overdue', *ACTIVITY_COLUMNS,
+]
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def activity_days(today):
+    return [today - timedelta(days=ACTIVITY_DAYS - 1 - index) for index in range(ACTIVITY_DAYS)]
+
+
+def stat_aggregates(today):
+    """Conditional COUNTs for every stat column, relative to today.
+
+    "Due this week" is today plus the next six days; overdue tasks are past
+    due and not completed; activity counts tasks by the local day of their
+    last update.
+    """
+    week_end = today + timedelta(days=DUE_SOON_DAYS - 1)
+    counts = {'total': Count('id')}
+    for value, column in STATUS_COLUMNS.items():
+        counts[column] = Count('id', filter=Q(status=value))
+    for value, column in PRIORITY_COLUMNS.items():
+        counts[column] = Count('id', filter=Q(priority=value))
+    counts['due_today'] = Count('id', filter=Q(due_date=today))
+    counts['due_this_week'] = Count('id', filter=Q(due_date__gte=today, due_date__lte=week_end))
+    counts['overdue'] = Count('id', filter=Q(due_date__lt=today) & ~Q(status=Task.STATUS_COMPLETED))
+    for column, day in zip(ACTIVITY_COLUMNS, activity_days(today)):
+        counts[column] = Count('id', filter=Q(
+            updated_at__gte=_day_start(day), updated_at__lt=_day_start(day + timedelta(days=1)),
+        ))
+    return counts
+
+
+def stat_columns(status, priority, due_date, updated_on, today):
+    """The stat columns one task counts towards; the per-row twin of stat_aggregates()."""
+    columns = ['total']
+    if status in STATUS_COLUMNS:
+        columns.append(STATUS_COLUMNS[status])
+    if priority in PRIORITY_COLUMNS:
+        columns.append(PRIORITY_COLUMNS[priority])
+    if due_date is not None:
+        if due_date == today:
+            columns.append('due_today')
+        if today <= due_date <= today + timedelta(days=DUE_SOON_DAYS - 1):
+            columns.append('due_this_week')
+        if due_date < today and status != Task.STATUS_COMPLETED:
+            columns.append('overdue')
+    if updated_on is not None:
+        days_ago = (today - updated_on).days
+        if 0 <= days_ago < ACTIVITY_DAYS:
+            columns.append(ACTIVITY_COLUMNS[ACTIVITY_DAYS - 1 - days_ago])
+    return columns
+
+
+def format_stats(row, today):
+    """tasks/stats/ payload from a mapping of stat columns."""
+    return {
+        'total': row['total'],
+        'status': {value: row[column] for value, column in STATUS_COLUMNS.items()},
+        'priority': {value: row[column] for value, column in PRIORITY_COLUMNS.items()},
+        'due_today': row['due_today'],
+        'due_this_week': row['due_this_week'],
+        'overdue': row['overdue'],
+        'activity': [
+            {'date': day.isoformat(), 'count': row[column]}
+            for column, day in zip(ACTIVITY_COLUMNS, activity_days(today))
+        ],
+        'as_of': today.isoformat(),
+    }
+
+
+def task_stats(qs, today=None):
+    """Stats for a queryset from one aggregate query (one scan of the tasks)."""
+    today = today or timezone.localdate()
+    return format_stats(qs.order_by().aggregate(**stat_aggregates(today)), today)
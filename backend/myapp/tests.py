@@ -1,3 +1,2018 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import zlib
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+
+from myproject import checks, compression
+from myproject.asgi import application
+from myproject.authentication import (
+    VerifiedTokenCache, _key, aclaims_user, add_user_claims, token_cache, verify_access_token,
+)
+from myproject.middleware import CompressionMiddleware
+
+from . import counters, export, imports, journal, notify, serializers
+from .admin import TaskPaginator
+from .backends import EMAIL_LOWER_INDEX, users_with_email
+from .events import RESYNC, TaskChange, hub
+from .models import Task, TaskCounter, TaskOwnerVersion
+from .serializers import TaskSerializer, render_json, serialize_task_values, task_values
+from .search import FTS_TRIGGERS, PG_SEARCH_INDEX, fts_available, is_ranked, restore_sqlite_fts, search_tasks
+from .stats import task_stats
+from .views import _filter_tasks, _paginator_for, _visible_tasks, task_paginator
+
+
+# Every filter combination the tasks list view can produce
+FILTER_SHAPES = [
+    {},
+    {'status': Task.STATUS_PENDING},
+    {'priority': Task.PRIORITY_HIGH},
+    {'status': Task.STATUS_PENDING, 'priority': Task.PRIORITY_HIGH},
+    {'due_before': '2030-01-31'},
+    {'due_after': '2030-01-01'},
+    {'due_after': '2030-01-01', 'due_before': '2030-01-31'},
+    {'status': Task.STATUS_COMPLETED, 'due_after': '2030-01-01', 'due_before': '2030-01-31'},
+    {'search': 'report'},
+    {'search': 'report', 'status': Task.STATUS_PENDING, 'priority': Task.PRIORITY_LOW},
+]
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.tasks = [Task.objects.create(title=f'task {i}', owner=cls.owner) for i in range(7)]
+        Task.objects.create(title='not mine', owner=User.objects.create_user('other', 'other@example.com', 'pw'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def page(self, **params):
+        response = self.client.get('/tasks/', {'limit': 3, **params})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [task['id'] for task in data['results']], data['next'], data['previous']
+
+    def walk(self):
+        pages, cursor = [], None
+        while True:
+            ids, cursor, _ = self.page(**({'cursor': cursor} if cursor else {}))
+            pages.append(ids)
+            if not cursor:
+                return pages
+
+    def test_next_and_previous_cursors(self):
+        expected = [task.pk for task in reversed(self.tasks)]
+        first, next_cursor, prev_cursor = self.page()
+        self.assertEqual(first, expected[:3])
+        self.assertIsNone(prev_cursor)
+        second, next_cursor, prev_cursor = self.page(cursor=next_cursor)
+        self.assertEqual(second, expected[3:6])
+        last, end_cursor, last_prev = self.page(cursor=next_cursor)
+        self.assertEqual(last, expected[6:])
+        self.assertIsNone(end_cursor)
+
+        back, _, back_prev = self.page(cursor=last_prev)
+        self.assertEqual(back, second)
+        back, back_next, back_prev = self.page(cursor=back_prev)
+        self.assertEqual(back, first)
+        self.assertIsNone(back_prev)
+        self.assertEqual(self.page(cursor=back_next)[0], second)
+
+    def test_ties_on_updated_at_are_broken_by_id(self):
+        Task.objects.filter(owner=self.owner).update(updated_at=timezone.now())
+        pages = self.walk()
+        self.assertEqual([len(ids) for ids in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), sorted((task.pk for task in self.tasks), reverse=True))
+
+    def test_malformed_cursor_is_rejected(self):
+        bad_value = task_paginator.encode_cursor({'updated_at': 'yesterday', 'id': 1}, 'n')
+        for cursor in ('garbage', 'e30', bad_value):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/tasks/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite-specific')
+class TaskListQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        for i in range(3):
+            Task.objects.create(title=f'report {i}', owner=cls.owner)
+
+    def explain(self, qs):
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def cursors(self, user):
+        _, next_cursor, _ = task_paginator.paginate(_visible_tasks(user), {'limit': 1})
+        _, _, prev_cursor = task_paginator.paginate(_visible_tasks(user), {'limit': 1, 'cursor': next_cursor})
+        return [None, next_cursor, prev_cursor]
+
+    def test_every_filter_shape_is_index_backed(self):
+        full_scan = re.compile(r'^SCAN (TABLE )?%s$' % Task._meta.db_table)
+        for user in (self.owner, self.staff):
+            for cursor in self.cursors(user):
+                for shape in FILTER_SHAPES:
+                    params = dict(shape, cursor=cursor) if cursor else shape
+                    with self.subTest(user=user.username, params=params):
+                        qs = _filter_tasks(_visible_tasks(user), params)
+                        if is_ranked(qs) and cursor:
+                            continue  # cursors above are for the recency ordering
+                        plan = self.explain(_paginator_for(qs).get_page_queryset(qs, params)[0])
+                        self.assertFalse(any(full_scan.match(step) for step in plan), plan)
+                        if not is_ranked(qs):
+                            # Relevance order is a sort over the FTS matches only
+                            self.assertFalse(any('USE TEMP B-TREE' in step for step in plan), plan)
+
+
+class FastTaskSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('ünïcode', 'u@example.com', 'pw', first_name='Zoë', last_name='Ω')
+        other = User.objects.create_user('other', '', 'pw')
+        Task.objects.create(title='plain', owner=owner)
+        Task.objects.create(
+            title='Ünïcode \u2028 separators \u2029 "quoted"',
+            description='line\nbreak\ttab </script> \U0001F600',
+            status=Task.STATUS_COMPLETED,
+            priority=Task.PRIORITY_HIGH,
+            due_date='2030-02-28',
+            owner=other,
+        )
+
+    def test_output_matches_task_serializer(self):
+        qs = Task.objects.order_by('id')
+        expected = TaskSerializer(qs, many=True).data
+        fast = serialize_task_values(task_values(qs))
+        self.assertEqual(fast, json.loads(json.dumps(expected)))
+        self.assertEqual(render_json(fast), JSONRenderer().render(expected))
+
+    def test_output_matches_in_other_timezone(self):
+        qs = Task.objects.order_by('id')
+        with timezone.override('America/New_York'):
+            expected = JSONRenderer().render(TaskSerializer(qs, many=True).data)
+            self.assertEqual(render_json(serialize_task_values(task_values(qs))), expected)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            serialize_task_values(task_values(Task.objects.all()))
+
+    def test_render_json_uses_orjson(self):
+        data = serialize_task_values(task_values(Task.objects.order_by('id')))
+        with mock.patch.object(serializers.orjson, 'dumps', wraps=serializers.orjson.dumps) as dumps:
+            render_json(data)
+        dumps.assert_called_once_with(data)
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        Task.objects.create(title='timed', owner=cls.owner)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def timings(self, response):
+        metrics = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_header_reports_queries_and_durations(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/tasks/')
+        metrics = self.timings(response)
+        self.assertEqual(list(metrics), ['db', 'ser', 'view'])
+        self.assertEqual(metrics['db']['desc'], f'"{len(queries)} queries"')
+        self.assertGreater(float(metrics['ser']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['view']['dur']), float(metrics['db']['dur']))
+
+    @override_settings(REQUEST_TIMING_LOG=True)
+    def test_log_line(self):
+        with self.assertLogs('myproject.timing', 'INFO') as logs:
+            self.client.get('/tasks/')
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((record['method'], record['path'], record['status']), ('GET', '/tasks/', 200))
+        self.assertGreater(record['queries'], 0)
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        self.assertFalse(self.client.get('/tasks/').has_header('Server-Timing'))
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        cls.task = Task.objects.create(title='cached', owner=cls.owner)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def setUp(self):
+        self.client = self.client_for(self.owner)
+
+    def get(self, path, etag=None, client=None, **params):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return (client or self.client).get(path, params, **headers)
+
+    def test_matching_etag_is_not_modified_after_one_query(self):
+        response = self.get('/tasks/')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        with self.assertNumQueries(1):
+            not_modified = self.get('/tasks/', response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        self.assertEqual(not_modified.content, b'')
+
+    def test_etag_changes_on_create_update_and_delete(self):
+        list_etag = self.get('/tasks/')['ETag']
+        detail_etag = self.get(f'/tasks/{self.task.pk}/')['ETag']
+        seen = {list_etag}
+        for write in (
+            lambda: Task.objects.create(title='new', owner=self.owner),
+            lambda: self.client.put(f'/tasks/{self.task.pk}/', {'title': 'renamed'}, format='json'),
+            lambda: Task.objects.filter(title='new').get().delete(),
+        ):
+            write()
+            response = self.get('/tasks/', list_etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(response['ETag'], seen)
+            list_etag = response['ETag']
+            seen.add(list_etag)
+        self.assertEqual(self.get(f'/tasks/{self.task.pk}/', detail_etag).status_code, 200)
+
+    def test_owner_etag_ignores_other_owners_but_staff_etag_does_not(self):
+        owner_etag = self.get('/tasks/')['ETag']
+        staff = self.client_for(self.staff)
+        staff_etag = self.get('/tasks/', client=staff)['ETag']
+        Task.objects.create(title='elsewhere', owner=self.other)
+        self.assertEqual(self.get('/tasks/', owner_etag).status_code, 304)
+        self.assertEqual(self.get('/tasks/', staff_etag, client=staff).status_code, 200)
+
+    def test_etag_varies_with_query_parameters_and_fields(self):
+        etags = {
+            self.get('/tasks/')['ETag'],
+            self.get('/tasks/', status=Task.STATUS_PENDING)['ETag'],
+            self.get('/tasks/', fields='id,title')['ETag'],
+            self.get('/tasks/', fields='id,status')['ETag'],
+        }
+        self.assertEqual(len(etags), 4)
+        etag = self.get('/tasks/', fields='id,title')['ETag']
+        self.assertEqual(self.get('/tasks/', etag, fields='id,status').status_code, 200)
+        self.assertEqual(self.get('/tasks/', etag, fields='id,title').status_code, 304)
+
+    def test_weak_and_listed_validators_match(self):
+        etag = self.get('/tasks/')['ETag']
+        self.assertEqual(self.get('/tasks/', f'W/{etag}').status_code, 304)
+        self.assertEqual(self.get('/tasks/', f'"stale", {etag}').status_code, 304)
+        self.assertEqual(self.get('/tasks/', '"stale"').status_code, 200)
+
+    def test_wildcard_matches_only_existing_tasks(self):
+        self.assertEqual(self.get('/tasks/', '*').status_code, 304)
+        self.assertEqual(self.get(f'/tasks/{self.task.pk}/', '*').status_code, 304)
+        hidden = Task.objects.create(title='hidden', owner=self.other)
+        self.assertEqual(self.get(f'/tasks/{hidden.pk}/', '*').status_code, 404)
+        self.assertEqual(self.get('/tasks/999999/', '*').status_code, 404)
+
+
+class BulkTaskTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        cls.first = Task.objects.create(title='first', owner=cls.owner)
+        cls.second = Task.objects.create(title='second', owner=cls.owner)
+        cls.foreign = Task.objects.create(title='foreign', owner=cls.other)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def bulk(self, body, user=None):
+        if user is not None:
+            self.client.force_authenticate(user)
+        return self.client.post('/tasks/bulk/', body, format='json')
+
+    def snapshot(self):
+        return list(Task.objects.order_by('pk').values_list('pk', 'title', 'status', 'owner_id'))
+
+    def test_applies_every_item_in_one_transaction(self):
+        seq = journal.latest_seq()
+        response = self.bulk({
+            'create': [{'title': 'new', 'priority': Task.PRIORITY_HIGH}, {'title': 'newer'}],
+            'update': [{'id': self.first.pk, 'status': Task.STATUS_COMPLETED}],
+            'delete': [self.second.pk],
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([task['title'] for task in data['created']], ['new', 'newer'])
+        self.assertTrue(all(task['owner']['id'] == self.owner.pk for task in data['created']))
+        self.assertEqual([(task['id'], task['status']) for task in data['updated']], [(self.first.pk, 'completed')])
+        self.assertEqual(data['deleted'], [self.second.pk])
+        self.assertEqual(Task.objects.get(pk=self.first.pk).status, Task.STATUS_COMPLETED)
+        self.assertFalse(Task.objects.filter(pk=self.second.pk).exists())
+        ops = sorted(op for op, _, _, _ in journal.changes_since(seq))
+        self.assertEqual(ops, ['created', 'created', 'deleted', 'updated'])
+        self.assertEqual(counters.read(self.owner.pk)['status']['completed'], 1)
+        self.assertEqual(counters.read(self.owner.pk)['total'], 3)
+
+    def test_one_invalid_item_rejects_the_whole_request(self):
+        before = self.snapshot()
+        response = self.bulk({
+            'create': [{'title': 'fine'}, {'title': ''}],
+            'update': [{'id': self.first.pk, 'status': 'someday'}, {'id': self.second.pk, 'title': 'fine'}],
+            'delete': ['first', self.first.pk],
+        })
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(set(errors['create']), {'1'})
+        self.assertIn('title', errors['create']['1'])
+        self.assertEqual(set(errors['update']), {'0'})
+        self.assertIn('status', errors['update']['0'])
+        self.assertEqual(errors['delete']['0'], {'id': ['A task id is required.']})
+        self.assertEqual(errors['delete']['1'], {'id': ['Task appears more than once in this request.']})
+        self.assertEqual(self.snapshot(), before)
+
+    def test_other_owners_tasks_are_not_found_except_for_staff(self):
+        before = self.snapshot()
+        response = self.bulk({'update': [{'id': self.foreign.pk, 'title': 'mine now'}], 'delete': [self.foreign.pk + 100]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], {
+            'update': {'0': {'id': ['Task not found.']}},
+            'delete': {'0': {'id': ['Task not found.']}},
+        })
+        self.assertEqual(self.snapshot(), before)
+
+        response = self.bulk({'update': [{'id': self.foreign.pk, 'title': 'edited by staff'}]}, user=self.staff)
+        self.assertEqual(response.status_code, 200)
+        foreign = Task.objects.get(pk=self.foreign.pk)
+        self.assertEqual((foreign.title, foreign.owner_id), ('edited by staff', self.other.pk))
+
+    def test_database_error_rolls_everything_back(self):
+        before = self.snapshot()
+        seq = journal.latest_seq()
+        with mock.patch.object(QuerySet, 'bulk_update', side_effect=DatabaseError('boom')):
+            with self.assertRaises(DatabaseError):
+                self.bulk({'create': [{'title': 'new'}], 'update': [{'id': self.first.pk, 'title': 'x'}]})
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(journal.latest_seq(), seq)
+
+    @override_settings(TASK_BULK_MAX_ITEMS=2)
+    def test_size_cap(self):
+        response = self.bulk({'create': [{'title': 'a'}, {'title': 'b'}], 'delete': [self.first.pk]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'At most 2 items per request'})
+
+    def test_body_must_be_an_object_of_lists(self):
+        for body in ([{'title': 'a'}], 'create', 3, {'create': {'title': 'a'}}):
+            with self.subTest(body=body):
+                response = self.bulk(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+        self.assertEqual(self.bulk({}).json(), {'created': [], 'updated': [], 'deleted': []})
+
+
+def expected_stats(tasks, today):
+    """tasks/stats/ worked out row by row in Python, as an oracle for the SQL versions."""
+    tasks = list(tasks)
+    week_end = today + timedelta(days=6)
+    days = [today - timedelta(days=6 - index) for index in range(7)]
+    return {
+        'total': len(tasks),
+        'status': {value: sum(t.status == value for t in tasks) for value, _ in Task.STATUS_CHOICES},
+        'priority': {value: sum(t.priority == value for t in tasks) for value, _ in Task.PRIORITY_CHOICES},
+        'due_today': sum(t.due_date == today for t in tasks),
+        'due_this_week': sum(t.due_date is not None and today <= t.due_date <= week_end for t in tasks),
+        'overdue': sum(
+            t.due_date is not None and t.due_date < today and t.status != Task.STATUS_COMPLETED for t in tasks
+        ),
+        'activity': [
+            {'date': day.isoformat(), 'count': sum(timezone.localdate(t.updated_at) == day for t in tasks)}
+            for day in days
+        ],
+        'as_of': today.isoformat(),
+    }
+
+
+class TaskStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        today = timezone.localdate()
+        for owner, status, priority, due in [
+            (cls.owner, Task.STATUS_PENDING, Task.PRIORITY_LOW, today),
+            (cls.owner, Task.STATUS_PENDING, Task.PRIORITY_HIGH, today - timedelta(days=2)),
+            (cls.owner, Task.STATUS_COMPLETED, Task.PRIORITY_HIGH, today - timedelta(days=2)),
+            (cls.owner, Task.STATUS_IN_PROGRESS, Task.PRIORITY_MEDIUM, today + timedelta(days=6)),
+            (cls.owner, Task.STATUS_PENDING, Task.PRIORITY_MEDIUM, today + timedelta(days=7)),
+            (cls.owner, Task.STATUS_PENDING, Task.PRIORITY_MEDIUM, None),
+            (cls.other, Task.STATUS_IN_PROGRESS, Task.PRIORITY_LOW, today - timedelta(days=30)),
+        ]:
+            Task.objects.create(title='stat', owner=owner, status=status, priority=priority, due_date=due)
+        # Activity from earlier days
+        Task.objects.filter(priority=Task.PRIORITY_HIGH).update(updated_at=timezone.now() - timedelta(days=3))
+        Task.objects.filter(owner=cls.other).update(updated_at=timezone.now() - timedelta(days=10))
+
+    def stats(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/tasks/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_owner_stats_match_their_tasks(self):
+        today = timezone.localdate()
+        # The update() calls above bypassed the counters
+        counters.rebuild()
+        expected = expected_stats(Task.objects.filter(owner=self.owner), today)
+        self.assertEqual(self.stats(self.owner), expected)
+        self.assertEqual(task_stats(Task.objects.filter(owner=self.owner)), expected)
+        self.assertEqual(expected['overdue'], 1)
+        self.assertEqual(expected['due_this_week'], 2)
+
+    def test_staff_stats_cover_every_owner(self):
+        counters.rebuild()
+        expected = expected_stats(Task.objects.all(), timezone.localdate())
+        self.assertEqual(self.stats(self.staff), expected)
+        self.assertEqual(self.stats(self.other)['total'], 1)
+
+    def test_stale_rows_are_recounted_on_read(self):
+        TaskCounter.objects.update(as_of=timezone.localdate() - timedelta(days=1), total=99)
+        expected = expected_stats(Task.objects.filter(owner=self.owner), timezone.localdate())
+        self.assertEqual(self.stats(self.owner), expected)
+
+    def test_cheap_and_conditional(self):
+        counters.rebuild()
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        # The owner's version and one counter row
+        with self.assertNumQueries(2):
+            response = client.get('/tasks/stats/')
+        self.assertEqual(client.get('/tasks/stats/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        Task.objects.create(title='new', owner=self.owner)
+        self.assertEqual(client.get('/tasks/stats/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+class TaskCounterTests(TestCase):
+    """TaskCounter must always equal a recount, whichever write path changed the tasks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        cls.today = timezone.localdate()
+
+    def assertCountersExact(self):
+        for user in (self.owner, self.other):
+            self.assertEqual(counters.read(user.pk), task_stats(Task.objects.filter(owner=user)), user.username)
+        self.assertEqual(counters.read_all(), task_stats(Task.objects.all()))
+        self.assertEqual(counters.rebuild(check=True), [])
+
+    def test_save_and_delete(self):
+        task = Task.objects.create(title='a', owner=self.owner, due_date=self.today)
+        late = Task.objects.create(title='b', owner=self.owner, due_date=self.today - timedelta(days=2))
+        Task.objects.create(title='c', owner=self.other)
+        self.assertCountersExact()
+        late.status = Task.STATUS_COMPLETED
+        late.save()
+        self.assertCountersExact()
+        # update_fields: only the saved column changes in the database
+        late = Task.objects.get(pk=late.pk)
+        late.priority, late.due_date = Task.PRIORITY_HIGH, self.today
+        late.save(update_fields=['priority'])
+        self.assertCountersExact()
+        # Loaded without the counted columns
+        partial = Task.objects.only('title').get(pk=task.pk)
+        partial.title = 'renamed'
+        partial.save()
+        self.assertCountersExact()
+        task = Task.objects.get(pk=task.pk)
+        task.owner = self.other
+        task.save()
+        self.assertCountersExact()
+        task.delete()
+        Task.objects.only('title').get(pk=late.pk).delete()
+        self.assertCountersExact()
+
+    def test_stale_instances(self):
+        task = Task.objects.create(title='a', owner=self.owner)
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.status = Task.STATUS_COMPLETED
+        first.save()
+        # Loaded before the first save committed: the delta starts from the stored row
+        second.status = Task.STATUS_COMPLETED
+        second.save()
+        self.assertCountersExact()
+        # A full save of a stale instance writes its pending status back
+        stale = Task.objects.get(pk=task.pk)
+        Task.objects.get(pk=task.pk).save()
+        stale.status = Task.STATUS_PENDING
+        stale.save()
+        self.assertCountersExact()
+        self.assertEqual(counters.read(self.owner.pk)['status'][Task.STATUS_PENDING], 1)
+
+    def test_double_delete(self):
+        task = Task.objects.create(title='a', owner=self.owner)
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.delete()
+        second.delete()
+        self.assertCountersExact()
+        self.assertEqual(counters.read(self.owner.pk)['total'], 0)
+
+    def test_bulk_endpoint(self):
+        kept = Task.objects.create(title='kept', owner=self.owner)
+        doomed = Task.objects.create(title='doomed', owner=self.owner)
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post('/tasks/bulk/', {
+            'create': [{'title': f'new {i}', 'due_date': str(self.today)} for i in range(3)],
+            'update': [{'id': kept.pk, 'status': Task.STATUS_IN_PROGRESS, 'priority': Task.PRIORITY_LOW}],
+            'delete': [doomed.pk],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertCountersExact()
+
+    def test_bulk_updates_write_only_the_fields_each_item_sent(self):
+        first = Task.objects.create(title='first', owner=self.owner)
+        second = Task.objects.create(title='second', owner=self.owner)
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post('/tasks/bulk/', {'update': [
+                {'id': first.pk, 'status': Task.STATUS_COMPLETED},
+                {'id': second.pk, 'title': 'renamed'},
+            ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        updates = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('UPDATE "myapp_task"')]
+        self.assertEqual(len(updates), 2)
+        self.assertFalse([sql for sql in updates if '"status"' in sql and '"title"' in sql], updates)
+        self.assertCountersExact()
+
+    def test_import(self):
+        row = {'status': Task.STATUS_COMPLETED, 'due_date': str(self.today)}
+        rows = b''.join(json.dumps({**row, 'title': f'imported {i}'}).encode() + b'\n' for i in range(5))
+        report = imports.import_tasks(io.BytesIO(rows), 'ndjson', self.owner, batch_size=2)
+        self.assertEqual(report['imported'], 5)
+        self.assertCountersExact()
+
+    def test_check_reports_drift_and_rebuild_fixes_it(self):
+        Task.objects.create(title='a', owner=self.owner)
+        Task.objects.create(title='b', owner=self.other)
+        # update() bypasses the signals that keep the counters
+        Task.objects.filter(owner=self.owner).update(status=Task.STATUS_COMPLETED)
+        with self.assertRaisesMessage(CommandError, f'1 owner(s) with drifted counters: {self.owner.pk}'):
+            call_command('rebuild_task_counters', '--check', stdout=io.StringIO())
+        self.assertEqual(counters.read(self.owner.pk)['status']['completed'], 0)
+
+        out = io.StringIO()
+        call_command('rebuild_task_counters', stdout=out)
+        self.assertIn(f'Corrected drifted counters for owner(s): {self.owner.pk}', out.getvalue())
+        call_command('rebuild_task_counters', '--check', stdout=io.StringIO())
+        self.assertCountersExact()
+
+
+class VerifiedTokenCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.raw = str(AccessToken.for_user(self.owner))
+
+    def count_verifications(self):
+        return mock.patch.object(Token, 'verify', autospec=True, side_effect=Token.verify)
+
+    def test_each_token_is_verified_once(self):
+        self.client.cookies['access'] = self.raw
+        with self.count_verifications() as verify:
+            self.assertEqual(self.client.get('/tasks/').status_code, 200)
+            # Middleware and DRF authentication share the first verification
+            self.assertEqual(verify.call_count, 1)
+            self.assertEqual(self.client.get('/tasks/').status_code, 200)
+            self.assertEqual(self.client.get('/tasks/', HTTP_AUTHORIZATION=f'Bearer {self.raw}').status_code, 200)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_entries_expire_with_the_token(self):
+        token = verify_access_token(self.raw)
+        with mock.patch('myproject.authentication.time.time', return_value=token['exp'] - 1):
+            self.assertIs(token_cache.get(_key(self.raw)), token)
+        with mock.patch('myproject.authentication.time.time', return_value=token['exp']):
+            self.assertIsNone(token_cache.get(_key(self.raw)))
+        self.assertEqual(len(token_cache), 0)
+
+    def test_size_is_bounded_least_recently_used_first(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        tokens = {name: {'exp': time.time() + 60, 'name': name} for name in 'abc'}
+        cache.set('a', tokens['a'])
+        cache.set('b', tokens['b'])
+        cache.get('a')
+        cache.set('c', tokens['c'])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([cache.get(key)['name'] for key in 'ac'], ['a', 'c'])
+
+        disabled = VerifiedTokenCache(maxsize=0)
+        disabled.set('a', tokens['a'])
+        self.assertIsNone(disabled.get('a'))
+
+    def test_tampered_token_is_never_served_from_the_cache(self):
+        verify_access_token(self.raw)
+        header, payload, signature = self.raw.split('.')
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        claims['user_id'] = str(self.owner.pk + 1)
+        forged_payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip('=')
+        for forged in (f'{header}.{forged_payload}.{signature}', f'{header}.{payload}.{signature[:-2]}AA'):
+            with self.subTest(forged=forged):
+                for _ in range(2):
+                    # Failures are not cached either
+                    with self.assertRaises(TokenError):
+                        verify_access_token(forged)
+                self.client.cookies['access'] = forged
+                self.assertEqual(self.client.get('/tasks/').status_code, 401)
+
+
+class EmailOrUsernameBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', 'Alice@Example.com', 'pw-alice')
+        cls.carol = User.objects.create_user('carol', 'carol@example.com', 'pw-carol')
+        # Someone whose username is carol's email address
+        cls.squatter = User.objects.create_user('carol@example.com', 'squatter@example.com', 'pw-squatter')
+
+    def login(self, identifier, password):
+        return authenticate(None, username=identifier, password=password)
+
+    def count_hashes(self):
+        hasher = type(get_hasher())
+        return mock.patch.object(hasher, 'encode', autospec=True, side_effect=hasher.encode)
+
+    def test_username_or_email_case_insensitively(self):
+        for identifier in ('alice', ' alice ', 'alice@example.com', 'ALICE@example.COM'):
+            with self.subTest(identifier=identifier):
+                self.assertEqual(self.login(identifier, 'pw-alice'), self.alice)
+        # Usernames stay case-sensitive
+        self.assertIsNone(self.login('ALICE', 'pw-alice'))
+
+    def test_exact_username_wins_over_an_email(self):
+        self.assertEqual(self.login('carol@example.com', 'pw-squatter'), self.squatter)
+        # The identifier names one user only; carol's password is not tried
+        self.assertIsNone(self.login('carol@example.com', 'pw-carol'))
+        self.assertEqual(self.login('carol', 'pw-carol'), self.carol)
+
+    def test_duplicate_emails_resolve_to_the_oldest_user(self):
+        newer = User.objects.create_user('alice2', 'ALICE@example.com', 'pw-alice')
+        self.assertEqual(self.login('alice@example.com', 'pw-alice'), self.alice)
+        self.assertIsNone(self.login('alice@example.com', 'pw-alice2'))
+        self.assertEqual(self.login('alice2', 'pw-alice'), newer)
+
+    def test_inactive_users_are_refused(self):
+        self.alice.is_active = False
+        self.alice.save()
+        self.assertIsNone(self.login('alice', 'pw-alice'))
+        self.assertIsNone(self.login('alice@example.com', 'pw-alice'))
+
+    def test_every_attempt_costs_one_query_and_one_hash(self):
+        self.alice.is_active = False
+        self.alice.save()
+        cases = [
+            ('nobody@example.com', 'pw'),  # unknown email
+            ('nobody', 'pw'),  # unknown username
+            ('carol@example.com', 'wrong'),
+            ('alice', 'pw-alice'),  # inactive
+            ('squatter@example.com', 'pw-squatter'),
+        ]
+        for identifier, password in cases:
+            with self.subTest(identifier=identifier), self.count_hashes() as encode, \
+                    self.assertNumQueries(1):
+                self.login(identifier, password)
+            self.assertEqual(encode.call_count, 1)
+
+    def test_login_endpoint_accepts_an_email(self):
+        response = self.client.post(
+            '/auth/login/', {'username': 'CAROL@example.com', 'password': 'pw-carol'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['username'], 'carol')
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plan')
+    def test_email_lookup_uses_the_lower_index(self):
+        self.assertIn(EMAIL_LOWER_INDEX, users_with_email('ALICE@example.com').explain())
+
+
+@override_settings(JWT_USER_CLAIMS=True)
+class ClaimsUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw', first_name='Olive')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        Task.objects.create(title='mine', owner=cls.owner)
+        Task.objects.create(title='theirs', owner=cls.staff)
+
+    def setUp(self):
+        for stale in (cache, token_cache):
+            stale.clear()
+            self.addCleanup(stale.clear)
+
+    def login(self, user):
+        # Minted a few seconds ago, so a change made now is strictly newer
+        refresh = RefreshToken.for_user(user)
+        access = add_user_claims(refresh.access_token, user)
+        access.set_iat(at_time=timezone.now() - timedelta(seconds=10))
+        self.client.cookies['access'] = str(access)
+        self.client.cookies['refresh'] = str(refresh)
+
+    def me(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/user/me/')
+        return response, any('auth_user' in query['sql'] for query in ctx.captured_queries)
+
+    def visible_titles(self):
+        return sorted(task['title'] for task in self.client.get('/tasks/').json()['results'])
+
+    def test_claims_replace_the_user_query(self):
+        self.login(self.owner)
+        response, read_user = self.me()
+        self.assertFalse(read_user)
+        self.assertEqual(response.json()['username'], 'owner')
+        self.assertEqual(response.json()['email'], 'owner@example.com')
+        response = self.client.post('/tasks/', {'title': 'new'}, content_type='application/json')
+        # The owner is serialized from the claims too
+        self.assertEqual(response.json()['owner']['id'], self.owner.pk)
+        self.assertEqual(response.json()['owner']['first_name'], 'Olive')
+
+    def test_unrelated_saves_keep_the_claims(self):
+        self.login(self.owner)
+        self.owner.last_login = timezone.now()
+        self.owner.save(update_fields=['last_login'])
+        self.owner.save()  # nothing in the claims changed
+        self.assertFalse(self.me()[1])
+
+    def test_profile_change_invalidates_older_tokens(self):
+        self.login(self.owner)
+        self.owner.email = 'olive@example.com'
+        self.owner.save()
+        response, read_user = self.me()
+        self.assertTrue(read_user)
+        self.assertEqual(response.json()['email'], 'olive@example.com')
+
+    def test_staff_revocation_takes_effect_before_the_token_expires(self):
+        self.login(self.staff)
+        self.assertEqual(self.visible_titles(), ['mine', 'theirs'])
+        self.staff.is_staff = False
+        self.staff.save()
+        self.assertEqual(self.visible_titles(), ['theirs'])
+        response, read_user = self.me()
+        self.assertTrue(read_user)
+        self.assertFalse(response.json()['is_staff'])
+
+    def test_refresh_mints_fresh_claims(self):
+        self.login(self.staff)
+        self.staff.is_staff = False
+        # Marked stale a few seconds back, so the refreshed token is newer
+        with mock.patch('myproject.authentication.time.time', return_value=time.time() - 5):
+            self.staff.save()
+        self.assertEqual(self.client.post('/auth/refresh/').status_code, 200)
+        response, read_user = self.me()
+        self.assertFalse(read_user)
+        self.assertFalse(response.json()['is_staff'])
+        self.assertEqual(self.visible_titles(), ['theirs'])
+
+    def test_deactivated_and_deleted_users_are_rejected(self):
+        self.login(self.owner)
+        self.owner.is_active = False
+        self.owner.save()
+        self.assertEqual(self.client.get('/user/me/').status_code, 401)
+        self.assertEqual(self.client.post('/auth/refresh/').status_code, 401)
+
+        self.login(self.staff)
+        self.staff.delete()
+        self.assertEqual(self.client.get('/user/me/').status_code, 401)
+
+    def test_async_lookup_awaits_the_cache(self):
+        access = add_user_claims(AccessToken.for_user(self.staff), self.staff)
+        access.set_iat(at_time=timezone.now() - timedelta(seconds=10))
+        with mock.patch.object(cache, 'aget', wraps=cache.aget) as aget:
+            self.assertEqual(asyncio.run(aclaims_user(access)).id, self.staff.pk)
+            self.staff.is_staff = False
+            self.staff.save()
+            self.assertIsNone(asyncio.run(aclaims_user(access)))
+        self.assertEqual(aget.call_count, 2)
+
+    @override_settings(JWT_USER_CLAIMS=False)
+    def test_off_mints_and_trusts_no_claims(self):
+        access = add_user_claims(AccessToken.for_user(self.owner), self.owner)
+        self.assertNotIn('username', access)
+        self.login(self.owner)  # carries no claims either
+        self.assertTrue(self.me()[1])
+
+
+class UserClaimsCacheCheckTests(TestCase):
+    def cache(self, backend):
+        return override_settings(CACHES={'default': {'BACKEND': f'django.core.cache.backends.{backend}'}})
+
+    def issue_ids(self):
+        return [issue.id for issue in checks.check_user_claims_cache(None)]
+
+    def test_claims_need_a_shared_cache(self):
+        cases = [
+            (True, 'locmem.LocMemCache', ['myproject.W001']),
+            (True, 'dummy.DummyCache', ['myproject.E001']),
+            (True, 'redis.RedisCache', []),
+            (True, 'filebased.FileBasedCache', []),
+            (False, 'locmem.LocMemCache', []),
+        ]
+        for claims, backend, expected in cases:
+            with self.subTest(claims=claims, backend=backend), self.cache(backend), \
+                    override_settings(JWT_USER_CLAIMS=claims):
+                self.assertEqual(self.issue_ids(), expected)
+
+    def test_default_settings_pass(self):
+        self.assertEqual(self.issue_ids(), [])
+
+
+@skipUnless('init_command' in connection.settings_dict.get('OPTIONS', {}), 'SQLite connection profile is off')
+class SqliteProfileTests(SimpleTestCase):
+    def test_fresh_file_connection_runs_the_profile(self):
+        # The test database is in memory, which has no WAL; open a file with the same settings
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': os.path.join(directory, 'db.sqlite3')}, 'profile')
+            try:
+                with wrapper.cursor() as cursor:
+                    pragmas = {}
+                    for name in ('journal_mode', 'busy_timeout'):
+                        cursor.execute(f'PRAGMA {name}')
+                        pragmas[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        self.assertEqual(pragmas['journal_mode'], 'wal')
+        self.assertEqual(pragmas['busy_timeout'], settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(wrapper.settings_dict['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+
+
+class SeedTasksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+
+    def seed(self, *args):
+        call_command('seed_tasks', '--tasks-per-user', '40', '--seed', '7', *args, stdout=io.StringIO())
+
+    def rows(self, prefix):
+        return list(
+            Task.objects.filter(owner__username__startswith=prefix).order_by('id')
+            .values_list('status', 'priority', 'due_date', 'description')
+        )
+
+    def test_counts_journal_and_counters(self):
+        latest = journal.latest_seq()
+        self.seed(
+            '--users', '3', '--owner', 'owner', '--commit-every', '25',
+            '--status', 'pending=1,completed=1,in-progress=0', '--due-days', '0:0', '--no-due-ratio', '0.5',
+        )
+        seeded = list(User.objects.filter(username__startswith='seed').order_by('id'))
+        self.assertEqual([user.username for user in seeded], ['seed0', 'seed1', 'seed2'])
+        self.assertTrue(seeded[0].check_password('password'))
+        for user in [self.owner, *seeded]:
+            with self.subTest(user=user.username):
+                tasks = Task.objects.filter(owner=user)
+                self.assertEqual(tasks.count(), 40)
+                self.assertFalse(tasks.filter(status=Task.STATUS_IN_PROGRESS).exists())
+                self.assertFalse(tasks.exclude(due_date=None).exclude(due_date=timezone.localdate()).exists())
+                self.assertEqual(task_stats(tasks), expected_stats(tasks, timezone.localdate()))
+        self.assertEqual(counters.rebuild(check=True), [])
+        # Every task journaled, so ETags and open streams see them
+        self.assertEqual(len(journal.changes_since(latest)), 160)
+
+        # Later runs add users after the existing ones
+        self.seed('--users', '1', '--tasks-per-user', '0')
+        self.assertTrue(User.objects.filter(username='seed3').exists())
+
+    def test_numbering_skips_gaps_and_lookalikes(self):
+        seedling = User.objects.create_user('seedling', 'seedling@example.com', 'pw')
+        self.seed('--users', '3', '--tasks-per-user', '1')
+        User.objects.filter(username='seed1').delete()
+        self.seed('--users', '1', '--tasks-per-user', '2')
+        self.assertEqual(
+            sorted(User.objects.filter(username__startswith='seed').values_list('username', flat=True)),
+            ['seed0', 'seed2', 'seed3', 'seedling'],
+        )
+        # The tasks went to the new user, not to whichever came later by id
+        self.assertEqual(Task.objects.filter(owner__username='seed3').count(), 2)
+        self.assertFalse(Task.objects.filter(owner=seedling).exists())
+
+    def test_same_seed_same_data(self):
+        self.seed('--users', '2', '--username-prefix', 'first')
+        self.seed('--users', '2', '--username-prefix', 'again')
+        self.seed('--users', '2', '--username-prefix', 'other', '--seed', '8')
+        self.assertEqual(self.rows('first'), self.rows('again'))
+        self.assertNotEqual(self.rows('first'), self.rows('other'))
+
+    def test_no_journal(self):
+        latest = journal.latest_seq()
+        self.seed('--users', '1', '--no-journal')
+        self.assertEqual(journal.latest_seq(), latest)
+        self.assertEqual(counters.rebuild(check=True), [])
+
+    def test_rejects_bad_arguments(self):
+        for args in (
+            ['--owner', 'nobody'],
+            ['--status', 'done=1'],
+            ['--priority', 'low=0'],
+            ['--due-days', '5:1'],
+            ['--no-due-ratio', '2'],
+            ['--commit-every', '0'],
+        ):
+            with self.subTest(args=args), self.assertRaises(CommandError):
+                self.seed('--users', '0', *args)
+        self.assertFalse(Task.objects.exists())
+
+
+def asgi_get(path, query='', headers=()):
+    """Start a GET through the ASGI application, from inside an event loop.
+
+    Returns the application task, a queue of the messages it sends and an
+    event that disconnects the client once set.
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'headers': [(b'host', b'testserver'), *headers],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    sent = asyncio.Queue()
+    disconnect = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    return asyncio.create_task(application(scope, receive, sent.put)), sent, disconnect
+
+
+async def asgi_response(sent):
+    """(start message, body chunks) of a response that ends on its own."""
+    start = await asyncio.wait_for(sent.get(), timeout=10)
+    chunks = []
+    while True:
+        message = await asyncio.wait_for(sent.get(), timeout=10)
+        if message.get('body'):
+            chunks.append(message['body'])
+        if not message.get('more_body'):
+            return start, chunks
+
+
+def split_export(body):
+    """(data lines, trailer line, SHA-256 of the data lines) of an export body."""
+    *lines, last = body.splitlines(keepends=True)
+    return lines, last, hashlib.sha256(b''.join(lines)).hexdigest()
+
+
+class TaskExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True)
+        statuses = [value for value, _ in Task.STATUS_CHOICES]
+        for i in range(25):
+            Task.objects.create(
+                title=f'report {i}' if i % 5 else f'chore {i}',
+                description='commas, "quotes"\nand a newline' if i == 3 else '',
+                status=statuses[i % 3],
+                priority=Task.PRIORITY_HIGH if i % 2 else Task.PRIORITY_LOW,
+                due_date=None if i % 4 == 0 else date(2029, 12, 20) + timedelta(days=i * 3),
+                owner=cls.owner,
+            )
+        Task.objects.create(title='report not mine', owner=cls.other)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def export(self, **params):
+        response = self.client.get('/tasks/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return response, list(response.streaming_content)
+
+    def listed_ids(self, **params):
+        return [task['id'] for task in self.client.get('/tasks/', {'limit': 200, **params}).json()['results']]
+
+    @override_settings(TASK_EXPORT_CHUNK_SIZE=7)
+    def test_ndjson_streams_the_list_in_chunks(self):
+        response, blocks = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Cache-Control'], 'private, no-store')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="tasks-\d{8}\.ndjson"$')
+        # Four chunks of at most 7 rows, then the trailer
+        self.assertEqual(len(blocks), 5)
+        lines, last, checksum = split_export(b''.join(blocks))
+        self.assertEqual(json.loads(last), {'count': 25, 'sha256': checksum})
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['id'] for row in rows], self.listed_ids())
+        detail = self.client.get(f"/tasks/{rows[0]['id']}/").json()
+        self.assertEqual(rows[0], detail)
+
+    def test_csv(self):
+        response, blocks = self.export(output='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines, last, checksum = split_export(b''.join(blocks))
+        self.assertEqual(last.decode(), f'# count=25 sha256={checksum}\n')
+        rows = list(csv.DictReader(io.StringIO(b''.join(lines).decode())))
+        self.assertEqual(list(rows[0]), export.CSV_COLUMNS)
+        self.assertEqual([int(row['id']) for row in rows], self.listed_ids())
+        self.assertEqual({row['owner_username'] for row in rows}, {'owner'})
+        # The multi-line description survives quoting
+        self.assertIn('commas, "quotes"\nand a newline', [row['description'] for row in rows])
+
+    def test_csv_quotes_formula_cells(self):
+        titles = ['=HYPERLINK("http://x", "y")', '+1', '-1', '@SUM(A1)', "'=already", "'plain", 'a=b']
+        for title in titles:
+            Task.objects.create(title=title, owner=self.other)
+        self.client.force_authenticate(self.other)
+        lines, _, _ = split_export(b''.join(self.export(output='csv')[1]))
+        rows = csv.DictReader(io.StringIO(b''.join(lines).decode()))
+        self.assertEqual(
+            sorted(row['title'] for row in rows if row['title'] != 'report not mine'),
+            sorted(['\'=HYPERLINK("http://x", "y")', "'+1", "'-1", "'@SUM(A1)", "''=already", "'plain", 'a=b']),
+        )
+        # NDJSON is not read by spreadsheets and stays as stored
+        lines, _, _ = split_export(b''.join(self.export()[1]))
+        self.assertEqual(sorted(json.loads(line)['title'] for line in lines), sorted([*titles, 'report not mine']))
+
+    def test_filters_match_the_list(self):
+        for params in FILTER_SHAPES:
+            for output in ('ndjson', 'csv'):
+                with self.subTest(params=params, output=output):
+                    lines, last, _ = split_export(b''.join(self.export(output=output, **params)[1]))
+                    if output == 'csv':
+                        ids = [int(row['id']) for row in csv.DictReader(io.StringIO(b''.join(lines).decode()))]
+                    else:
+                        ids = [json.loads(line)['id'] for line in lines]
+                    self.assertEqual(ids, self.listed_ids(**params))
+        self.assertEqual(
+            len(split_export(b''.join(self.export(priority=Task.PRIORITY_HIGH, search='report')[1]))[0]),
+            10,
+        )
+
+    def test_visibility(self):
+        self.client.force_authenticate(self.other)
+        lines, _, _ = split_export(b''.join(self.export()[1]))
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['report not mine'])
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(len(split_export(b''.join(self.export()[1]))[0]), 26)
+
+    def test_rejects_unknown_output_and_anonymous_users(self):
+        response = self.client.get('/tasks/export/', {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'output must be one of: ndjson, csv'})
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/tasks/export/').status_code, 401)
+
+
+class AsyncTaskExportTests(TransactionTestCase):
+    @override_settings(TASK_EXPORT_CHUNK_SIZE=4)
+    def test_asgi_export_streams_from_its_own_thread(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        for i in range(30):
+            Task.objects.create(title=f'task {i}', owner=owner)
+        token = str(AccessToken.for_user(owner))
+
+        async def run():
+            task, sent, _ = asgi_get('/tasks/export/', headers=[(b'cookie', f'access={token}'.encode())])
+            response = await asgi_response(sent)
+            await asyncio.wait_for(task, timeout=10)
+            return response
+
+        start, chunks = asyncio.run(run())
+        self.assertEqual(start['status'], 200)
+        # Eight row chunks and the trailer, sent as they were produced
+        self.assertEqual(len(chunks), 9)
+        lines, last, checksum = split_export(b''.join(chunks))
+        self.assertEqual(json.loads(last), {'count': 30, 'sha256': checksum})
+        self.assertEqual(len({json.loads(line)['id'] for line in lines}), 30)
+
+    @override_settings(TASK_EXPORT_CHUNK_SIZE=4)
+    def test_asgi_exports_share_a_bounded_pool(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        for i in range(30):
+            Task.objects.create(title=f'task {i}', owner=owner)
+        token = str(AccessToken.for_user(owner))
+        running, peak = [0], [0]
+        export_stream = export.export_stream
+
+        def counted(*args, **kwargs):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            try:
+                yield from export_stream(*args, **kwargs)
+            finally:
+                running[0] -= 1
+
+        async def run():
+            exports = [asgi_get('/tasks/export/', headers=[(b'cookie', f'access={token}'.encode())]) for _ in range(3)]
+            responses = await asyncio.gather(*(asgi_response(sent) for _, sent, _ in exports))
+            await asyncio.wait_for(asyncio.gather(*(task for task, _, _ in exports)), timeout=10)
+            return responses
+
+        with ThreadPoolExecutor(max_workers=1) as pool, \
+                mock.patch.object(export, '_producers', pool), mock.patch.object(export, 'export_stream', counted):
+            responses = asyncio.run(run())
+        # One worker: each export waited for the previous one to finish reading
+        self.assertEqual(peak[0], 1)
+        for start, chunks in responses:
+            self.assertEqual(start['status'], 200)
+            self.assertEqual(json.loads(split_export(b''.join(chunks))[1])['count'], 30)
+
+
+class TaskImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.importer = User.objects.create_user('importer', 'importer@example.com', 'pw')
+        statuses = [value for value, _ in Task.STATUS_CHOICES]
+        for i in range(25):
+            Task.objects.create(
+                title=f'report {i}',
+                description='commas, "quotes"\nand a newline' if i == 3 else 'x',
+                status=statuses[i % 3],
+                priority=Task.PRIORITY_HIGH if i % 2 else Task.PRIORITY_LOW,
+                due_date=None if i % 4 == 0 else date(2030, 1, 1) + timedelta(days=i),
+                owner=cls.owner,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.importer)
+
+    def export(self, output):
+        self.client.force_authenticate(self.owner)
+        body = b''.join(self.client.get('/tasks/export/', {'output': output}).streaming_content)
+        self.client.force_authenticate(self.importer)
+        return body
+
+    def post(self, body, query='', content_type='application/x-ndjson'):
+        return self.client.post(f'/tasks/import/{query}', body, content_type=content_type)
+
+    def fields(self, user):
+        return sorted(Task.objects.filter(owner=user).values_list('title', 'description', 'status', 'priority', 'due_date'))
+
+    def test_exports_round_trip(self):
+        for output in ('ndjson', 'csv'):
+            with self.subTest(output=output):
+                Task.objects.filter(owner=self.importer).delete()
+                latest = journal.latest_seq()
+                response = self.post(self.export(output), f'?input={output}', 'application/octet-stream')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json(), {'imported': 25, 'rejected': 0, 'checksum': 'ok', 'dry_run': False, 'errors': []},
+                )
+                self.assertEqual(self.fields(self.importer), self.fields(self.owner))
+                self.assertEqual(
+                    {change.task_id for change in journal.changes_since(latest) if change.op == 'created'},
+                    set(Task.objects.filter(owner=self.importer).values_list('pk', flat=True)),
+                )
+                self.assertEqual(counters.rebuild(check=True), [])
+        self.assertEqual(Task.objects.filter(owner=self.owner).count(), 25)
+
+    def test_csv_round_trips_quoted_formula_cells(self):
+        titles = ['=1+2', '-minus', "'=quoted", "'plain"]
+        for title in titles:
+            Task.objects.create(title=title, owner=self.owner)
+        response = self.post(self.export('csv'), '?input=csv', 'text/csv')
+        self.assertEqual((response.json()['imported'], response.json()['checksum']), (29, 'ok'))
+        self.assertEqual(self.fields(self.importer), self.fields(self.owner))
+
+    def test_rows_belong_to_the_caller(self):
+        existing = Task.objects.filter(owner=self.owner).first()
+        body = render_json({
+            'id': existing.pk, 'title': 'mine now', 'owner': {'id': self.owner.pk, 'username': 'owner'},
+            'created_at': '2001-01-01T00:00:00Z',
+        }) + b'\n'
+        self.assertEqual(self.post(body).json()['imported'], 1)
+        task = Task.objects.get(title='mine now')
+        self.assertEqual(task.owner, self.importer)
+        self.assertNotEqual(task.pk, existing.pk)
+        self.assertGreater(task.created_at.year, 2001)
+        self.assertEqual(Task.objects.get(pk=existing.pk).title, existing.title)
+
+        csv_body = b'title,owner_id,owner_username\r\nalso mine,%d,owner\r\n' % self.owner.pk
+        self.post(csv_body, '?input=csv', 'text/csv')
+        self.assertEqual(Task.objects.get(title='also mine').owner, self.importer)
+
+    def test_row_errors_are_reported_by_line(self):
+        body = (
+            b'{"title": "ok"}\n'
+            b'\n'
+            b'{"title": ""}\n'
+            b'not json\n'
+            b'[1]\n'
+            b'{"title": "x", "status": "bogus", "due_date": "2024-13-01"}\n'
+            b'{"title": "fine", "priority": "high", "due_date": "2025-01-02"}\n'
+        )
+        report = self.post(body).json()
+        self.assertEqual((report['imported'], report['rejected'], report['checksum']), (2, 4, None))
+        self.assertEqual([error['line'] for error in report['errors']], [3, 4, 5, 6])
+        self.assertEqual(set(report['errors'][3]['errors']), {'status', 'due_date'})
+        self.assertEqual(sorted(Task.objects.filter(owner=self.importer).values_list('title', flat=True)), ['fine', 'ok'])
+
+        # The error list is capped; the count is not
+        with self.settings(TASK_IMPORT_MAX_ERRORS=2):
+            report = self.client.post('/tasks/import/', {'file': SimpleUploadedFile('tasks.ndjson', body)}).json()
+        self.assertEqual((report['imported'], report['rejected'], len(report['errors'])), (2, 4, 2))
+
+    def test_dry_run_writes_nothing(self):
+        latest = journal.latest_seq()
+        report = self.post(self.export('ndjson') + b'{"title": ""}\n', '?dry_run=1').json()
+        self.assertEqual((report['imported'], report['rejected'], report['dry_run']), (25, 1, True))
+        # The trailer was not the last line
+        self.assertEqual(report['checksum'], 'mismatch')
+        self.assertFalse(Task.objects.filter(owner=self.importer).exists())
+        self.assertEqual(journal.latest_seq(), latest)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile(
+            'tasks.csv', b'\xef\xbb\xbftitle,priority,extra\r\na,high,z\r\n"multi\r\nline",,\r\n,low,\r\n',
+        )
+        report = self.client.post('/tasks/import/', {'file': upload}).json()
+        self.assertEqual((report['imported'], report['rejected']), (2, 1))
+        # Physical line numbers, counting the quoted line break
+        self.assertEqual(report['errors'][0]['line'], 5)
+        self.assertEqual(
+            sorted(Task.objects.filter(owner=self.importer).values_list('title', 'priority')),
+            [('a', Task.PRIORITY_HIGH), ('multi\r\nline', Task.PRIORITY_MEDIUM)],
+        )
+
+    def test_edited_exports_fail_the_checksum(self):
+        edited = self.export('ndjson').replace(b'report 1', b'report X', 1)
+        self.assertEqual(self.post(edited).json()['checksum'], 'mismatch')
+        lines = self.export('csv').splitlines(keepends=True)
+        truncated = b''.join(lines[:3] + lines[-1:])
+        self.assertEqual(self.post(truncated, '?input=csv', 'text/csv').json()['checksum'], 'mismatch')
+
+    def test_empty_body(self):
+        self.assertEqual(
+            self.post(b'').json(), {'imported': 0, 'rejected': 0, 'checksum': None, 'dry_run': False, 'errors': []},
+        )
+
+    def test_unreadable_input(self):
+        self.assertEqual(self.post(b'name\r\nx\r\n', '?input=csv', 'text/csv').status_code, 400)
+        self.assertEqual(self.post(b'', '?input=xml', 'text/csv').status_code, 400)
+        self.assertEqual(self.client.post('/tasks/import/', {'nofile': 'x'}).status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.post(b'{"title": "x"}\n').status_code, 401)
+
+    def test_import_tasks_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.csv')
+            with open(path, 'wb') as file:
+                file.write(self.export('csv'))
+            out = io.StringIO()
+            call_command('import_tasks', path, owner='importer', stdout=out, stderr=io.StringIO())
+            self.assertIn('Row count and checksum match the export.', out.getvalue())
+            self.assertEqual(self.fields(self.importer), self.fields(self.owner))
+
+            with open(path, 'ab') as file:
+                file.write(b','.join(b'' for _ in export.CSV_COLUMNS) + b'\r\n')
+            err = io.StringIO()
+            with self.assertRaisesMessage(CommandError, '1 row(s) rejected'):
+                call_command('import_tasks', path, owner='importer', dry_run=True, stdout=io.StringIO(), stderr=err)
+            # Header, 25 rows (one spanning two lines), the trailer, then the bad row
+            self.assertIn('line 29:', err.getvalue())
+            self.assertEqual(Task.objects.filter(owner=self.importer).count(), 25)
+
+        with self.assertRaisesMessage(CommandError, 'Unknown user: nobody'):
+            call_command('import_tasks', path, owner='nobody')
+
+
+class SparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        for i in range(7):
+            Task.objects.create(
+                title=f'report {i}', description='long text ' * 50, owner=cls.owner, due_date=date(2030, 1, i + 1),
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def get(self, path, **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def task_queries(self, path, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            self.get(path, **params)
+        return [query['sql'] for query in ctx.captured_queries if 'FROM "myapp_task"' in query['sql']]
+
+    def test_list_reads_and_returns_only_the_requested_fields(self):
+        full = self.get('/tasks/', limit=3)
+        sparse = self.get('/tasks/', limit=3, fields='title, status,priority,due_date')
+        self.assertEqual(list(sparse['results'][0]), ['id', 'title', 'status', 'priority', 'due_date'])
+        self.assertEqual(sparse['results'], [{key: task[key] for key in sparse['results'][0]} for task in full['results']])
+        [sql] = self.task_queries('/tasks/', limit=3, fields='title,status,priority,due_date')
+        self.assertNotIn('description', sql)
+        self.assertNotIn('auth_user', sql)
+        # The cursor still walks the same pages
+        self.assertEqual(
+            [task['id'] for task in self.get('/tasks/', limit=3, fields='title', cursor=sparse['next'])['results']],
+            [task['id'] for task in self.get('/tasks/', limit=3, cursor=full['next'])['results']],
+        )
+
+    def test_owner_is_joined_only_when_asked_for(self):
+        [task] = self.get('/tasks/', limit=1, fields='owner', search='report')['results']
+        self.assertEqual(list(task), ['id', 'owner'])
+        self.assertEqual(task['owner']['username'], 'owner')
+        self.assertIn('auth_user', self.task_queries('/tasks/', fields='owner')[0])
+
+    def test_detail(self):
+        task = Task.objects.first()
+        full = self.get(f'/tasks/{task.pk}/')
+        self.assertEqual(self.get(f'/tasks/{task.pk}/', fields='status,due_date'), {
+            key: full[key] for key in ('id', 'status', 'due_date')
+        })
+        self.assertEqual(self.get(f'/tasks/{task.pk}/', fields='owner,updated_at'), {
+            key: full[key] for key in ('id', 'updated_at', 'owner')
+        })
+        [sql] = self.task_queries(f'/tasks/{task.pk}/', fields='status,due_date')
+        self.assertNotIn('description', sql)
+        self.assertNotIn('auth_user', sql)
+
+    def test_empty_fields_mean_every_field(self):
+        self.assertEqual(self.get('/tasks/', fields=''), self.get('/tasks/'))
+        self.assertEqual(self.get('/tasks/', fields=' , '), self.get('/tasks/'))
+
+    def test_unknown_fields_are_rejected_everywhere(self):
+        task = Task.objects.first()
+        for path in ('/tasks/', f'/tasks/{task.pk}/'):
+            with self.subTest(path=path):
+                response = self.client.get(path, {'fields': 'title,bogus'})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Unknown field(s): bogus', response.json()['error'])
+        response = self.client.get('/tasks/stream/', {'fields': 'nope', 'token': str(AccessToken.for_user(self.owner))})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn(b'Unknown field(s): nope', response.content)
+
+
+@override_settings(TASK_STREAM_MAX_SECONDS=30, TASK_STREAM_KEEPALIVE_SECONDS=30)
+class AsyncTaskStreamTests(TransactionTestCase):
+    """Many SSE connections served concurrently by one ASGI event loop."""
+
+    STREAMS = 200
+
+    async def open_stream(self, token, disconnect):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': '/tasks/stream/',
+            'raw_path': b'/tasks/stream/',
+            'query_string': f'token={token}'.encode(),
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 50000),
+        }
+        body = asyncio.Queue()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.body' and message.get('body'):
+                await body.put(message['body'].decode())
+
+        task = asyncio.create_task(application(scope, receive, send))
+        return task, body
+
+    async def next_event(self, body):
+        while True:
+            chunk = await asyncio.wait_for(body.get(), timeout=10)
+            for line in chunk.splitlines():
+                if line.startswith('data: '):
+                    return json.loads(line[len('data: '):])
+
+    async def test_many_concurrent_streams_on_one_worker(self):
+        user = await User.objects.acreate(username='streamer')
+        token = str(AccessToken.for_user(user))
+        disconnect = asyncio.Event()
+
+        streams = [await self.open_stream(token, disconnect) for _ in range(self.STREAMS)]
+        snapshots = await asyncio.gather(*(self.next_event(body) for _, body in streams))
+        self.assertTrue(all(event['type'] == 'snapshot' for event in snapshots))
+        self.assertEqual(hub.subscriber_count, self.STREAMS)
+
+        await Task.objects.acreate(title='pushed', owner=user)
+        updates = await asyncio.gather(*(self.next_event(body) for _, body in streams))
+        self.assertTrue(all(event['type'] == 'created' for event in updates))
+        self.assertTrue(all(event['task']['title'] == 'pushed' for event in updates))
+
+        disconnect.set()
+        await asyncio.wait_for(asyncio.gather(*(task for task, _ in streams)), timeout=10)
+        self.assertEqual(hub.subscriber_count, 0)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 search is SQLite-specific')
+class SqliteSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.best = Task.objects.create(title='Quarterly report', description='report on the report', owner=cls.owner)
+        cls.other = Task.objects.create(title='Reporting tool', owner=cls.owner)
+        cls.unrelated = Task.objects.create(title='Groceries', description='milk "2%" near the door', owner=cls.owner)
+        Task.objects.create(title='report', owner=User.objects.create_user('other', 'other@example.com', 'pw'))
+
+    def setUp(self):
+        if not fts_available():
+            self.skipTest('SQLite was built without FTS5')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def search(self, text):
+        response = self.client.get('/tasks/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.json()['results']]
+
+    def test_prefix_terms_ranked_by_relevance(self):
+        self.assertTrue(is_ranked(search_tasks(Task.objects.all(), 'rep')))
+        self.assertEqual(self.search('rep'), [self.best.pk, self.other.pk])
+        self.assertEqual(self.search('quart rep'), [self.best.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.other.title = 'Hammer'
+        self.other.save()
+        self.assertEqual(self.search('rep'), [self.best.pk])
+        self.assertEqual(self.search('hamm'), [self.other.pk])
+        # Triggers cover writes that bypass save() too
+        Task.objects.filter(pk=self.unrelated.pk).update(description='report draft')
+        self.assertEqual(set(self.search('draft')), {self.unrelated.pk})
+        self.best.delete()
+        self.assertEqual(self.search('quarterly'), [])
+        self.assertEqual(self.search('report'), [self.unrelated.pk])
+
+    def test_dropped_triggers_are_flagged_and_restored(self):
+        def issues():
+            return [issue.id for issue in checks.check_search_triggers(None, databases=['default'])]
+
+        self.assertEqual(issues(), [])
+        # What SQLite's schema editor does to them when it remakes myapp_task
+        with connection.cursor() as cursor:
+            for name in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+        self.assertEqual(issues(), ['myproject.W002'])
+        Task.objects.filter(pk=self.unrelated.pk).update(title='Unindexed')
+        self.assertEqual(self.search('unindexed'), [])
+        # migrate runs this after every migration
+        restore_sqlite_fts(using='default')
+        self.assertEqual(issues(), [])
+        self.assertEqual(self.search('unindexed'), [self.unrelated.pk])
+        Task.objects.filter(pk=self.other.pk).update(title='Reindexed')
+        self.assertEqual(self.search('reindexed'), [self.other.pk])
+
+    def test_query_syntax_is_searched_literally(self):
+        # FTS5 operators are quoted into plain terms instead of raising syntax errors
+        self.assertEqual(self.search('NEAR('), [self.unrelated.pk])
+        self.assertEqual(self.search('report AND'), [])
+        self.assertEqual(self.search('"rep'), [self.best.pk, self.other.pk])
+
+    def test_text_without_words_falls_back_to_icontains(self):
+        qs = search_tasks(Task.objects.all(), '%"')
+        self.assertFalse(is_ranked(qs))
+        self.assertEqual(self.search('%"'), [self.unrelated.pk])
+        self.assertEqual(self.search('"'), [self.unrelated.pk])
+
+
+def sse_messages(chunk):
+    """(event id, payload) for each data message in a chunk of an SSE stream."""
+    messages = []
+    for block in chunk.split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line)
+        if 'data' in fields:
+            messages.append((int(fields['id']) if 'id' in fields else None, json.loads(fields['data'])))
+    return messages
+
+
+@override_settings(TASK_STREAM_MAX_SECONDS=5, TASK_STREAM_KEEPALIVE_SECONDS=1)
+class TaskStreamTestCase(TransactionTestCase):
+    """The blocking (WSGI) stream, read chunk by chunk."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.other = User.objects.create_user('other', 'other@example.com', 'pw')
+        self.kept = Task.objects.create(title='kept', owner=self.owner)
+        self.doomed = Task.objects.create(title='doomed', owner=self.owner)
+
+    def open_stream(self, user, params=None, **headers):
+        response = self.client.get('/tasks/stream/', {'token': str(AccessToken.for_user(user)), **(params or {})}, **headers)
+        self.addCleanup(response.close)
+        chunks = iter(response.streaming_content)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        return chunks
+
+    def next_messages(self, chunks):
+        while True:
+            chunk = next(chunks).decode()
+            if not chunk.startswith(':'):
+                return sse_messages(chunk)
+
+
+class TaskStreamDeltaTests(TaskStreamTestCase):
+    def test_snapshot_then_one_delta_per_task(self):
+        chunks = self.open_stream(self.owner)
+        [(snapshot_id, snapshot)] = self.next_messages(chunks)
+        self.assertEqual(snapshot['type'], 'snapshot')
+        self.assertEqual({task['id'] for task in snapshot['tasks']}, {self.kept.pk, self.doomed.pk})
+
+        created = Task.objects.create(title='new', owner=self.owner)
+        Task.objects.create(title='not mine', owner=self.other)
+        self.kept.title = 'renamed'
+        self.kept.save()
+        doomed_id = self.doomed.pk
+        self.doomed.delete()
+
+        messages = self.next_messages(chunks)
+        payloads = [payload for _, payload in messages]
+        self.assertEqual([payload['type'] for payload in payloads], ['created', 'updated', 'deleted'])
+        self.assertEqual(payloads[0]['task']['id'], created.pk)
+        self.assertEqual(payloads[0]['task']['owner']['username'], 'owner')
+        self.assertEqual((payloads[1]['task']['id'], payloads[1]['task']['title']), (self.kept.pk, 'renamed'))
+        self.assertEqual(payloads[2], {'type': 'deleted', 'id': doomed_id})
+        # Event ids are journal seqs, increasing past the snapshot's
+        ids = [event_id for event_id, _ in messages]
+        self.assertEqual(ids, sorted(ids))
+        self.assertGreater(ids[0], snapshot_id)
+        self.assertEqual(ids[-1], journal.latest_seq())
+
+    def test_sparse_fieldset(self):
+        chunks = self.open_stream(self.owner, {'fields': 'title'})
+        [(_, snapshot)] = self.next_messages(chunks)
+        self.assertEqual([set(task) for task in snapshot['tasks']], [{'id', 'title'}] * 2)
+        self.kept.title = 'renamed'
+        self.kept.save()
+        [(_, updated)] = self.next_messages(chunks)
+        self.assertEqual(updated, {'type': 'updated', 'task': {'id': self.kept.pk, 'title': 'renamed'}})
+
+    def test_deleting_a_task_loaded_without_its_owner(self):
+        chunks = self.open_stream(self.owner)
+        self.next_messages(chunks)
+        Task.objects.only('title').get(pk=self.doomed.pk).delete()
+        [(_, deleted)] = self.next_messages(chunks)
+        self.assertEqual(deleted, {'type': 'deleted', 'id': self.doomed.pk})
+
+    def test_deleting_a_task_twice_journals_it_once(self):
+        chunks = self.open_stream(self.owner)
+        self.next_messages(chunks)
+        stale = Task.objects.only('title').get(pk=self.doomed.pk)
+        latest = journal.latest_seq()
+        doomed_id = self.doomed.pk
+        self.doomed.delete()
+        stale.delete()
+        self.assertEqual(
+            journal.changes_since(latest), [TaskChange('deleted', doomed_id, self.owner.pk, latest + 1)],
+        )
+        self.assertEqual(TaskOwnerVersion.objects.get(owner_id=self.owner.pk).seq, latest + 1)
+        Task.objects.create(title='after', owner=self.owner)
+        payloads = [payload for _, payload in self.next_messages(chunks)]
+        self.assertEqual([payload['type'] for payload in payloads], ['deleted', 'created'])
+
+    def test_reassigned_task_leaves_one_stream_and_joins_another(self):
+        owner_chunks = self.open_stream(self.owner)
+        other_chunks = self.open_stream(self.other)
+        self.next_messages(owner_chunks)
+        self.next_messages(other_chunks)
+
+        self.kept.owner = self.other
+        self.kept.save()
+        [(_, left)] = self.next_messages(owner_chunks)
+        self.assertEqual(left, {'type': 'deleted', 'id': self.kept.pk})
+        [(_, joined)] = self.next_messages(other_chunks)
+        self.assertEqual((joined['type'], joined['task']['id']), ('created', self.kept.pk))
+
+
+class TaskStreamResumeTests(TaskStreamTestCase):
+    def snapshot_id(self):
+        chunks = self.open_stream(self.owner)
+        [(event_id, snapshot)] = self.next_messages(chunks)
+        self.assertEqual(snapshot['type'], 'snapshot')
+        return event_id
+
+    def test_last_event_id_replays_only_the_gap(self):
+        last_id = self.snapshot_id()
+        self.kept.title = 'renamed while away'
+        self.kept.save()
+        doomed_id = self.doomed.pk
+        self.doomed.delete()
+        Task.objects.create(title='not mine', owner=self.other)
+
+        chunks = self.open_stream(self.owner, HTTP_LAST_EVENT_ID=str(last_id))
+        messages = self.next_messages(chunks)
+        self.assertEqual([payload['type'] for _, payload in messages], ['updated', 'deleted'])
+        self.assertEqual(messages[0][1]['task']['title'], 'renamed while away')
+        self.assertEqual(messages[1][1], {'type': 'deleted', 'id': doomed_id})
+        self.assertTrue(all(event_id > last_id for event_id, _ in messages))
+
+        # Resuming from the newest id replays nothing and sends no snapshot
+        chunks = self.open_stream(self.owner, HTTP_LAST_EVENT_ID=str(messages[-1][0]))
+        self.assertEqual(next(chunks), b': resumed\n\n')
+
+    def test_last_event_id_query_parameter(self):
+        last_id = self.snapshot_id()
+        Task.objects.create(title='new', owner=self.owner)
+        response = self.client.get('/tasks/stream/', {
+            'token': str(AccessToken.for_user(self.owner)), 'last_event_id': last_id,
+        })
+        self.addCleanup(response.close)
+        chunks = iter(response.streaming_content)
+        next(chunks)
+        [(_, created)] = self.next_messages(chunks)
+        self.assertEqual(created['type'], 'created')
+
+    @override_settings(TASK_JOURNAL_MAX_ENTRIES=2)
+    def test_compacted_id_falls_back_to_a_snapshot(self):
+        last_id = self.snapshot_id()
+        for i in range(3):
+            Task.objects.create(title=f'task {i}', owner=self.owner)
+        journal.compact()
+        self.assertFalse(journal.can_resume(last_id))
+
+        chunks = self.open_stream(self.owner, HTTP_LAST_EVENT_ID=str(last_id))
+        [(event_id, snapshot)] = self.next_messages(chunks)
+        self.assertEqual(snapshot['type'], 'snapshot')
+        self.assertEqual(len(snapshot['tasks']), 5)
+        self.assertEqual(event_id, journal.latest_seq())
+
+    def test_unknown_or_invalid_ids_get_a_snapshot(self):
+        for last_id in ('not a number', str(journal.latest_seq() + 100)):
+            with self.subTest(last_id=last_id):
+                chunks = self.open_stream(self.owner, HTTP_LAST_EVENT_ID=last_id)
+                [(_, snapshot)] = self.next_messages(chunks)
+                self.assertEqual(snapshot['type'], 'snapshot')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'tsvector search is PostgreSQL-specific')
+class PostgresSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        cls.matches = [
+            Task.objects.create(title='Quarterly report', owner=cls.owner),
+            Task.objects.create(title='Reporting tool', owner=cls.owner),
+            Task.objects.create(title='Email', description='send the report draft', owner=cls.owner),
+        ]
+        Task.objects.create(title='Unrelated', description='nothing here', owner=cls.owner)
+
+    def test_prefix_terms_match_title_and_description(self):
+        qs = search_tasks(Task.objects.all(), 'repor')
+        self.assertTrue(is_ranked(qs))
+        self.assertEqual({task.pk for task in qs}, {task.pk for task in self.matches})
+        self.assertEqual(list(search_tasks(Task.objects.all(), 'report draft')), [self.matches[2]])
+
+    def test_search_uses_gin_index(self):
+        qs = search_tasks(Task.objects.all(), 'report')
+        sql, params = qs.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # Four rows would be scanned sequentially otherwise
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql, params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        self.assertIn(PG_SEARCH_INDEX, plan)
+
+    def test_relevance_cursors_visit_every_match_once(self):
+        qs = _filter_tasks(_visible_tasks(self.owner), {'search': 'report'})
+        seen, params = [], {'limit': 1}
+        while True:
+            page, next_cursor, _ = _paginator_for(qs).paginate(task_values(qs, extra=['search_rank']), params)
+            seen += [row['id'] for row in page]
+            if not next_cursor:
+                break
+            params = {'limit': 1, 'cursor': next_cursor}
+        self.assertCountEqual(seen, [task.pk for task in self.matches])
+
+
+@skipUnless(connection.vendor == 'postgresql' and notify.enabled(), 'LISTEN/NOTIFY needs PostgreSQL and psycopg 3')
+class TaskChangeNotifyTests(TransactionTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        notify.ensure_listening()
+        self.subscription = hub.subscribe(self.owner.pk)
+        self.addCleanup(self.subscription.close)
+
+    def test_committed_changes_reach_the_hub(self):
+        task = Task.objects.create(title='notified', owner=self.owner)
+        changes = self.subscription.wait(timeout=5)
+        self.assertEqual([(change.op, change.task_id) for change in changes], [('created', task.pk)])
+
+    def test_rolled_back_changes_are_not_sent(self):
+        with transaction.atomic():
+            Task.objects.create(title='rolled back', owner=self.owner)
+            transaction.set_rollback(True)
+        self.assertEqual(self.subscription.wait(timeout=0.5), [])
+
+
+class JournalPollerTests(TestCase):
+    """The SQLite relay; poll() is what the poller thread runs every tick."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        self.poller = notify.Poller()
+        self.subscription = hub.subscribe(self.owner.pk)
+        self.addCleanup(self.subscription.close)
+
+    def test_publishes_entries_after_the_last_seen(self):
+        last = journal.latest_seq()
+        pk = Task.objects.create(title='polled', owner=self.owner).pk
+        Task.objects.get(pk=pk).delete()
+        last = self.poller.poll(last)
+        self.assertEqual(last, journal.latest_seq())
+        changes = self.subscription.wait(timeout=0)
+        self.assertEqual([(change.op, change.task_id) for change in changes], [('created', pk), ('deleted', pk)])
+        self.assertEqual(self.poller.poll(last), last)
+        self.assertEqual(self.subscription.wait(timeout=0), [])
+
+    def test_compacted_entries_ask_streams_to_resync(self):
+        last = journal.latest_seq()
+        for i in range(3):
+            Task.objects.create(title=f'task {i}', owner=self.owner)
+        journal.compact(keep=1)
+        self.poller.poll(last)
+        self.assertEqual(self.subscription.wait(timeout=0), [RESYNC])
+
+
+def gunzip_each(chunks):
+    """Decode a gzip stream chunk by chunk: what each chunk made decodable on its own."""
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    return [decoder.decompress(chunk) for chunk in chunks]
+
+
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        for i in range(60):
+            Task.objects.create(title=f'report {i}', description='long text ' * 5, owner=cls.owner)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_gzip_json(self):
+        plain = self.client.get('/tasks/')
+        response = self.client.get('/tasks/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content) // 4)
+        # The encoded body has a weak ETag that still revalidates
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        revalidated = self.client.get('/tasks/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_negotiation(self):
+        for header, encoding in (
+            ('gzip', 'gzip'),
+            ('*', 'gzip'),
+            ('gzip;q=0.5, identity', 'gzip'),
+            ('gzip;q=0', None),
+            ('deflate, identity', None),
+            ('', None),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get('/tasks/', HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+        # Brotli is preferred only when installed
+        self.assertIs(compression.negotiate('gzip;q=0, *'), compression.ENCODERS.get('br'))
+        self.assertIs(compression.negotiate('GZIP;Q=1'), compression.GzipEncoder)
+        self.assertIsNone(compression.negotiate('gzip;q=bogus'))
+
+    def test_size_threshold(self):
+        task = Task.objects.first()
+        size = len(self.client.get(f'/tasks/{task.pk}/').content)
+        for minimum, encoded in ((size + 1, False), (size, True)):
+            with self.subTest(minimum=minimum), self.settings(RESPONSE_COMPRESSION_MIN_BYTES=minimum):
+                response = self.client.get(f'/tasks/{task.pk}/', HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response.has_header('Content-Encoding'), encoded)
+        # Bodies gzip would only grow are sent as they are
+        with self.settings(RESPONSE_COMPRESSION_MIN_BYTES=0):
+            response = self.client.get('/tasks/0/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        with self.settings(RESPONSE_COMPRESSION=False):
+            self.assertFalse(self.client.get('/tasks/', HTTP_ACCEPT_ENCODING='gzip').has_header('Content-Encoding'))
+
+    def test_no_double_encoding(self):
+        self.assertNotIn('django.middleware.gzip.GZipMiddleware', settings.MIDDLEWARE)
+        body = gzip.compress(b'{"already": "encoded"}' * 50)
+
+        def view(request):
+            response = HttpResponse(body, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+            return response
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressionMiddleware(view)(request)
+        self.assertEqual(response.content, body)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_streamed_export(self):
+        plain = b''.join(self.client.get('/tasks/export/').streaming_content)
+        response = self.client.get('/tasks/export/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    @override_settings(TASK_STREAM_MAX_SECONDS=5, TASK_STREAM_KEEPALIVE_SECONDS=1)
+    def test_sse_is_flushed_per_event(self):
+        response = self.client.get(
+            '/tasks/stream/', {'token': str(AccessToken.for_user(self.owner))}, HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.addCleanup(response.close)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        chunks = iter(response.streaming_content)
+        # Each chunk decodes on its own into whole events
+        retry, snapshot = gunzip_each([next(chunks), next(chunks)])
+        self.assertEqual(retry, b'retry: 3000\n\n')
+        self.assertTrue(snapshot.endswith(b'\n\n'))
+        self.assertEqual(sse_messages(snapshot.decode())[0][1]['type'], 'snapshot')
+
+
+class AsyncCompressionTests(TransactionTestCase):
+    @override_settings(TASK_STREAM_MAX_SECONDS=30, TASK_STREAM_KEEPALIVE_SECONDS=30)
+    def test_asgi_stream_delivers_each_event_compressed(self):
+        owner = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        token = str(AccessToken.for_user(owner))
+
+        async def run():
+            task, sent, disconnect = asgi_get(
+                '/tasks/stream/', f'token={token}', headers=[(b'accept-encoding', b'gzip')],
+            )
+            start = await asyncio.wait_for(sent.get(), timeout=10)
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            events = []
+
+            async def next_event():
+                while True:
+                    message = await asyncio.wait_for(sent.get(), timeout=10)
+                    text = decoder.decompress(message['body']).decode()
+                    if sse_messages(text):
+                        return sse_messages(text)[0][1]
+
+            events.append(await next_event())
+            await Task.objects.acreate(title='live', owner=owner)
+            # Arrives without waiting for more output or the end of the stream
+            events.append(await next_event())
+            disconnect.set()
+            await asyncio.wait_for(task, timeout=10)
+            return dict(start['headers']), events
+
+        headers, (snapshot, created) = asyncio.run(run())
+        self.assertEqual(headers[b'Content-Encoding'], b'gzip')
+        self.assertEqual(snapshot['type'], 'snapshot')
+        self.assertEqual((created['type'], created['task']['title']), ('created', 'live'))
+
+
+class TaskAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('boss', 'boss@example.com', 'pw')
+        cls.alice = User.objects.create_user('alice', 'alice@example.com', 'pw')
+        for i in range(150):
+            Task.objects.create(
+                title=f'quarterly report {i}' if i % 3 == 0 else f'chore {i}',
+                owner=cls.alice if i % 2 else cls.admin,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def changelist(self, **params):
+        """The response and the COUNT queries it ran."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/admin/myapp/task/', params)
+        self.assertEqual(response.status_code, 200)
+        self.queries = [query['sql'] for query in ctx.captured_queries]
+        return response, [sql for sql in self.queries if 'COUNT(' in sql.upper()]
+
+    def test_unfiltered_count_comes_from_the_counters(self):
+        response, counts = self.changelist()
+        self.assertContains(response, '150 tasks')
+        self.assertTrue(any('SUM(' in sql and 'myapp_taskcounter' in sql for sql in self.queries))
+        self.assertFalse([sql for sql in counts if '"myapp_task"' in sql], counts)
+
+    def test_filtered_and_searched_counts(self):
+        for params, expected in (
+            ({'status__exact': Task.STATUS_PENDING}, 150),
+            ({'q': 'quarterly'}, 50),
+            ({'q': 'alice'}, 75),  # an exact username
+            ({'q': 'ali'}, 0),
+        ):
+            with self.subTest(params=params):
+                self.assertContains(self.changelist(**params)[0], f'{expected} task')
+
+    def test_filtered_counts_stop_at_the_limit(self):
+        with mock.patch.object(TaskPaginator, 'COUNT_LIMIT', 40):
+            response, counts = self.changelist(q='quarterly')
+        self.assertContains(response, '40 tasks')
+        self.assertTrue(counts)
+        self.assertTrue(all('LIMIT 40' in sql for sql in counts), counts)
+        self.assertEqual(TaskPaginator(Task.objects.filter(owner=self.alice).order_by('pk'), 10).count, 75)
+
+    def test_owner_uses_autocomplete(self):
+        self.assertContains(self.client.get('/admin/myapp/task/add/'), 'admin-autocomplete')
+
+    def test_status_action_is_one_journaled_counted_update(self):
+        ids = list(Task.objects.filter(owner=self.alice).order_by('pk').values_list('pk', flat=True)[:10])
+        Task.objects.filter(pk=ids[0]).update(status=Task.STATUS_COMPLETED)
+        counters.refresh([self.alice.pk])
+        latest = journal.latest_seq()
+        before = Task.objects.get(pk=ids[1]).updated_at
+
+        response = self.client.post(
+            '/admin/myapp/task/', {'action': 'mark_completed', '_selected_action': ids}, follow=True,
+        )
+        # The task already completed is neither rewritten nor journaled
+        self.assertContains(response, '9 task(s) marked completed')
+        self.assertEqual(Task.objects.filter(pk__in=ids, status=Task.STATUS_COMPLETED).count(), 10)
+        changes = journal.changes_since(latest)
+        self.assertEqual(sorted(change.task_id for change in changes), ids[1:])
+        self.assertEqual({(change.op, change.owner_id) for change in changes}, {('updated', self.alice.pk)})
+        self.assertGreater(Task.objects.get(pk=ids[1]).updated_at, before)
+        self.assertEqual(counters.rebuild(check=True), [])
+        self.assertEqual(counters.read(self.alice.pk)['status'][Task.STATUS_COMPLETED], 10)
+
+    def test_every_status_has_an_action(self):
+        response = self.client.get('/admin/myapp/task/')
+        for value, _ in Task.STATUS_CHOICES:
+            self.assertContains(response, f'value="mark_{value.replace("-", "_")}"')
@@ -12,5 +12,9 @@ urlpatterns = [
     # ---------- TASKS ----------
     path('tasks/', views.tasks, name='tasks'),
     path('tasks/<int:pk>/', views.task_detail, name='task_detail'),
+    path('tasks/stats/', views.tasks_stats, name='tasks_stats'),
+    path('tasks/bulk/', views.tasks_bulk, name='tasks_bulk'),
+    path('tasks/export/', views.tasks_export, name='tasks_export'),
+    path('tasks/import/', views.tasks_import, name='tasks_import'),
     path('tasks/stream/', views.tasks_stream, name='tasks_stream'),
 ]
@@ -1,21 +1,39 @@
 from datetime import datetime
-import json
+import asyncio
+import hashlib
+import io
 import time
+from collections import defaultdict
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.http import StreamingHttpResponse
-from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
 
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings
 
+from myproject import timing
+from myproject.authentication import aclaims_user, add_user_claims, model_user, recall_token, verify_access_token
+
+from . import bulk, counters, export, imports, journal, notify
+from .backends import users_with_email
+from .events import coalesce, hub
 from .models import Task
-from .serializers import UserSerializer, TaskSerializer
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import SEARCH_RANK, is_ranked, search_tasks
+from .serializers import (
+    UserSerializer, TaskSerializer, parse_task_fields, render_json, serialize_task_values, task_only, task_values,
+)
 
 
 # ---------- AUTH ----------
@@ -24,7 +42,7 @@ def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
     return {
         'refresh': str(refresh),
-        'access': str(refresh.access_token),
+        'access': str(add_user_claims(refresh.access_token, user)),
     }
 
 
@@ -41,7 +59,7 @@ def signup(request):
         return Response({'error': 'Passwords do not match'}, status=status.HTTP_400_BAD_REQUEST)
     if User.objects.filter(username=username).exists():
         return Response({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
-    if User.objects.filter(email=email).exists():
+    if email and users_with_email(email).exists():
         return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
     user = User.objects.create_user(username=username, email=email, password=password)
@@ -58,7 +76,7 @@ def signup(request):
 def signin(request):
     username = request.data.get('username')
     password = request.data.get('password')
-    user = authenticate(username=username, password=password)
+    user = authenticate(request, username=username, password=password)
 
     if user:
         tokens = get_tokens_for_user(user)
@@ -97,7 +115,7 @@ def auth_register(request):
         return Response({'error': 'Passwords do not match'}, status=status.HTTP_400_BAD_REQUEST)
     if User.objects.filter(username=username).exists():
         return Response({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
-    if User.objects.filter(email=email).exists():
+    if email and users_with_email(email).exists():
         return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
     user = User.objects.create_user(username=username, email=email, password=password)
@@ -115,16 +133,8 @@ def auth_register(request):
 def auth_login(request):
     raw_ident = (request.data.get('username') or "").strip()
     password = request.data.get('password')
-    # Try username first
-    user = authenticate(username=raw_ident, password=password)
-    # Fallback: allow email as identifier
-    if not user:
-        try:
-            candidate = User.objects.filter(email__iexact=raw_ident).first()
-            if candidate:
-                user = authenticate(username=candidate.username, password=password)
-        except Exception:
-            user = None
+    # Username or email; EmailOrUsernameBackend resolves it with one query and one hash
+    user = authenticate(request, username=raw_ident, password=password)
 
     if user:
         tokens = get_tokens_for_user(user)
@@ -181,7 +191,12 @@ def auth_refresh(request):
         return Response({'error': 'No refresh token'}, status=status.HTTP_401_UNAUTHORIZED)
     try:
         refresh = RefreshToken(refresh_cookie)
-        new_access = str(refresh.access_token)
+        access = refresh.access_token
+        if settings.JWT_USER_CLAIMS:
+            # Claims are minted from the current row, never copied forward
+            user = User.objects.get(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True)
+            add_user_claims(access, user)
+        new_access = str(access)
         resp = Response({'message': 'refreshed'})
         _set_auth_cookies(resp, new_access, refresh_cookie)
         return resp
@@ -191,50 +206,133 @@ def auth_refresh(request):
 
 # ---------- TASKS (CRUD + filter/search) ----------
 
+def _is_asgi(request):
+    """Whether the ASGI handler is serving this Django or DRF request."""
+    # Only ASGIRequest has a scope; DRF's Request proxies the attribute
+    return getattr(request, 'scope', None) is not None
+
+
+def _json_response(data, status=status.HTTP_200_OK):
+    # Pre-rendered with the fast encoder; skips DRF's renderer negotiation
+    return HttpResponse(render_json(data), status=status, content_type='application/json')
+
+
+TASK_ORDERING = ('-updated_at', '-id')
+SEARCH_ORDERING = (SEARCH_RANK, '-updated_at', '-id')
+task_paginator = KeysetPaginator(TASK_ORDERING)
+search_paginator = KeysetPaginator(SEARCH_ORDERING)
+
+
+def _visible_tasks(user):
+    # Admins can see all tasks; others only their own
+    if user.is_superuser or user.is_staff:
+        return Task.objects.all()
+    return Task.objects.filter(owner_id=user.pk)
+
+
+def _tasks_version(user):
+    # Staff see everyone's tasks, so any change anywhere is a new version
+    if user.is_superuser or user.is_staff:
+        return 'all', journal.latest_seq()
+    return 'own', journal.owner_version(user.pk)
+
+
+def _task_etag(request, *parts):
+    """Strong ETag for a task response, computed without touching the tasks table."""
+    user = request.user
+    basis = (
+        *_tasks_version(user), *parts,
+        user.pk, user.username, user.email, user.first_name, user.last_name,
+        request.get_full_path(), request.META.get('HTTP_ACCEPT', ''),
+    )
+    digest = hashlib.blake2b(repr(basis).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def _not_modified(request, etag, exists=None):
+    # If-None-Match uses weak comparison, so a W/ prefix from an
+    # intermediary that re-encoded the body still matches. "*" matches any
+    # current representation; ``exists`` says whether there is one.
+    tags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if etag in tags or f'W/{etag}' in tags or ('*' in tags and (exists is None or exists())):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+    return None
+
+
+def _with_etag(response, etag):
+    response['ETag'] = etag
+    # Let browsers keep the body but revalidate it on every use
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _filter_tasks(qs, params):
+    status_param = params.get('status')
+    priority_param = params.get('priority')
+    due_before = params.get('due_before')
+    due_after = params.get('due_after')
+    search = params.get('search')
+
+    if status_param:
+        qs = qs.filter(status=status_param)
+    if priority_param:
+        qs = qs.filter(priority=priority_param)
+    if due_before:
+        try:
+            dt = datetime.strptime(due_before, '%Y-%m-%d').date()
+            qs = qs.filter(due_date__lte=dt)
+        except ValueError:
+            pass
+    if due_after:
+        try:
+            dt = datetime.strptime(due_after, '%Y-%m-%d').date()
+            qs = qs.filter(due_date__gte=dt)
+        except ValueError:
+            pass
+    if search:
+        qs = search_tasks(qs, search)
+    return qs
+
+
+def _paginator_for(qs):
+    # Full-text results are ordered by relevance, everything else by recency
+    return search_paginator if is_ranked(qs) else task_paginator
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def tasks(request):
     user = request.user
 
     if request.method == 'GET':
-        # Admins can see all tasks; others only their own
-        if user.is_superuser or user.is_staff:
-            qs = Task.objects.all().order_by('-updated_at')
-        else:
-            qs = Task.objects.filter(owner=user).order_by('-updated_at')
-
-        status_param = request.GET.get('status')
-        priority_param = request.GET.get('priority')
-        due_before = request.GET.get('due_before')
-        due_after = request.GET.get('due_after')
-        search = request.GET.get('search')
-
-        if status_param:
-            qs = qs.filter(status=status_param)
-        if priority_param:
-            qs = qs.filter(priority=priority_param)
-        if due_before:
-            try:
-                dt = datetime.strptime(due_before, '%Y-%m-%d').date()
-                qs = qs.filter(due_date__lte=dt)
-            except ValueError:
-                pass
-        if due_after:
-            try:
-                dt = datetime.strptime(due_after, '%Y-%m-%d').date()
-                qs = qs.filter(due_date__gte=dt)
-            except ValueError:
-                pass
-        if search:
-            qs = qs.filter(Q(title__icontains=search) | Q(description__icontains=search))
-
-        serializer = TaskSerializer(qs, many=True)
-        return Response(serializer.data)
+        etag = _task_etag(request)
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
+
+        try:
+            fields = parse_task_fields(request.GET.get('fields'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        qs = _filter_tasks(_visible_tasks(user), request.GET)
+        paginator = _paginator_for(qs)
+        # The cursor is built from the ordering columns, requested or not
+        rows = task_values(qs, extra=[name for name, _ in paginator.fields], fields=fields)
+        try:
+            page, next_cursor, prev_cursor = paginator.paginate(rows, request.GET)
+        except InvalidCursor:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with timing.section():
+            data = paginator.get_paginated_data(serialize_task_values(page, fields), next_cursor, prev_cursor)
+            return _with_etag(_json_response(data), etag)
 
     if request.method == 'POST':
         serializer = TaskSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(owner=user)
+            serializer.save(owner=model_user(user))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -242,17 +340,28 @@ def tasks(request):
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def task_detail(request, pk):
+    fields = None
+    if request.method == 'GET':
+        etag = _task_etag(request, pk)
+        not_modified = _not_modified(request, etag, exists=_visible_tasks(request.user).filter(pk=pk).exists)
+        if not_modified:
+            return not_modified
+        try:
+            fields = parse_task_fields(request.GET.get('fields'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
     try:
         if request.user.is_superuser or request.user.is_staff:
-            task = Task.objects.get(pk=pk)
+            task = task_only(Task.objects, fields).get(pk=pk)
         else:
-            task = Task.objects.get(pk=pk, owner=request.user)
+            task = task_only(Task.objects, fields).get(pk=pk, owner_id=request.user.pk)
     except Task.DoesNotExist:
         return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
-        serializer = TaskSerializer(task)
-        return Response(serializer.data)
+        serializer = TaskSerializer(task, fields=fields)
+        return _with_etag(Response(serializer.data), etag)
 
     if request.method == 'PUT':
         serializer = TaskSerializer(task, data=request.data, partial=True)
@@ -266,9 +375,206 @@ def task_detail(request, pk):
         return Response({'message': 'Task deleted'}, status=status.HTTP_200_OK)
 
 
+def _task_stats(user):
+    # Same scoping as _visible_tasks: staff get the sum over every owner
+    if user.is_superuser or user.is_staff:
+        return counters.read_all()
+    return counters.read(user.pk)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tasks_stats(request):
+    """Dashboard counts for the tasks the caller can see, read from TaskCounter."""
+    etag = _task_etag(request, timezone.localdate())
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    return _with_etag(_json_response(_task_stats(request.user)), etag)
+
+
+def _validate_items(validator, items, errors, key):
+    # One serializer instance validates every item; run_validation applies the
+    # same field rules and validate_* hooks as is_valid() without the per-item setup
+    validated = []
+    for index, item in enumerate(items):
+        try:
+            validated.append(validator.run_validation(item))
+        except serializers.ValidationError as exc:
+            errors[key][index] = exc.detail
+            validated.append(None)
+    return validated
+
+
+def _bulk_ids(items, errors, key, seen):
+    ids = []
+    for index, item in enumerate(items):
+        pk = item.get('id') if isinstance(item, dict) else item
+        if isinstance(pk, bool) or not isinstance(pk, int):
+            errors[key][index] = {'id': ['A task id is required.']}
+            pk = None
+        elif pk in seen:
+            errors[key][index] = {'id': ['Task appears more than once in this request.']}
+        else:
+            seen.add(pk)
+        ids.append(pk)
+    return ids
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tasks_bulk(request):
+    """Create, partially update and delete many tasks, all or none, in one transaction."""
+    user = request.user
+    body = request.data
+    if not isinstance(body, dict):
+        return Response(
+            {'error': 'Expected an object with create, update and/or delete lists'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    creates = body.get('create') or []
+    updates = body.get('update') or []
+    deletes = body.get('delete') or []
+    if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+        return Response({'error': 'create, update and delete must be lists'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(creates) + len(updates) + len(deletes) > settings.TASK_BULK_MAX_ITEMS:
+        return Response(
+            {'error': f'At most {settings.TASK_BULK_MAX_ITEMS} items per request'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    errors = {'create': {}, 'update': {}, 'delete': {}}
+    seen = set()
+    update_ids = _bulk_ids(updates, errors, 'update', seen)
+    delete_ids = _bulk_ids(deletes, errors, 'delete', seen)
+    created = _validate_items(TaskSerializer(), creates, errors, 'create')
+    changes = _validate_items(
+        TaskSerializer(partial=True),
+        [{k: v for k, v in item.items() if k != 'id'} if isinstance(item, dict) else item for item in updates],
+        errors, 'update',
+    )
+
+    # bulk_create() and bulk_update() send no signals, so their changes are
+    # recorded here; save() and delete() signals land in the same batches
+    with transaction.atomic(), journal.batch(), counters.batch():
+        # One query loads and locks every task to update or delete, under
+        # task_detail's visibility rules, so each delta starts from the stored row
+        found = (
+            _visible_tasks(user).select_related('owner').select_for_update(of=('self',)).in_bulk(seen)
+            if seen else {}
+        )
+        for key, ids in (('update', update_ids), ('delete', delete_ids)):
+            for index, pk in enumerate(ids):
+                if index not in errors[key] and pk not in found:
+                    errors[key][index] = {'id': ['Task not found.']}
+
+        errors = {key: items for key, items in errors.items() if items}
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        owner = model_user(user)
+        new_tasks = [Task(owner=owner, **data) for data in created]
+        updated_tasks, updated = [], []
+        # Each item writes only the fields it sent; tasks sending the same
+        # fields share one UPDATE
+        by_fields = defaultdict(list)
+        for pk, data in zip(update_ids, changes):
+            task = found[pk]
+            old = counters.loaded_state(task)
+            for field, value in data.items():
+                setattr(task, field, value)
+            # bulk_update() skips auto_now
+            task.updated_at = now
+            by_fields[tuple(sorted({*data, 'updated_at'}))].append(task)
+            updated_tasks.append(task)
+            updated.append((pk, old, counters.task_state(task)))
+
+        if connection.features.can_return_rows_from_bulk_insert:
+            Task.objects.bulk_create(new_tasks)
+            bulk.record_bulk(created=[(task.pk, counters.task_state(task)) for task in new_tasks])
+        else:
+            # Without RETURNING the new ids are unknown after bulk_create()
+            for task in new_tasks:
+                task.save()
+        for fields, tasks in by_fields.items():
+            Task.objects.bulk_update(tasks, fields)
+        bulk.record_bulk(updated=updated)
+        if delete_ids:
+            Task.objects.filter(pk__in=delete_ids).delete()
+
+    return Response({
+        'created': TaskSerializer(new_tasks, many=True).data,
+        'updated': TaskSerializer(updated_tasks, many=True).data,
+        'deleted': delete_ids,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tasks_export(request):
+    """Every task the list would return for these filters, streamed as NDJSON or CSV."""
+    output = request.GET.get('output', 'ndjson')
+    if output not in export.FORMATS:
+        return Response(
+            {'error': f"output must be one of: {', '.join(export.FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    qs = _filter_tasks(_visible_tasks(request.user), request.GET)
+    rows = task_values(qs.order_by(*(SEARCH_ORDERING if is_ranked(qs) else TASK_ORDERING)))
+    # As with the stream, only serve an async iterator to the ASGI app
+    if _is_asgi(request):
+        content = export.aexport_stream(rows, output)
+    else:
+        content = export.export_stream(rows, output)
+
+    content_type, extension = export.FORMATS[output]
+    resp = StreamingHttpResponse(content, content_type=content_type)
+    resp['Content-Disposition'] = f'attachment; filename="tasks-{timezone.localdate():%Y%m%d}.{extension}"'
+    resp['Cache-Control'] = 'private, no-store'
+    return resp
+
+
+def _import_format(request, upload):
+    if 'input' in request.GET:
+        return request.GET['input']
+    name = getattr(upload, 'name', '') or ''
+    if name.lower().endswith('.csv') or (not name and request.content_type.startswith('text/csv')):
+        return 'csv'
+    return 'ndjson'
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def tasks_import(request):
+    """Create the caller's tasks from an NDJSON or CSV upload, e.g. a tasks/export/ file."""
+    upload = None
+    if request.content_type.startswith('multipart/form-data'):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload the file in a "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+    # DRF's stream reads the body lazily instead of loading it whole; None when empty
+    stream = upload if upload is not None else request.stream or io.BytesIO()
+    dry_run = request.GET.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+    errors = []
+
+    def on_error(line, detail):
+        if len(errors) < settings.TASK_IMPORT_MAX_ERRORS:
+            errors.append({'line': line, 'errors': detail})
+
+    try:
+        report = imports.import_tasks(
+            stream, _import_format(request, upload), model_user(request.user), dry_run=dry_run, on_error=on_error,
+        )
+    except imports.ImportFormatError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({**report, 'dry_run': dry_run, 'errors': errors})
+
+
 # ---------- TASKS SSE (Server-Sent Events) ----------
 
-def _user_from_token(request):
+def _token_from_request(request):
     token = request.GET.get('token')
     if not token:
         auth = request.META.get('HTTP_AUTHORIZATION', '')
@@ -276,48 +582,176 @@ def _user_from_token(request):
             token = auth.split(' ', 1)[1]
     if not token:
         token = request.COOKIES.get('access')
+    return token
+
+
+async def _auser_from_token(request):
     try:
-        access = AccessToken(token)
+        raw_token = _token_from_request(request)
+        access = recall_token(request, raw_token) or verify_access_token(raw_token)
         user_id = access.get('user_id')
-        return User.objects.filter(id=user_id).first()
+        return await aclaims_user(access) or await User.objects.filter(id=user_id).afirst()
     except Exception:
         return None
 
 
-def tasks_stream(request):
+def _last_event_id(request):
+    # Browsers send Last-Event-ID when EventSource reconnects on its own
+    raw = request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('last_event_id')
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def _sse(payload, event_id=None):
+    data = f"data: {render_json(payload).decode()}\n\n"
+    return f"id: {event_id}\n{data}" if event_id is not None else data
+
+
+class TaskStream:
+    """Builds the SSE messages for one connection, each with its journal seq as the event id."""
+
+    def __init__(self, user, last_event_id=None, include_tasks=True, include_stats=False, fields=None):
+        self.user = user
+        # Sparse fieldset for snapshot and delta tasks (see parse_task_fields)
+        self.fields = fields
+        self.owner_id = None if (user.is_superuser or user.is_staff) else user.id
+        self.last_event_id = last_event_id
+        # Clients that only use the stream as a change signal skip the task list
+        self.include_tasks = include_tasks
+        # Dashboards get fresh tasks/stats/ numbers (a counter row read) after every change
+        self.include_stats = include_stats
+        self.seq = 0
+
+    def tasks(self):
+        return task_values(_visible_tasks(self.user).order_by('-updated_at'), fields=self.fields)
+
+    def open(self):
+        """First message: a replay from Last-Event-ID if possible, else a snapshot."""
+        if self.last_event_id is not None and journal.can_resume(self.last_event_id):
+            self.seq = self.last_event_id
+            changes = journal.changes_since(self.last_event_id, self.owner_id)
+            return self.apply(changes) or self._with_stats(": resumed\n\n")
+        return self.snapshot()
+
+    def _with_stats(self, events):
+        if not self.include_stats:
+            return events
+        stats = _task_stats(self.user)
+        with timing.section():
+            return events + _sse({'type': 'stats', 'stats': stats}, self.seq)
+
+    def snapshot(self):
+        # Read the journal position first: anything newer is re-sent as a delta
+        self.seq = journal.latest_seq()
+        if not self.include_tasks:
+            return self._with_stats(_sse({'type': 'snapshot'}, self.seq))
+        rows = list(self.tasks())
+        with timing.section():
+            events = _sse({'type': 'snapshot', 'tasks': serialize_task_values(rows, self.fields)}, self.seq)
+        return self._with_stats(events)
+
+    def apply(self, changes):
+        """Messages for a batch of changes, or None if there is nothing to send."""
+        ops = coalesce(changes)
+        if ops is None:
+            return self.snapshot()
+        if not ops:
+            return None
+
+        live_ids = [pk for pk, (op, _) in ops.items() if op != 'deleted']
+        found = list(self.tasks().filter(id__in=live_ids)) if live_ids else []
+        with timing.section():
+            rows = {item['id']: item for item in serialize_task_values(found, self.fields)}
+            events = self._delta_events(ops, rows)
+        return self._with_stats(events) if events else None
+
+    def _delta_events(self, ops, rows):
+        # Send in seq order so an event id always covers everything before it.
+        # Changes already covered by the snapshot are re-sent rather than
+        # dropped: a delta is idempotent, and on backends where sequence
+        # numbers can commit out of order skipping them could lose a write.
+        events = []
+        for pk, (op, seq) in sorted(ops.items(), key=lambda item: item[1][1]):
+            self.seq = max(self.seq, seq)
+            if op == 'deleted':
+                events.append(_sse({'type': 'deleted', 'id': pk}, self.seq))
+            elif pk in rows:
+                events.append(_sse({'type': op, 'task': rows[pk]}, self.seq))
+            # else: deleted before we read it; its delete event follows
+        return ''.join(events) or None
+
+
+def _event_stream(stream):
+    """Blocking generator for WSGI servers; holds one thread per connection."""
+    # Subscribe before the first read so no change can slip in between
+    notify.ensure_listening()
+    subscription = hub.subscribe(stream.owner_id)
+    try:
+        yield "retry: 3000\n\n"
+        yield stream.open()
+
+        deadline = time.monotonic() + settings.TASK_STREAM_MAX_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Idle streams sleep here without touching the database
+            changes = subscription.wait(timeout=min(settings.TASK_STREAM_KEEPALIVE_SECONDS, remaining))
+            events = stream.apply(changes) if changes else None
+            yield events or ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+async def _aevent_stream(stream):
+    """Async generator for ASGI servers; an idle connection is just a parked coroutine."""
+    relay = notify.relay()
+    if relay is not None and not relay.ready.is_set():
+        await sync_to_async(notify.ensure_listening)()
+    subscription = hub.subscribe_async(stream.owner_id)
+    try:
+        yield "retry: 3000\n\n"
+        yield await sync_to_async(stream.open)()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.TASK_STREAM_MAX_SECONDS
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            changes = await subscription.wait(timeout=min(settings.TASK_STREAM_KEEPALIVE_SECONDS, remaining))
+            events = await sync_to_async(stream.apply)(changes) if changes else None
+            yield events or ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+async def tasks_stream(request):
     # Authenticate via JWT from query param or header
-    user = _user_from_token(request)
+    user = await _auser_from_token(request)
     if not user:
-        return StreamingHttpResponse((line for line in ["event: error\n", "data: unauthorized\n\n"]),
-                                     content_type='text/event-stream', status=401)
+        return HttpResponse("event: error\ndata: unauthorized\n\n", content_type='text/event-stream', status=401)
 
-    def event_stream():
-        yield "retry: 3000\n\n"
-        base_qs = Task.objects.all() if (user.is_superuser or user.is_staff) else Task.objects.filter(owner=user)
-        current = base_qs.order_by('-updated_at')
-        payload = json.dumps({
-            'type': 'snapshot',
-            'tasks': TaskSerializer(current, many=True).data,
-        })
-        yield f"data: {payload}\n\n"
-        last_ts = current.first().updated_at.isoformat() if current.exists() else None
-
-        deadline = time.time() + 300
-        while time.time() < deadline:
-            time.sleep(2)
-            qs = (Task.objects.all() if (user.is_superuser or user.is_staff) else Task.objects.filter(owner=user)).order_by('-updated_at')
-            latest = qs.first().updated_at.isoformat() if qs.exists() else None
-            if latest != last_ts:
-                payload = json.dumps({
-                    'type': 'update',
-                    'tasks': TaskSerializer(qs, many=True).data,
-                })
-                yield f"data: {payload}\n\n"
-                last_ts = latest
-            else:
-                yield ": keep-alive\n\n"
-
-    resp = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    try:
+        fields = parse_task_fields(request.GET.get('fields'))
+    except ValueError as exc:
+        return HttpResponse(f"event: error\ndata: {exc}\n\n", content_type='text/event-stream', status=400)
+
+    # Django buffers async iterators completely under WSGI, so only stream
+    # asynchronously when served by the ASGI app.
+    stream = TaskStream(
+        user, _last_event_id(request),
+        include_tasks=request.GET.get('snapshot') != '0',
+        include_stats=request.GET.get('stats') == '1',
+        fields=fields,
+    )
+    if _is_asgi(request):
+        content = _aevent_stream(stream)
+    else:
+        content = _event_stream(stream)
+    resp = StreamingHttpResponse(content, content_type='text/event-stream')
     resp["Cache-Control"] = "no-cache"
     resp["X-Accel-Buffering"] = "no"
     return resp
@@ -0,0 +1,196 @@
+"""JWT verification at most once per token, and request users rebuilt from token claims."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+# Everything current_user and the task views read from request.user
+USER_CLAIMS = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser')
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of validated access tokens, safe to share between threads."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None:
+                return None
+            token, expires = entry
+            if expires <= time.time():
+                del self._tokens[key]
+                return None
+            self._tokens.move_to_end(key)
+            return token
+
+    def set(self, key, token):
+        if self.maxsize <= 0:
+            return
+        expires = token.get('exp', 0)
+        with self._lock:
+            self._tokens[key] = (token, expires)
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+    def __len__(self):
+        return len(self._tokens)
+
+
+token_cache = VerifiedTokenCache(settings.JWT_VERIFIED_TOKEN_CACHE_SIZE)
+
+
+def _key(raw_token):
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.sha256(raw_token).digest()
+
+
+def verify_access_token(raw_token, verify=AccessToken):
+    """Validated token for raw_token, verifying it only on a cache miss.
+
+    Raises whatever ``verify`` raises for an invalid token; failures are not
+    cached, so a bad token costs a verification every time.
+    """
+    key = _key(raw_token)
+    token = token_cache.get(key)
+    if token is None:
+        token = verify(raw_token)
+        token_cache.set(key, token)
+    return token
+
+
+def remember_token(request, raw_token, token):
+    # Later layers (DRF authentication, the SSE view) reuse it without a lookup
+    request.validated_access_token = (_key(raw_token), token)
+
+
+def recall_token(request, raw_token):
+    stored = getattr(request, 'validated_access_token', None)
+    if stored is not None and stored[0] == _key(raw_token):
+        return stored[1]
+    return None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that reuses a token the middleware already verified."""
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = recall_token(request, raw_token)
+        if validated_token is None:
+            validated_token = self.get_validated_token(raw_token)
+            remember_token(request, raw_token, validated_token)
+        return self.get_user(validated_token), validated_token
+
+    def get_validated_token(self, raw_token):
+        return verify_access_token(raw_token, verify=super().get_validated_token)
+
+
+# ---------- claims-based users ----------
+
+def add_user_claims(token, user):
+    """Embed the user's claims in an access token (when JWT_USER_CLAIMS is on)."""
+    if settings.JWT_USER_CLAIMS:
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        # The claims are as of now, even on an access token derived from an
+        # older refresh token (which would otherwise pass on its own iat)
+        token.set_iat()
+    return token
+
+
+def _stale_key(user_id):
+    return f'jwt-claims-stale:{user_id}'
+
+
+def invalidate_user_claims(user_id):
+    """Stop trusting claims in tokens minted for user_id until now.
+
+    The marker lives in the default cache for one access token lifetime, so
+    with several processes that cache must be shared (e.g. Redis).
+    """
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(_stale_key(user_id), int(time.time()), timeout=timeout)
+
+
+def _stale_key_for(token):
+    """The token's stale-marker key, or None if it carries no usable claims."""
+    if not settings.JWT_USER_CLAIMS or any(claim not in token for claim in USER_CLAIMS):
+        return None
+    return _stale_key(token[api_settings.USER_ID_CLAIM])
+
+
+def _fresh_claims_user(token, stale_since):
+    # iat has one-second resolution: a token minted in the same second as the
+    # change is treated as stale
+    if stale_since is not None and token.get('iat', 0) <= stale_since:
+        return None
+    return ClaimsUser(token)
+
+
+def claims_user(token):
+    """A ClaimsUser for the token, or None if its claims are missing or stale."""
+    key = _stale_key_for(token)
+    if key is None:
+        return None
+    return _fresh_claims_user(token, cache.get(key))
+
+
+async def aclaims_user(token):
+    """claims_user() for async views, reading the cache without blocking the event loop."""
+    key = _stale_key_for(token)
+    if key is None:
+        return None
+    return _fresh_claims_user(token, await cache.aget(key))
+
+
+class ClaimsUser(TokenUser):
+    """Request user backed by access token claims instead of an auth_user row."""
+
+    @cached_property
+    def id(self):
+        # Tokens carry the id as a string; compare equal to owner_id columns
+        return User._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    def as_model(self):
+        """An unsaved User carrying the claims, for foreign keys and serializers."""
+        user = User(id=self.id, **{claim: self.token[claim] for claim in USER_CLAIMS})
+        user._state.adding = False
+        return user
+
+
+def model_user(user):
+    """A User instance for request.user, without a query for claims users."""
+    return user.as_model() if isinstance(user, ClaimsUser) else user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """CachedJWTAuthentication whose user comes from current token claims."""
+
+    def get_user(self, validated_token):
+        return claims_user(validated_token) or super().get_user(validated_token)
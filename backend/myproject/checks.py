@@ -0,0 +1,55 @@
+"""System checks for settings and schema the app relies on."""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.db import connections
+
+from myapp.search import missing_sqlite_fts_triggers
+
+# Backends whose values only one process can see
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+DUMMY_CACHE = 'django.core.cache.backends.dummy.DummyCache'
+
+
+@register(Tags.security, Tags.caches)
+def check_user_claims_cache(app_configs, **kwargs):
+    # JWT_USER_CLAIMS relies on the default cache to tell every worker that a
+    # user's older tokens carry stale claims (see myproject.authentication)
+    if not getattr(settings, 'JWT_USER_CLAIMS', False):
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend == DUMMY_CACHE:
+        return [Error(
+            'JWT_USER_CLAIMS is on but the default cache stores nothing, so '
+            'changes to a user never invalidate the claims in their tokens.',
+            hint='Configure a shared cache (REDIS_URL) or set JWT_USER_CLAIMS=false.',
+            id='myproject.E001',
+        )]
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Warning(
+            'JWT_USER_CLAIMS is on but the default cache is per process: a '
+            'user change seen by one worker leaves stale claims (e.g. is_staff) '
+            'trusted by the others until their tokens expire.',
+            hint='Run a single worker, configure a shared cache (REDIS_URL) '
+                 'or set JWT_USER_CLAIMS=false.',
+            id='myproject.W001',
+        )]
+    return []
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs, databases=None, **kwargs):
+    warnings = []
+    for alias in databases or ():
+        missing = missing_sqlite_fts_triggers(connections[alias])
+        if missing:
+            warnings.append(Warning(
+                f"Database '{alias}' has the task search index but not its "
+                f"triggers ({', '.join(missing)}), so task writes no longer "
+                'reach search results.',
+                hint='Run migrate, which recreates them and reindexes the tasks.',
+                id='myproject.W002',
+            ))
+    return warnings
@@ -0,0 +1,100 @@
+"""Response body encoders for CompressionMiddleware: gzip, and brotli when installed."""
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self):
+        # wbits 16 + 15: gzip header and trailer around a 32 KB window
+        self._compressor = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data, flush=False):
+        out = self._compressor.compress(data)
+        # Z_SYNC_FLUSH ends on a byte boundary without resetting the window
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+
+    def chunk(self, data, flush=False):
+        out = self._compressor.process(data)
+        return out + self._compressor.flush() if flush else out
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+# Preferred first when the client accepts several equally
+ENCODERS = {'gzip': GzipEncoder}
+if brotli is not None:
+    ENCODERS = {'br': BrotliEncoder, **ENCODERS}
+
+
+def _accepted(header):
+    """Content-codings in an Accept-Encoding header mapped to their q-values."""
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            accepted[coding.lower()] = q
+    return accepted
+
+
+def negotiate(header):
+    """The Encoder class to use for an Accept-Encoding header, or None for identity."""
+    accepted = _accepted(header or '')
+    best, best_q = None, 0.0
+    for name, encoder in ENCODERS.items():
+        q = accepted.get(name, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoder, q
+    return best
+
+
+def compress(encoder_class, content):
+    """A whole body in one go."""
+    encoder = encoder_class()
+    return encoder.chunk(content) + encoder.finish()
+
+
+def compress_stream(encoder_class, chunks, flush):
+    """Encode an iterable of byte chunks; with flush, every chunk is sent in full."""
+    encoder = encoder_class()
+    for data in chunks:
+        out = encoder.chunk(data, flush)
+        if out:
+            yield out
+    yield encoder.finish()
+
+
+async def acompress_stream(encoder_class, chunks, flush):
+    """compress_stream() for async iterables."""
+    encoder = encoder_class()
+    async for data in chunks:
+        out = encoder.chunk(data, flush)
+        if out:
+            yield out
+    yield encoder.finish()
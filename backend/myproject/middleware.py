@@ -1,9 +1,20 @@
+import itertools
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
 from django.utils.deprecation import MiddlewareMixin
 
+from . import compression, timing
+
 try:
-    from rest_framework_simplejwt.tokens import AccessToken
+    from .authentication import remember_token, verify_access_token
 except Exception:  # pragma: no cover
-    AccessToken = None
+    verify_access_token = None
+
+timing_logger = logging.getLogger('myproject.timing')
 
 
 class JWTAuthCookieMiddleware(MiddlewareMixin):
@@ -11,6 +22,7 @@ class JWTAuthCookieMiddleware(MiddlewareMixin):
 
     - Skips auth endpoints to avoid 401s from expired/invalid cookies on AllowAny views
     - Validates the cookie token format before injecting; if invalid/expired, do not inject
+    - Keeps the validated token on the request so DRF does not verify it again
     """
 
     SKIP_PREFIXES = ("/auth/",)
@@ -30,11 +42,158 @@ class JWTAuthCookieMiddleware(MiddlewareMixin):
             return None
 
         # Only inject if token parses successfully (avoids raising in AllowAny views)
-        if AccessToken is not None:
+        if verify_access_token is not None:
             try:
-                AccessToken(token)  
+                remember_token(request, token, verify_access_token(token))
             except Exception:
                 return None
 
         request.META["HTTP_AUTHORIZATION"] = f"Bearer {token}"
         return None
+
+
+class ServerTimingMiddleware:
+    """Report query count, SQL time, serialization time and view time per request.
+
+    Regular responses get a ``Server-Timing`` header (and, with
+    REQUEST_TIMING_LOG, one structured log line). Streaming responses such as
+    the task SSE stream have sent their headers before any event exists, so
+    each streamed chunk that ran queries is logged on its own instead.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        current, token = timing.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.finish(token)
+        return self.process_response(request, response, current)
+
+    async def __acall__(self, request):
+        current, token = timing.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.finish(token)
+        return self.process_response(request, response, current)
+
+    def process_response(self, request, response, current):
+        total = current.elapsed
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = current.header(total)
+        if settings.REQUEST_TIMING_LOG:
+            self.log(request, response, current.as_dict(total))
+        if response.streaming and settings.REQUEST_TIMING_LOG:
+            if response.is_async:
+                response.streaming_content = self._atimed_stream(request, response, response.streaming_content)
+            else:
+                response.streaming_content = self._timed_stream(request, response, response.streaming_content)
+        return response
+
+    def log(self, request, response, fields, event=None):
+        record = {'method': request.method, 'path': request.path, 'status': response.status_code}
+        if event is not None:
+            record['event'] = event
+        record.update(fields)
+        timing_logger.info(json.dumps(record))
+
+    def _timed_stream(self, request, response, content):
+        iterator = iter(content)
+        for event in itertools.count(1):
+            current, token = timing.start()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                timing.finish(token)
+            if current.queries:
+                self.log(request, response, current.as_dict(), event=event)
+            yield chunk
+
+    async def _atimed_stream(self, request, response, content):
+        iterator = aiter(content)
+        for event in itertools.count(1):
+            current, token = timing.start()
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            finally:
+                timing.finish(token)
+            if current.queries:
+                self.log(request, response, current.as_dict(), event=event)
+            yield chunk
+
+
+class CompressionMiddleware:
+    """Compress JSON, NDJSON, CSV and SSE responses with brotli or gzip.
+
+    Unlike Django's GZipMiddleware, a stream keeps one compressor for its
+    whole life, and SSE responses are flushed after every event, so a
+    compressed stream delivers each event as soon as the view yields it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not settings.RESPONSE_COMPRESSION or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in settings.RESPONSE_COMPRESSION_TYPES:
+            return response
+        if not response.streaming and len(response.content) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoder = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoder is None:
+            return response
+
+        if response.streaming:
+            flush = content_type in settings.RESPONSE_COMPRESSION_FLUSH_TYPES
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(encoder, response.streaming_content, flush)
+            else:
+                response.streaming_content = compression.compress_stream(encoder, response.streaming_content, flush)
+            del response.headers['Content-Length']
+        else:
+            content = compression.compress(encoder, response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        # The encoded body differs byte for byte, so a strong ETag becomes weak
+        # (views match If-None-Match weakly, so revalidation still works)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoder.name
+        return response
@@ -0,0 +1,93 @@
+"""Per-request SQL and serialization timing, collected through a context variable."""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    __slots__ = ('started', 'queries', 'sql', 'serialize')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.serialize = 0.0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def header(self, total=None):
+        total = self.elapsed if total is None else total
+        return (
+            f'db;desc="{self.queries} queries";dur={self.sql * 1000:.2f}, '
+            f'ser;dur={self.serialize * 1000:.2f}, '
+            f'view;dur={total * 1000:.2f}'
+        )
+
+    def as_dict(self, total=None):
+        total = self.elapsed if total is None else total
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.sql * 1000, 2),
+            'ser_ms': round(self.serialize * 1000, 2),
+            'view_ms': round(total * 1000, 2),
+        }
+
+
+def start():
+    """Activate a fresh RequestTiming; returns (timing, token) for finish()."""
+    install()
+    timing = RequestTiming()
+    return timing, _current.set(timing)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+@contextmanager
+def section(name='serialize'):
+    """Attribute the enclosed block's wall time to the current request."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timing, name, getattr(timing, name) + time.perf_counter() - started)
+
+
+def _record_sql(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.queries += 1
+        timing.sql += time.perf_counter() - started
+
+
+def _install_wrapper(connection, **kwargs):
+    if _record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_sql)
+
+
+def install():
+    # Connections opened later are covered by connection_created; this covers
+    # the ones this thread already has open.
+    for connection in connections.all(initialized_only=True):
+        _install_wrapper(connection)
+
+
+connection_created.connect(_install_wrapper, dispatch_uid='request_timing_sql')
@@ -8,10 +8,19 @@ export const listTasks = async (filters = {}) => {
   if (filters.due_before) params.due_before = filters.due_before;
   if (filters.due_after) params.due_after = filters.due_after;
   if (filters.search) params.search = filters.search;
+  if (filters.limit) params.limit = filters.limit;
+  if (filters.cursor) params.cursor = filters.cursor;
+  // Paginated: { results, next, previous } where next/previous are opaque cursors
   const res = await axios.get("tasks/", { params });
   return res.data;
 };
 
+// Dashboard counts: { total, status, priority, due_today, due_this_week, overdue, activity }
+export const getTaskStats = async () => {
+  const res = await axios.get("tasks/stats/");
+  return res.data;
+};
+
 export const createTask = async (data) => {
   const res = await axios.post("tasks/", data);
   return res.data;
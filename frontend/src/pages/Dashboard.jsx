@@ -1,6 +1,6 @@
 // src/pages/Dashboard.jsx
-import React, { useEffect, useMemo, useState } from "react";
-import { listTasks } from "../api/tasks";
+import React, { useEffect, useRef, useState } from "react";
+import { getTaskStats, listTasks } from "../api/tasks";
 import axios from "../api/axios";
 import { API_BASE } from "../api/axios";
 import "./dashboard.css";
@@ -34,18 +34,42 @@ function ProgressBar({ label, value, max, color = "#457b9d" }) {
   );
 }
 
+const EMPTY_STATS = {
+  total: 0,
+  status: { pending: 0, "in-progress": 0, completed: 0 },
+  priority: {},
+  due_today: 0,
+  due_this_week: 0,
+  overdue: 0,
+  activity: [],
+};
+
 function Dashboard() {
-  const [tasks, setTasks] = useState([]);
+  const [summary, setSummary] = useState(EMPTY_STATS);
+  const [todayTasks, setTodayTasks] = useState([]);
+  const [recentTasks, setRecentTasks] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [user, setUser] = useState(null);
+  const reloadTimer = useRef(null);
+
+  // Counts come from the server; only the handful of tasks shown are fetched
+  const loadLists = async () => {
+    const todayStr = new Date().toISOString().slice(0, 10);
+    const [today, recent] = await Promise.all([
+      listTasks({ due_after: todayStr, due_before: todayStr, limit: 6 }),
+      listTasks({ limit: 5 }),
+    ]);
+    setTodayTasks(today.results);
+    setRecentTasks(recent.results);
+  };
 
   const load = async () => {
     try {
       setLoading(true);
       setError("");
-      const data = await listTasks();
-      setTasks(data);
+      const [s] = await Promise.all([getTaskStats(), loadLists()]);
+      setSummary(s);
     } catch (e) {
       setError("Failed to load tasks");
     } finally {
@@ -55,6 +79,7 @@ function Dashboard() {
 
   useEffect(() => {
     load();
+    return () => clearTimeout(reloadTimer.current);
   }, []);
 
   // Fetch current user for a friendly greeting
@@ -65,50 +90,44 @@ function Dashboard() {
       .catch(() => setUser(null));
   }, []);
 
-  // Subscribe to SSE and refresh metrics when tasks change
+  // The stream skips the task list (snapshot=0) and pushes fresh stats after
+  // every change (stats=1); bursts of changes fold into one list reload
   useEffect(() => {
-    const url = `${API_BASE}tasks/stream/`;
+    const url = `${API_BASE}tasks/stream/?snapshot=0&stats=1`;
     const es = new EventSource(url, { withCredentials: true });
-    es.onmessage = () => load();
+    let opened = false;
+    es.onmessage = (e) => {
+      let msg;
+      try { msg = JSON.parse(e.data); } catch (_) { return; }
+      if (msg.type === "stats") {
+        setSummary(msg.stats);
+        return;
+      }
+      if (msg.type === "snapshot" && !opened) {
+        opened = true;
+        return;
+      }
+      clearTimeout(reloadTimer.current);
+      reloadTimer.current = setTimeout(() => loadLists().catch(() => {}), 300);
+    };
     es.onerror = () => {};
     return () => es.close();
   }, []);
 
-  const todayStr = new Date().toISOString().slice(0, 10);
-  const weekFromNowStr = new Date(Date.now() + 6 * 24 * 60 * 60 * 1000)
-    .toISOString()
-    .slice(0, 10);
-
-  const stats = useMemo(() => {
-    const s = { pending: 0, "in-progress": 0, completed: 0 };
-    let dueToday = 0;
-    let dueThisWeek = 0;
-    (tasks || []).forEach((t) => {
-      s[t.status] = (s[t.status] || 0) + 1;
-      if (t.due_date === todayStr) dueToday += 1;
-      if (t.due_date && t.due_date >= todayStr && t.due_date <= weekFromNowStr) dueThisWeek += 1;
-    });
-    return { ...s, total: tasks.length, dueToday, dueThisWeek };
-  }, [tasks, todayStr, weekFromNowStr]);
+  const stats = {
+    ...summary.status,
+    total: summary.total,
+    dueToday: summary.due_today,
+    dueThisWeek: summary.due_this_week,
+  };
 
   const maxStatus = Math.max(stats.pending, stats["in-progress"], stats.completed, 1);
 
-  // Weekly activity (based on updated_at) for the last 7 days
-  const days = [...Array(7)].map((_, i) => {
-    const d = new Date();
-    d.setDate(d.getDate() - (6 - i));
-    return d;
-  });
-  const dayLabels = days.map((d) => d.toLocaleDateString(undefined, { weekday: "short" }));
-  const dayKeys = days.map((d) => d.toISOString().slice(0, 10));
-  const weeklyCounts = useMemo(() => {
-    const map = Object.fromEntries(dayKeys.map((k) => [k, 0]));
-    (tasks || []).forEach((t) => {
-      const d = new Date(t.updated_at).toISOString().slice(0, 10);
-      if (map[d] !== undefined) map[d] += 1;
-    });
-    return dayKeys.map((k) => map[k]);
-  }, [tasks]);
+  // Weekly activity (tasks by day of last update) for the last 7 days
+  const dayLabels = summary.activity.map((a) =>
+    new Date(`${a.date}T00:00:00`).toLocaleDateString(undefined, { weekday: "short" })
+  );
+  const weeklyCounts = summary.activity.map((a) => a.count);
 
   // Chart datasets
   const statusBarData = {
@@ -169,12 +188,6 @@ function Dashboard() {
     scales: { y: { beginAtZero: true, ticks: { precision: 0 } } },
   };
 
-  // Today tasks list (compact)
-  const todayTasks = useMemo(
-    () => (tasks || []).filter((t) => t.due_date === todayStr).slice(0, 6),
-    [tasks, todayStr]
-  );
-
   return (
     <div className="container-fluid p-3 p-md-4 dashboard">
       <div className="row g-3">
@@ -225,7 +238,7 @@ function Dashboard() {
           <div className="soft-card p-3 p-md-4 mb-3">
             <div className="d-flex justify-content-between align-items-center mb-2">
               <h5 className="m-0">Today</h5>
-              <span className="badge bg-secondary">{todayTasks.length}</span>
+              <span className="badge bg-secondary">{stats.dueToday}</span>
             </div>
             {todayTasks.length === 0 ? (
               <div className="text-muted">No tasks due today.</div>
@@ -283,16 +296,12 @@ function Dashboard() {
               <h6 className="m-0">Recent activity</h6>
             </div>
             <div className="d-flex flex-column gap-2">
-              {(tasks || [])
-                .slice()
-                .sort((a, b) => new Date(b.updated_at) - new Date(a.updated_at))
-                .slice(0, 5)
-                .map((t) => (
-                  <div key={t.id} className="recent-item">
-                    <div className="small fw-semibold">{t.title}</div>
-                    <div className="small text-muted">Updated {new Date(t.updated_at).toLocaleString()}</div>
-                  </div>
-                ))}
+              {recentTasks.map((t) => (
+                <div key={t.id} className="recent-item">
+                  <div className="small fw-semibold">{t.title}</div>
+                  <div className="small text-muted">Updated {new Date(t.updated_at).toLocaleString()}</div>
+                </div>
+              ))}
             </div>
           </div>
         </div>
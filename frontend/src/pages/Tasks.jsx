@@ -11,8 +11,19 @@ const emptyForm = {
   due_date: "",
 };
 
+// The list endpoint's filters and ordering, so a delta can be placed without
+// a reload; full-text search can't be matched here and reloads instead
+const matchesFilters = (task, filters) =>
+  (!filters.status || task.status === filters.status) &&
+  (!filters.priority || task.priority === filters.priority) &&
+  (!filters.due_after || (!!task.due_date && task.due_date >= filters.due_after)) &&
+  (!filters.due_before || (!!task.due_date && task.due_date <= filters.due_before));
+
+const byRecency = (a, b) => Date.parse(b.updated_at) - Date.parse(a.updated_at) || b.id - a.id;
+
 function Tasks() {
   const [tasks, setTasks] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [filters, setFilters] = useState({ status: "", priority: "", search: "", due_after: "", due_before: "" });
@@ -25,7 +36,8 @@ function Tasks() {
       setLoading(true);
       setError("");
       const data = await listTasks(filters);
-      setTasks(data);
+      setTasks(data.results);
+      setNextCursor(data.next);
     } catch (e) {
       console.error(e);
       setError("Failed to load tasks");
@@ -39,13 +51,26 @@ function Tasks() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [filters.status, filters.priority, filters.search, filters.due_after, filters.due_before]);
 
-  // Subscribe to SSE for live updates; on event, re-load with current filters
+  // Subscribe to SSE for live updates: apply per-task deltas in place, and
+  // re-load with current filters when a new task (or a full snapshot) arrives.
+  // An updated task may start or stop matching the filters, and is now the
+  // most recently updated, so it is re-placed rather than swapped in.
   useEffect(() => {
     const url = `${API_BASE}tasks/stream/`;
     const es = new EventSource(url, { withCredentials: true });
-    es.onmessage = () => {
-      // simple approach: re-fetch using current filters
-      load();
+    es.onmessage = (e) => {
+      let msg;
+      try { msg = JSON.parse(e.data); } catch (_) { return; }
+      if (msg.type === "deleted") {
+        setTasks((prev) => prev.filter((t) => t.id !== msg.id));
+      } else if (msg.type === "updated" && !filters.search) {
+        setTasks((prev) => {
+          const rest = prev.filter((t) => t.id !== msg.task.id);
+          return matchesFilters(msg.task, filters) ? [msg.task, ...rest].sort(byRecency) : rest;
+        });
+      } else {
+        load();
+      }
     };
     es.onerror = () => {
       // auto-close on error; browser will retry due to retry directive
@@ -53,6 +78,21 @@ function Tasks() {
     return () => es.close();
   }, [filters.status, filters.priority, filters.search, filters.due_after, filters.due_before]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoading(true);
+      const data = await listTasks({ ...filters, cursor: nextCursor });
+      setTasks((prev) => [...prev, ...data.results]);
+      setNextCursor(data.next);
+    } catch (e) {
+      console.error(e);
+      setError("Failed to load tasks");
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const handleCreate = async (e) => {
     e.preventDefault();
     try {
@@ -413,6 +453,13 @@ function Tasks() {
             </tbody>
           </table>
         </div>
+        {nextCursor && (
+          <div className="text-center">
+            <button type="button" className="btn btn-outline-secondary" disabled={loading} onClick={loadMore}>
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );